@@ -1,10 +1,15 @@
 import logging
-from registry.agents.file_access_agent import FileAccessAgent
+from object_orinted_agents.core.agent_event import AgentEvent
+from object_orinted_agents.core.prefetch import Prefetcher
+from object_orinted_agents.core.summarizer import ExtractiveSummarizer
+from object_orinted_agents.datasets.dataset_store import DatasetStore, LocalDirectoryBackend
+from object_orinted_agents.sandbox.execution_cache import ExecutionCache, SandboxDatasets
+from object_orinted_agents.services.cached_language_model import CachedLanguageModel
+from object_orinted_agents.services.open_ai_language_model import OpenAILanguageModel
+from object_orinted_agents.services.routing_language_model import Route, RoutingLanguageModel, RoutingRule
+from registry.agents.file_access_agent import FileAccessAgent, myapp_logger
 from registry.agents.python_code_exec_agent import PythonCodeExecAgent
 
-# Set up debug logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
 prompt = """Use the file traffic_accidents.csv for your analysis. The column names are:
 Variable	Description
 accidents	Number of recorded accidents, as a positive integer.
@@ -20,34 +25,116 @@ time_of_day	Time of day in 24-hour format (0 to 24).
 accidents	traffic_fine_amount
 """
 
-print("set up: ")
-print(prompt)
 
-print(" Setting up the agents...")
+def print_streamed_task(agent, user_task: str) -> str:
+    """Run an agent task, printing answer text, tool activity and sandbox output as they arrive."""
+    final_output = ""
+    for event in agent.task_stream(user_task):
+        if event.type == AgentEvent.TEXT:
+            print(event.content, end="", flush=True)
+        elif event.type == AgentEvent.TOOL_START:
+            print(f"\n[running {event.tool_name}]", flush=True)
+        elif event.type == AgentEvent.TOOL_OUTPUT:
+            print(event.content, end="", flush=True)
+        elif event.type == AgentEvent.TOOL_END:
+            print(f"[{event.tool_name} finished]", flush=True)
+        elif event.type == AgentEvent.DONE:
+            final_output = event.content
+    print()
+    return final_output
+
+
+def print_routing_stats(name: str, router: RoutingLanguageModel) -> None:
+    stats = router.stats()
+    for route, report in stats["routes"].items():
+        print(
+            f"{name} {route}: {report['answered']}/{report['calls']} calls answered, {report['rejected']} rejected, "
+            f"{report['tool_errors']} tool errors, mean {report['latency_seconds']['mean']:.2f}s, ${report['cost_usd']:.4f}"
+        )
+    print(f"{name} saved {stats['saved_seconds']:.1f}s and ${stats['saved_usd']:.4f} against the requested model.")
+
+
+def main() -> None:
+    # Set up debug logging
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    print("set up: ")
+    print(prompt)
+
+    print(" Setting up the agents...")
+
+    # Both agents use the same sandbox container; files the ingest agent stages are
+    # fingerprinted so the analysis agent's execution cache knows when they change.
+    sandbox_datasets = SandboxDatasets()
+    # As soon as the prompt names the data file, it is profiled and staged and the sandbox
+    # kernel is started and loads it, while the ingest model call is still running.
+    prefetcher = Prefetcher()
+
+    # The ingest prompt is identical at every start, so its completions are served from a
+    # response cache that persists across runs. Summarizing the file preview after the file
+    # tool succeeded goes to gpt-4o-mini.
+    # Data files are staged once into .cache/datasets, which the sandbox container mounts
+    # read-only at /data, instead of being copied into the container on every run.
+    ingest_router = RoutingLanguageModel(
+        OpenAILanguageModel(logger=myapp_logger),
+        rules=[RoutingRule(Route("mini", "gpt-4o-mini"), tool_results=True, max_tool_errors=0)],
+        logger=myapp_logger,
+    )
+    file_ingest_agent = FileAccessAgent(
+        language_model_interface=CachedLanguageModel(ingest_router, sqlite_path=".cache/llm_responses.sqlite"),
+        dataset_store=DatasetStore(LocalDirectoryBackend(".cache/datasets", sandbox_root="/data")),
+        sandbox_datasets=sandbox_datasets,
+        prefetcher=prefetcher,
+    )
 
-file_ingest_agent = FileAccessAgent()
+    # Keep the resent history roughly constant in long sessions: old tool output is truncated
+    # and old turns are folded into a summary once the conversation passes the budget.
+    # Analysis code the model repeats (e.g. describe() on the same file) is answered from a cache.
+    # Short questions and steps after successful code runs go to o3-mini at low effort; a
+    # failed run or code that does not compile moves the turn to the requested high effort.
+    quick = Route("quick", "o3-mini", "low")
+    analysis_router = RoutingLanguageModel(
+        OpenAILanguageModel(logger=myapp_logger),
+        rules=[
+            RoutingRule(quick, tool_results=True, max_tool_errors=0, max_past_tool_errors=2),
+            RoutingRule(quick, tool_results=False, max_user_chars=300, max_past_tool_errors=0),
+        ],
+        logger=myapp_logger,
+    )
+    data_analysis_agent = PythonCodeExecAgent(
+        language_model_interface=analysis_router,
+        model_name="o3-mini",
+        reasoning_effort="high",
+        token_budget=16000,
+        summarizer=ExtractiveSummarizer(),
+        execution_cache=ExecutionCache(),
+        sandbox_datasets=sandbox_datasets,
+        prefetcher=prefetcher,
+    )
 
-data_analysis_agent = PythonCodeExecAgent(model_name="o3-mini", reasoning_effort="high")
+    print("Understanding the content of the file...")
 
-print("Understanding the content of the file...")
+    print("File Ingest Agent Output: ")
+    file_ingest_agent_output = print_streamed_task(file_ingest_agent, prompt)
 
-file_ingest_agent_output = file_ingest_agent.task(prompt)
-print("File Ingest Agent Output: ", file_ingest_agent_output)
+    data_analysis_agent.add_context(prompt)
+    data_analysis_agent.add_context(file_ingest_agent_output)
 
-data_analysis_agent.add_context(prompt)
-data_analysis_agent.add_context(file_ingest_agent_output)
+    while True:
+        print("Type your question related to the data in the file. Type 'exit' to quit.")
+        user_input = input("Your question: ")
+        if user_input.lower() == 'exit':
+            print("Exiting the program.")
+            print_routing_stats("ingest", ingest_router)
+            print_routing_stats("analysis", analysis_router)
+            prefetcher.close()
+            break
 
-while True:
-    print("Type your question related to the data in the file. Type 'exit' to quit.")
-    user_input = input("Your question: ")
-    if user_input.lower() == 'exit':
-        print("Exiting the program.")
-        break
+        print("user input: ", user_input)
 
-    print("user input: ", user_input)
+        print("Data Analysis Agent Output: ")
+        data_analysis_agent_output = print_streamed_task(data_analysis_agent, user_input)
 
-    data_analysis_agent_output = data_analysis_agent.task(user_input)
 
-    print("Data Analysis Agent Output: ")
-    print(data_analysis_agent_output)
-          
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Serve data analysis agents to many users over HTTP.
+
+    python AgentServer.py --port 8080 --sandbox docker --max-sandboxes 8
+    python AgentServer.py --fake --sandbox local      # no API key or Docker needed
+
+Each session gets its own PythonCodeExecAgent, with its own message history and its
+own sandbox leased from a pool. See ``object_orinted_agents/server/http_server.py``
+for the endpoints.
+"""
+import argparse
+import asyncio
+import logging
+
+from object_orinted_agents.core.session_store import JsonlSessionStore
+from object_orinted_agents.sandbox.execution_cache import ExecutionCache
+from object_orinted_agents.sandbox.pool import DockerWorkerFactory, LocalWorkerFactory, SandboxPool
+from object_orinted_agents.server.http_server import AdmissionQueue, AgentServer
+from object_orinted_agents.server.session_manager import SessionManager
+from object_orinted_agents.services.fake_language_model import FakeLanguageModel
+from object_orinted_agents.services.open_ai_language_model import OpenAILanguageModel
+from registry.agents.file_access_agent import myapp_logger
+from registry.agents.python_code_exec_agent import PythonCodeExecAgent
+
+
+def build_language_model(fake: bool):
+    if fake:
+        # Echoes the question back, chunk by chunk when streamed.
+        return FakeLanguageModel(
+            responder=lambda **request: f"(fake answer to: {request['messages'][-1]['content']})",
+            latency=0.05,
+            chunk_latency=0.01,
+        )
+    return OpenAILanguageModel(logger=myapp_logger)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve agent sessions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--sandbox", choices=["docker", "local"], default="docker", help="where session sandboxes run")
+    parser.add_argument("--min-sandboxes", type=int, default=1, help="sandboxes kept warm")
+    parser.add_argument("--max-sandboxes", type=int, default=8, help="upper bound on sandboxes, and so on sessions")
+    parser.add_argument("--idle-ttl", type=float, default=1800.0, help="seconds before an unused session is closed")
+    parser.add_argument("--max-running", type=int, default=8, help="turns running at the same time")
+    parser.add_argument("--max-queued", type=int, default=32, help="turns waiting before requests get 503")
+    parser.add_argument("--session-dir", default=".cache/sessions", help="where conversations are persisted across restarts")
+    parser.add_argument("--execution-cache-mb", type=int, default=64, help="results of pure code shared by all sessions; 0 disables")
+    parser.add_argument("--fork-server", action="store_true", help="fork session kernels from a process that has already imported the libraries")
+    parser.add_argument("--fake", action="store_true", help="use a local fake model instead of OpenAI")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.sandbox == "local":
+        factory = LocalWorkerFactory(fork_server=args.fork_server)
+    else:
+        factory = DockerWorkerFactory(fork_server=args.fork_server)
+    pool = SandboxPool(factory, min_workers=args.min_sandboxes, max_workers=args.max_sandboxes)
+    language_model = build_language_model(args.fake)
+    session_store = JsonlSessionStore(args.session_dir)
+    execution_cache = ExecutionCache(max_bytes=args.execution_cache_mb * 1024 * 1024) if args.execution_cache_mb > 0 else None
+
+    sessions = SessionManager(
+        agent_factory=lambda session_id, lease: PythonCodeExecAgent(
+            language_model_interface=language_model,
+            sandbox=lease.worker,
+            session_store=session_store,
+            session_id=session_id,
+            execution_cache=execution_cache,
+        ),
+        max_sessions=args.max_sandboxes,
+        idle_ttl=args.idle_ttl,
+        sandbox_pool=pool,
+        session_store=session_store,
+    )
+    server = AgentServer(
+        sessions,
+        host=args.host,
+        port=args.port,
+        admission=AdmissionQueue(max_running=args.max_running, max_queued=args.max_queued),
+    )
+
+    pool.start()
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Run analysis questions in bulk, offline.
+
+    python BatchOrchestration.py jobs.jsonl --output results/batch.jsonl --concurrency 8
+
+Each line of the jobs file is a job such as
+{"job_id": "q1", "agent": "python_code_exec", "files": ["traffic_accidents.csv"], "question": "..."}.
+Rerunning with the same output file resumes an interrupted run.
+"""
+import argparse
+import json
+import logging
+
+from object_orinted_agents.batch.batch_runner import BatchRunner
+from object_orinted_agents.datasets.dataset_store import DatasetStore, LocalDirectoryBackend
+from object_orinted_agents.services.batch_language_model import BatchingLanguageModel, FakeBatchSubmitter, OpenAIBatchSubmitter
+from object_orinted_agents.services.fake_language_model import FakeLanguageModel
+from object_orinted_agents.services.open_ai_language_model import OpenAILanguageModel
+from object_orinted_agents.utils.tracing import JsonlSpanExporter, get_tracer
+from registry.agents.file_access_agent import FileAccessAgent, myapp_logger
+from registry.agents.python_code_exec_agent import PythonCodeExecAgent
+from registry.tools.file_access_tool import FileAccessTool
+
+
+def build_language_model(use_batch_api: bool, fake: bool):
+    if fake:
+        language_model = FakeLanguageModel(default_response="(fake answer)")
+        return BatchingLanguageModel(FakeBatchSubmitter(language_model), poll_interval=0.1) if use_batch_api else language_model
+    if use_batch_api:
+        return BatchingLanguageModel(OpenAIBatchSubmitter(logger=myapp_logger), logger=myapp_logger)
+    return OpenAILanguageModel(logger=myapp_logger)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run analysis jobs from a JSONL file.")
+    parser.add_argument("jobs", help="JSONL file of jobs")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=4, help="jobs running at the same time")
+    parser.add_argument("--batch-api", action="store_true", help="send model calls through the provider batch API")
+    parser.add_argument("--retry-failed", action="store_true", help="rerun jobs recorded as failed")
+    parser.add_argument("--fake", action="store_true", help="use a local fake model instead of OpenAI")
+    parser.add_argument("--trace", help="JSONL file spans are written to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    tracer = get_tracer()
+    if args.trace:
+        tracer.add_exporter(JsonlSpanExporter(args.trace))
+
+    language_model = build_language_model(args.batch_api, args.fake)
+    dataset_store = DatasetStore(LocalDirectoryBackend(".cache/datasets", sandbox_root="/data"))
+    file_tool = FileAccessTool(logger=myapp_logger, dataset_store=dataset_store)
+
+    runner = BatchRunner(
+        agent_factories={
+            "python_code_exec": lambda job: PythonCodeExecAgent(language_model_interface=language_model),
+            "file_access": lambda job: FileAccessAgent(language_model_interface=language_model, dataset_store=dataset_store),
+        },
+        output_path=args.output,
+        max_concurrency=args.concurrency,
+        context_loader=file_tool.save_file_access,
+        retry_failed=args.retry_failed,
+    )
+    try:
+        summary = runner.run(args.jobs)
+    finally:
+        if isinstance(language_model, BatchingLanguageModel):
+            language_model.close()
+        tracer.shutdown()
+    summary["stages_ms"] = tracer.summary()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+"""
+Overhead the framework adds around the model and the sandbox, measured offline.
+
+Agents run against a scripted FakeLanguageModel with a fixed latency and a local
+kernel process, so runs are repeatable and need no API key or Docker. Scenarios:
+
+    overhead    per-turn time not spent in model calls or tools, for BaseAgent.task
+                (sync) and AsyncBaseAgent.atask (async)
+    throughput  turns per second with N sessions running concurrently
+    history     traced memory as a conversation grows, with and without a token budget
+    preview     FileAccessTool cost (profile + staging) against generated CSV sizes
+    spawn       kernel start time and per-session memory for fresh interpreters, kernels
+                forked from a fork server, and branches forked from a snapshot taken
+                after loading a CSV (Linux; memory from /proc/<pid>/smaps_rollup)
+
+Results are written as JSON (with the git commit) so runs can be compared:
+
+Usage:
+    python benchmarks/agent_benchmark.py [--scenarios overhead throughput] [--output results.json]
+    python benchmarks/agent_benchmark.py --compare benchmarks/results/agent_benchmark-<commit>.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from object_orinted_agents.core.base_agent import BaseAgent  # noqa: E402
+from object_orinted_agents.core.tool_manager import ToolManager  # noqa: E402
+from object_orinted_agents.datasets.dataset_store import DatasetStore, LocalDirectoryBackend  # noqa: E402
+from object_orinted_agents.sandbox.fork_server import ForkServer  # noqa: E402
+from object_orinted_agents.sandbox.kernel import LocalKernelBackend, PythonKernel  # noqa: E402
+from object_orinted_agents.sandbox.pool import LocalWorkerFactory, SandboxPool, SandboxWorker  # noqa: E402
+from object_orinted_agents.services.fake_language_model import FakeLanguageModel  # noqa: E402
+from object_orinted_agents.utils.logger import get_logger  # noqa: E402
+from object_orinted_agents.utils.stats import summarize  # noqa: E402
+from object_orinted_agents.utils.tracing import InMemorySpanExporter, get_tracer  # noqa: E402
+from registry.agents.python_code_exec_agent import PythonCodeExecAgent  # noqa: E402
+from registry.tools.file_access_tool import FileAccessTool  # noqa: E402
+from registry.tools.python_code_interpreter_tool import PythonCodeInterpreterTool  # noqa: E402
+
+SCENARIOS = ["overhead", "throughput", "history", "preview", "spawn"]
+EXTERNAL_SPANS = ("llm.completion", "tool.execute")
+# Leaves compared by --compare; the rest are counts and parameters.
+METRICS = (".mean", ".p50", ".p95", ".max", "_ms", "per_second", "per_turn")
+# The libraries of docker/requirements.txt that sandboxed code imports.
+SANDBOX_STACK = ["pandas:pd", "numpy:np", "sklearn", "matplotlib.pyplot:plt", "seaborn:sns"]
+
+logger = get_logger("benchmark", logging.WARNING)
+
+
+def scripted_responder(tool_calls: int, rounds: int, code: str):
+    """Model replies: ``rounds`` rounds of ``tool_calls`` interpreter calls per turn, then a short answer."""
+    def respond(messages, **_):
+        tool_results = 0
+        for message in reversed(messages):
+            if message["role"] == "user":
+                break
+            tool_results += message["role"] == "tool"
+        if tool_results < tool_calls * rounds:
+            return FakeLanguageModel.tool_call_response([("python_code_interpreter", {"python_code": code})] * tool_calls)
+        return "Done."
+    return respond
+
+
+class BenchmarkAgent(BaseAgent):
+    """Synchronous agent with the interpreter and file tools, for timing ``BaseAgent.task``."""
+
+    def __init__(self, language_model, kernel: PythonKernel, sandbox_dir: str, token_budget=None):
+        self.kernel = kernel
+        self.sandbox_dir = sandbox_dir
+        super().__init__("You analyse data.", "fake-model", logger=logger, language_model_interface=language_model, token_budget=token_budget)
+        self.setup_tools()
+
+    def setup_tools(self) -> None:
+        self.tool_manager = ToolManager(logger=self.logger, language_model_interface=self.language_model_interface)
+        self.tool_manager.register_tool(PythonCodeInterpreterTool(logger=self.logger, kernel=self.kernel))
+        self.tool_manager.register_tool(FileAccessTool(logger=self.logger, sandbox_dir=self.sandbox_dir))
+
+
+def _union_seconds(spans) -> float:
+    # Parallel tool calls overlap, so external time is the union of the span intervals.
+    intervals = sorted((span.start_time, span.start_time + span.duration) for span in spans)
+    total, current_start, current_end = 0.0, None, None
+    for start, end in intervals:
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def _turn_breakdown(exporter: InMemorySpanExporter):
+    """(turn, external, overhead) milliseconds for each finished agent turn, then clears the exporter."""
+    spans = exporter.finished_spans()
+    exporter.clear()
+    rows = []
+    for turn in (span for span in spans if span.name == "agent.turn"):
+        external = _union_seconds([span for span in spans if span.trace_id == turn.trace_id and span.name in EXTERNAL_SPANS])
+        rows.append((turn.duration * 1000, external * 1000, (turn.duration - external) * 1000))
+    return rows
+
+
+def _summaries(rows):
+    return {
+        "turn_ms": summarize(row[0] for row in rows),
+        "external_ms": summarize(row[1] for row in rows),
+        "overhead_ms": summarize(row[2] for row in rows),
+    }
+
+
+def bench_overhead(args, work_dir: str):
+    exporter = InMemorySpanExporter(max_spans=100000)
+    get_tracer().add_exporter(exporter)
+    respond = scripted_responder(args.tool_calls, args.rounds, "x = 1")
+    results = {}
+    with PythonKernel(LocalKernelBackend(working_dir=work_dir), preimports=[], logger=logger) as kernel:
+        model = FakeLanguageModel(responder=respond, latency=args.model_latency_ms / 1000)
+        sync_agent = BenchmarkAgent(model, kernel, work_dir)
+        async_agent = PythonCodeExecAgent(logger=logger, language_model_interface=model, sandbox=SandboxWorker("bench", kernel, work_dir))
+        for mode, run_turn in (("sync", sync_agent.task), ("async", lambda task: asyncio.run(async_agent.atask(task)))):
+            for _ in range(args.warmup):
+                run_turn("warm up")
+            exporter.clear()
+            for turn in range(args.turns):
+                run_turn(f"Question {turn}")
+            results[mode] = _summaries(_turn_breakdown(exporter))
+    get_tracer().exporters.remove(exporter)
+    return results
+
+
+def bench_throughput(args, work_dir: str):
+    respond = scripted_responder(args.tool_calls, args.rounds, "x = sum(range(1000))")
+    model = FakeLanguageModel(responder=respond, latency=args.model_latency_ms / 1000)
+    results = {}
+    for sessions in args.sessions:
+        pool = SandboxPool(LocalWorkerFactory(root_dir=work_dir, preimports=[], logger=logger), min_workers=sessions, max_workers=sessions, logger=logger)
+        pool.start()
+        leases = [pool.lease(f"session-{index}") for index in range(sessions)]
+        agents = [PythonCodeExecAgent(logger=logger, language_model_interface=model, sandbox=lease.worker) for lease in leases]
+        latencies = []
+
+        async def run_session(agent):
+            for turn in range(args.turns_per_session):
+                started = time.perf_counter()
+                await agent.atask(f"Question {turn}")
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        async def run_all():
+            await asyncio.gather(*(run_session(agent) for agent in agents))
+
+        started = time.perf_counter()
+        asyncio.run(run_all())
+        elapsed = time.perf_counter() - started
+        for lease in leases:
+            lease.release()
+        pool.shutdown()
+        results[str(sessions)] = {
+            "turns": len(latencies),
+            "seconds": round(elapsed, 3),
+            "turns_per_second": len(latencies) / elapsed,
+            "turn_ms": summarize(latencies),
+        }
+    return results
+
+
+def bench_history(args, work_dir: str):
+    code = f"print('x' * {args.output_chars})"
+    results = {}
+    with PythonKernel(LocalKernelBackend(working_dir=work_dir), preimports=[], logger=logger) as kernel:
+        for label, budget in (("unbounded", None), ("token_budget", args.token_budget)):
+            model = FakeLanguageModel(responder=scripted_responder(1, 1, code))
+            agent = BenchmarkAgent(model, kernel, work_dir, token_budget=budget)
+            gc.collect()
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            samples = []
+            for turn in range(1, args.history_turns + 1):
+                agent.task(f"Question {turn}")
+                if turn % args.sample_every == 0 or turn == args.history_turns:
+                    samples.append({
+                        "turn": turn,
+                        "traced_kb": (tracemalloc.get_traced_memory()[0] - baseline) // 1024,
+                        "messages": len(agent.messages.get_messages()),
+                        "tokens": agent.messages.total_tokens,
+                    })
+            tracemalloc.stop()
+            first, last = samples[0], samples[-1]
+            growth = (last["traced_kb"] - first["traced_kb"]) / max(last["turn"] - first["turn"], 1)
+            results[label] = {"token_budget": budget, "kb_per_turn": round(growth, 3), "samples": samples}
+    return results
+
+
+def generate_csv(path: str, size_mb: int, seed: int = 7) -> int:
+    """Write a deterministic CSV of about ``size_mb`` MiB and return its row count."""
+    rng = random.Random(seed)
+    block = [
+        (rng.choice(["north", "south", "east", "west"]), round(rng.uniform(0, 1000), 3), rng.randint(0, 1), rng.randint(0, 23))
+        for _ in range(1000)
+    ]
+    target = size_mb * 1024 * 1024
+    rows = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,region,value,flag,hour\n")
+        while f.tell() < target:
+            f.write("".join(f"{rows + i},{region},{value},{flag},{hour}\n" for i, (region, value, flag, hour) in enumerate(block)))
+            rows += len(block)
+    return rows
+
+
+def bench_preview(args, work_dir: str):
+    data_dir = args.data_dir or os.path.join(work_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    results = []
+    for size_mb in args.preview_sizes_mb:
+        path = os.path.join(data_dir, f"bench_{size_mb}mb.csv")
+        # Generated files are kept in --data-dir and reused, since large ones take a while to write.
+        rows_path = path + ".rows"
+        if os.path.exists(path) and os.path.exists(rows_path):
+            with open(rows_path) as f:
+                rows = int(f.read())
+        else:
+            rows = generate_csv(path, size_mb)
+            with open(rows_path, "w") as f:
+                f.write(str(rows))
+
+        stage_dir = tempfile.mkdtemp(prefix="stage-", dir=work_dir)
+        sandbox_dir = tempfile.mkdtemp(prefix="sandbox-", dir=work_dir)
+        tool = FileAccessTool(logger=logger, sandbox_dir=sandbox_dir, dataset_store=DatasetStore(LocalDirectoryBackend(stage_dir), logger=logger))
+        started = time.perf_counter()
+        cold_output = tool.save_file_access(path)
+        cold = time.perf_counter() - started
+        started = time.perf_counter()
+        tool.save_file_access(path)
+        warm = time.perf_counter() - started
+        results.append({
+            "size_mb": size_mb,
+            "rows": rows,
+            "cold_ms": cold * 1000,
+            "warm_ms": warm * 1000,
+            "cold_mb_per_second": size_mb / cold,
+            "ok": not cold_output.startswith("Error"),
+        })
+        shutil.rmtree(stage_dir, ignore_errors=True)
+        shutil.rmtree(sandbox_dir, ignore_errors=True)
+    return results
+
+
+def _memory_kb(pid: int):
+    """
+    RSS, PSS (shared pages split between the processes sharing them) and USS (pages no
+    other process shares) of a process, in KiB. Empty where /proc is not available.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return {}
+    return {"rss_kb": fields.get("Rss", 0), "pss_kb": fields.get("Pss", 0), "uss_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)}
+
+
+def _spawn_kernels(new_kernel, sessions: int):
+    """Start ``sessions`` kernels one after another and measure them while all are running."""
+    kernels, start_ms = [], []
+    for _ in range(sessions):
+        kernel = new_kernel()
+        started = time.perf_counter()
+        kernel.start()
+        start_ms.append((time.perf_counter() - started) * 1000)
+        kernels.append(kernel)
+    memory = [_memory_kb(kernel.ready_info["pid"]) for kernel in kernels]
+    for kernel in kernels:
+        kernel.shutdown()
+    row = {"start_ms": summarize(start_ms)}
+    for field in ("rss_kb", "pss_kb", "uss_kb"):
+        values = [sample[field] for sample in memory if sample]
+        if values:
+            row[field] = summarize(values)
+    return row
+
+
+def bench_spawn(args, work_dir: str):
+    data_dir = args.data_dir or os.path.join(work_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    csv_path = os.path.join(data_dir, f"spawn_{args.spawn_csv_mb}mb.csv")
+    if not os.path.exists(csv_path):
+        generate_csv(csv_path, args.spawn_csv_mb)
+    backend = lambda: LocalKernelBackend(working_dir=work_dir)
+    results = {"preimports": args.spawn_preimports}
+
+    results["fresh"] = _spawn_kernels(lambda: PythonKernel(backend(), preimports=args.spawn_preimports, logger=logger), args.spawn_sessions)
+
+    server = ForkServer(backend(), preimports=args.spawn_preimports, logger=logger)
+    started = time.perf_counter()
+    with server:
+        server_start_ms = (time.perf_counter() - started) * 1000
+        results["preimported"] = server.ready_info.get("preimported", [])
+        server_memory = _memory_kb(server.ready_info["pid"])
+        results["fork"] = _spawn_kernels(lambda: server.new_kernel(backend(), logger=logger), args.spawn_sessions)
+        results["fork"]["server_start_ms"] = server_start_ms
+        results["fork"].update({f"server_{field}": value for field, value in server_memory.items()})
+
+        # A what-if branch: reload the CSV in a new kernel, or fork one that already has it.
+        if "pandas:pd" in results["preimported"]:
+            load, query = f"df = pd.read_csv({csv_path!r})", "print(df.groupby('region')['value'].mean().round(1).to_dict())"
+        else:
+            load, query = f"import csv\ndf = list(csv.DictReader(open({csv_path!r})))", "print(len(df))"
+        reload_ms, branch_ms = [], []
+        with server.new_kernel(backend(), logger=logger) as kernel:
+            started = time.perf_counter()
+            kernel.execute(load)
+            results["snapshot"] = {"csv_mb": args.spawn_csv_mb, "load_ms": (time.perf_counter() - started) * 1000}
+            started = time.perf_counter()
+            snapshot = kernel.snapshot()
+            results["snapshot"]["snapshot_ms"] = (time.perf_counter() - started) * 1000
+        with snapshot:
+            for _ in range(args.spawn_sessions):
+                started = time.perf_counter()
+                with server.new_kernel(backend(), logger=logger) as kernel:
+                    kernel.execute(load)
+                    kernel.execute(query)
+                    reload_ms.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                with snapshot.fork(backend(), logger=logger) as kernel:
+                    kernel.execute(query)
+                    branch_ms.append((time.perf_counter() - started) * 1000)
+        results["snapshot"]["reload_ms"] = summarize(reload_ms)
+        results["snapshot"]["branch_ms"] = summarize(branch_ms)
+    return results
+
+
+def _git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _flatten(item, f"{prefix}[{index}]")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, value
+
+
+def compare(baseline_path: str, report) -> None:
+    """Print every metric present in both reports with its relative change."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = dict(_flatten(baseline["results"]))
+    print(f"\nCompared with {baseline['meta'].get('commit')} ({baseline_path}):")
+    print(f"{'metric':<60} {'before':>12} {'after':>12} {'change':>8}")
+    for name, after in _flatten(report["results"]):
+        if name in before and name.endswith(METRICS):
+            change = (after - before[name]) / before[name] * 100 if before[name] else 0.0
+            print(f"{name:<60} {before[name]:>12.3f} {after:>12.3f} {change:>+7.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--model-latency-ms", type=float, default=20.0, help="simulated latency of every model call")
+    parser.add_argument("--tool-calls", type=int, default=1, help="interpreter calls per tool round")
+    parser.add_argument("--rounds", type=int, default=1, help="tool rounds per turn")
+    parser.add_argument("--turns", type=int, default=50, help="measured turns per overhead mode")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16], help="concurrency levels for throughput")
+    parser.add_argument("--turns-per-session", type=int, default=10)
+    parser.add_argument("--history-turns", type=int, default=200)
+    parser.add_argument("--sample-every", type=int, default=20)
+    parser.add_argument("--output-chars", type=int, default=2000, help="tool output per turn in the history scenario")
+    parser.add_argument("--token-budget", type=int, default=8000)
+    parser.add_argument("--preview-sizes-mb", type=int, nargs="+", default=[1, 10, 100], help="CSV sizes, e.g. 1 10 100 1000 4000")
+    parser.add_argument("--data-dir", help="keep generated CSV files here between runs")
+    parser.add_argument("--spawn-preimports", nargs="*", default=SANDBOX_STACK, help="modules every kernel imports in the spawn scenario")
+    parser.add_argument("--spawn-sessions", type=int, default=8, help="kernels started per spawn mode")
+    parser.add_argument("--spawn-csv-mb", type=int, default=10, help="size of the CSV loaded before the snapshot")
+    parser.add_argument("--output", help="JSON report path (default benchmarks/results/agent_benchmark-<commit>.json)")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    commit, dirty = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": {},
+    }
+    runners = {
+        "overhead": bench_overhead,
+        "throughput": bench_throughput,
+        "history": bench_history,
+        "preview": bench_preview,
+        "spawn": bench_spawn,
+    }
+    work_dir = tempfile.mkdtemp(prefix="agent-benchmark-")
+    try:
+        for scenario in args.scenarios:
+            print(f"Running {scenario}...", flush=True)
+            started = time.perf_counter()
+            report["results"][scenario] = runners[scenario](args, work_dir)
+            print(f"  {scenario} finished in {time.perf_counter() - started:.1f}s", flush=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(REPO_ROOT, "benchmarks", "results", f"agent_benchmark-{(commit or 'unknown')[:10]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+    for mode in ("sync", "async"):
+        overhead = report["results"].get("overhead", {}).get(mode)
+        if overhead:
+            print(f"overhead[{mode}]: p50 {overhead['overhead_ms']['p50']:.2f} ms, p95 {overhead['overhead_ms']['p95']:.2f} ms per turn")
+    for sessions, row in report["results"].get("throughput", {}).items():
+        print(f"throughput[{sessions} sessions]: {row['turns_per_second']:.1f} turns/s, p95 {row['turn_ms']['p95']:.1f} ms")
+    for label in ("unbounded", "token_budget"):
+        row = report["results"].get("history", {}).get(label)
+        if row:
+            print(f"history[{label}]: {row['kb_per_turn']:.1f} KiB per turn")
+    for row in report["results"].get("preview", []):
+        print(f"preview[{row['size_mb']} MiB]: cold {row['cold_ms']:.0f} ms, warm {row['warm_ms']:.1f} ms")
+    spawn = report["results"].get("spawn", {})
+    for mode in ("fresh", "fork"):
+        if mode in spawn:
+            row = spawn[mode]
+            memory = f", PSS {row['pss_kb']['p50'] / 1024:.1f} MiB, USS {row['uss_kb']['p50'] / 1024:.1f} MiB per kernel" if "pss_kb" in row else ""
+            print(f"spawn[{mode}]: start p50 {row['start_ms']['p50']:.1f} ms{memory}")
+    if "snapshot" in spawn:
+        row = spawn["snapshot"]
+        print(f"spawn[snapshot]: reload + query p50 {row['reload_ms']['p50']:.1f} ms, fork from snapshot + query p50 {row['branch_ms']['p50']:.1f} ms")
+
+    if args.compare:
+        compare(args.compare, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Cold-import time of the CLI entry point and each agent module.
+
+Every sample imports the module in a fresh interpreter, so nothing is cached in
+``sys.modules``. Also reports which heavy third-party modules the import pulled in;
+for a lazy startup that list should be empty.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 10]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from object_orinted_agents.utils.stats import summarize  # noqa: E402
+
+MODULES = [
+    "AgentOrchestration",
+    "registry.agents.file_access_agent",
+    "registry.agents.python_code_exec_agent",
+]
+HEAVY_MODULES = ["openai", "httpx", "pandas", "numpy", "pyarrow", "dotenv", "tiktoken"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, runs: int):
+    samples = []
+    heavy = []
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(report["seconds"] * 1000)
+        heavy = report["heavy"]
+    return summarize(samples), heavy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per module")
+    args = parser.parse_args()
+
+    print(f"{'module':<42} {'p50 ms':>8} {'p95 ms':>8}  heavy modules loaded")
+    for module in MODULES:
+        stats, heavy = measure(module, args.runs)
+        print(f"{module:<42} {stats['p50']:>8.1f} {stats['p95']:>8.1f}  {', '.join(heavy) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
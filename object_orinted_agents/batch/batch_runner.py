@@ -0,0 +1,225 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from object_orinted_agents.core.base_agent import BaseAgent
+from object_orinted_agents.services.metered_language_model import MeteredLanguageModel
+from object_orinted_agents.utils.async_utils import run_sync
+from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.stats import summarize
+
+NO_USAGE = {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+
+class BatchJob:
+    """
+    One question for one agent, with the data files and extra context it needs.
+
+    Read from a JSONL line such as
+    ``{"job_id": "q1", "agent": "python_code_exec", "files": ["sales.csv"], "question": "..."}``.
+    ``request_id`` and ``body`` are accepted as aliases of ``job_id`` and ``question``.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        question: str,
+        agent: str = "python_code_exec",
+        files: Optional[List[str]] = None,
+        context: Optional[List[str]] = None,
+    ):
+        self.job_id = job_id
+        self.question = question
+        self.agent = agent
+        self.files = files or []
+        self.context = context or []
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any], line_number: int = 0) -> "BatchJob":
+        question = record.get("question") or record.get("body")
+        if not question:
+            raise ValueError(f"Job on line {line_number} has no question.")
+        files = record.get("files") or []
+        context = record.get("context") or []
+        return cls(
+            job_id=str(record.get("job_id") or record.get("request_id") or f"job-{line_number}"),
+            question=question,
+            agent=record.get("agent", "python_code_exec"),
+            files=[files] if isinstance(files, str) else list(files),
+            context=[context] if isinstance(context, str) else list(context),
+        )
+
+
+def load_jobs(path: str) -> List[BatchJob]:
+    """Read jobs from a JSONL file, one per non-blank line. Job ids must be unique."""
+    jobs = []
+    seen: Set[str] = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON on line {line_number} of {path}: {e}") from e
+            job = BatchJob.from_dict(record, line_number)
+            if job.job_id in seen:
+                raise ValueError(f"Duplicate job id {job.job_id!r} on line {line_number} of {path}.")
+            seen.add(job.job_id)
+            jobs.append(job)
+    return jobs
+
+
+class BatchRunner:
+    """
+    Runs many independent agent jobs with bounded concurrency and resumable progress.
+
+    Every job gets a fresh agent from ``agent_factories[job.agent]``. Its files are turned
+    into context by ``context_loader`` (for example ``FileAccessTool.save_file_access``,
+    which also stages them for the sandbox), then the question is asked. One result line
+    per job is appended to ``output_path`` as soon as the job ends, with its answer or
+    error, wall time and token usage. The results file is also the checkpoint: jobs
+    already recorded there are skipped, so rerunning after a crash resumes where it stopped.
+
+    Args:
+        agent_factories (Dict[str, Callable[[BatchJob], BaseAgent]]): Agent name to a
+            function building a new agent for a job.
+        output_path (str): JSONL file results are appended to.
+        max_concurrency (int): Jobs running at the same time.
+        context_loader (Optional[Callable[[str], str]]): Turns a job's file name into context.
+        retry_failed (bool): Rerun jobs whose recorded result is an error.
+    """
+
+    def __init__(
+        self,
+        agent_factories: Dict[str, Callable[[BatchJob], BaseAgent]],
+        output_path: str,
+        max_concurrency: int = 4,
+        context_loader: Optional[Callable[[str], str]] = None,
+        retry_failed: bool = False,
+        logger=None,
+    ):
+        self.agent_factories = agent_factories
+        self.output_path = output_path
+        self.max_concurrency = max_concurrency
+        self.context_loader = context_loader
+        self.retry_failed = retry_failed
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._write_lock = threading.Lock()
+
+    def run(self, jobs: Union[str, List[BatchJob]]) -> Dict[str, Any]:
+        """Run jobs (a list or the path of a JSONL file) and return a summary."""
+        return run_sync(self.arun(jobs))
+
+    async def arun(self, jobs: Union[str, List[BatchJob]]) -> Dict[str, Any]:
+        """Async version of ``run``."""
+        if isinstance(jobs, str):
+            jobs = load_jobs(jobs)
+        finished = self.completed_job_ids()
+        pending = [job for job in jobs if job.job_id not in finished]
+        self.logger.info("Running %s of %s jobs (%s already done).", len(pending), len(jobs), len(jobs) - len(pending))
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_bounded(job: BatchJob) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._run_job(job)
+
+        results = await asyncio.gather(*(run_bounded(job) for job in pending))
+        return self._summary(len(jobs), results)
+
+    def completed_job_ids(self) -> Set[str]:
+        """Job ids with a result in the output file (successful ones only when ``retry_failed``)."""
+        finished: Set[str] = set()
+        if not os.path.isfile(self.output_path):
+            return finished
+        self._end_partial_line()
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A run killed mid-write can leave a partial last line.
+                    continue
+                if record.get("status") == "ok" or not self.retry_failed:
+                    finished.add(record.get("job_id"))
+        return finished
+
+    def _end_partial_line(self) -> None:
+        # Terminate a line cut short by a crash so the next result starts on its own line.
+        with open(self.output_path, "rb+") as f:
+            if f.seek(0, os.SEEK_END) and (f.seek(-1, os.SEEK_END), f.read(1))[1] != b"\n":
+                f.write(b"\n")
+
+    async def _run_job(self, job: BatchJob) -> Dict[str, Any]:
+        started_at = time.time()
+        start = time.perf_counter()
+        record: Dict[str, Any] = {"job_id": job.job_id, "agent": job.agent, "question": job.question}
+        agent = None
+        meter = None
+        try:
+            factory = self.agent_factories.get(job.agent)
+            if factory is None:
+                raise ValueError(f"Unknown agent {job.agent!r}; expected one of {sorted(self.agent_factories)}")
+            agent = await asyncio.to_thread(factory, job)
+            meter = self._meter(agent)
+            for file_name in job.files:
+                context = await asyncio.to_thread(self.context_loader, file_name) if self.context_loader else f"Data file: {file_name}"
+                agent.add_context(context)
+            for context in job.context:
+                agent.add_context(context)
+            if hasattr(agent, "atask"):
+                answer = await agent.atask(job.question)
+            else:
+                answer = await asyncio.to_thread(agent.task, job.question)
+            record.update(status="ok", answer=answer)
+        except Exception as e:
+            self.logger.error("Job %s failed: %s", job.job_id, e)
+            record.update(status="error", error=f"{type(e).__name__}: {e}")
+        finally:
+            if agent is not None:
+                await asyncio.to_thread(agent.close)
+
+        record.update(
+            seconds=round(time.perf_counter() - start, 3),
+            started_at=started_at,
+            finished_at=time.time(),
+            **(meter.usage() if meter else NO_USAGE),
+        )
+        self._append(record)
+        return record
+
+    def _meter(self, agent: BaseAgent) -> MeteredLanguageModel:
+        meter = MeteredLanguageModel(agent.language_model_interface)
+        agent.language_model_interface = meter
+        if agent.tool_manager:
+            agent.tool_manager.language_model_interface = meter
+        return meter
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        line = json.dumps(record, default=str) + "\n"
+        with self._write_lock:
+            with open(self.output_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _summary(self, total_jobs: int, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        succeeded = [record for record in results if record["status"] == "ok"]
+        summary = {
+            "jobs": total_jobs,
+            "ran": len(results),
+            "skipped": total_jobs - len(results),
+            "succeeded": len(succeeded),
+            "failed": len(results) - len(succeeded),
+            "seconds": summarize(record["seconds"] for record in results),
+            "total_tokens": sum(record["total_tokens"] for record in results),
+        }
+        self.logger.info("Batch finished: %s", summary)
+        return summary
@@ -0,0 +1,66 @@
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from object_orinted_agents.services.language_model_interface import LanguageModelInterface
+from object_orinted_agents.services.stream_accumulator import StreamAccumulator
+
+
+class AgentEvent:
+    """
+    One item of a streamed agent turn.
+
+    Types:
+        text: a piece of the assistant's answer (``content``).
+        tool_start: a tool call is about to run (``tool_name``, ``tool_call_id``, ``arguments``).
+        tool_output: output produced by a running tool, e.g. sandbox stdout (``content``).
+        tool_end: a tool call finished; ``content`` is its complete result.
+        done: the turn is over; ``content`` is the final answer.
+    """
+
+    TEXT = "text"
+    TOOL_START = "tool_start"
+    TOOL_OUTPUT = "tool_output"
+    TOOL_END = "tool_end"
+    DONE = "done"
+
+    def __init__(
+        self,
+        type: str,
+        content: str = "",
+        tool_name: Optional[str] = None,
+        tool_call_id: Optional[str] = None,
+        arguments: Optional[str] = None,
+    ):
+        self.type = type
+        self.content = content
+        self.tool_name = tool_name
+        self.tool_call_id = tool_call_id
+        self.arguments = arguments
+
+    def to_dict(self) -> Dict[str, Any]:
+        event = {"type": self.type, "content": self.content}
+        if self.tool_name is not None:
+            event["tool_name"] = self.tool_name
+        if self.tool_call_id is not None:
+            event["tool_call_id"] = self.tool_call_id
+        if self.arguments is not None:
+            event["arguments"] = self.arguments
+        return event
+
+    def __repr__(self) -> str:
+        return f"AgentEvent({self.to_dict()!r})"
+
+
+def stream_completion(language_model_interface: LanguageModelInterface, params: Dict[str, Any], accumulator: StreamAccumulator) -> Iterator[AgentEvent]:
+    """Stream one completion, yielding its text as ``text`` events and collecting the rest in ``accumulator``."""
+    for chunk in language_model_interface.generate_completion(**params, stream=True):
+        text = accumulator.add(chunk)
+        if text:
+            yield AgentEvent(AgentEvent.TEXT, text)
+
+
+async def astream_completion(language_model_interface: LanguageModelInterface, params: Dict[str, Any], accumulator: StreamAccumulator) -> AsyncIterator[AgentEvent]:
+    """Async variant of ``stream_completion``."""
+    async for chunk in await language_model_interface.agenerate_completion(**params, stream=True):
+        text = accumulator.add(chunk)
+        if text:
+            yield AgentEvent(AgentEvent.TEXT, text)
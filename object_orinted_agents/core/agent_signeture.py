@@ -20,8 +20,7 @@ class AgentSignature:
     def to_dict(self) -> Dict[str, Any]:
 
         if self.tool_manager:
-            tools = self.tool_manager.get_tool_definitions()
-            functions = [tool for tool in tools]
+            functions = list(self.tool_manager.get_tool_definitions())
         else:
             functions = []
 
@@ -0,0 +1,62 @@
+from typing import AsyncIterator, Optional
+from object_orinted_agents.core.agent_event import AgentEvent, astream_completion
+from object_orinted_agents.core.base_agent import BaseAgent
+from object_orinted_agents.services.stream_accumulator import StreamAccumulator
+from object_orinted_agents.utils.async_utils import run_sync
+
+
+class AsyncBaseAgent(BaseAgent):
+    """
+    Agent whose turn is a coroutine, so one event loop can drive many sessions.
+
+    ``atask`` awaits the language model and the tools. The synchronous ``task`` is
+    a thin wrapper that runs ``atask`` on a background event loop.
+    """
+
+    async def atask(self, user_task: str, tool_call_enabled: bool = True, return_tool_response_as_is: bool = False, reasoning_effort: Optional[str] = None) -> str:
+        """Process a user task asynchronously and return the agent's response."""
+        with self._turn_span():
+            params = self._prepare_task(user_task, tool_call_enabled, reasoning_effort)
+
+            response = await self.language_model_interface.agenerate_completion(**params)
+            tool_calls = response.choices[0].message.tool_calls
+            if tool_call_enabled and tool_calls and self.tool_manager:
+                self.logger.info("Model requested %d tool call(s).", len(tool_calls))
+                return await self.tool_manager.ahandle_tool_call_sequence(
+                    response,
+                    return_tool_response_as_is,
+                    self.messages,
+                    self.model_name,
+                    reasoning_effort=params.get("reasoning_effort")
+                )
+
+            return self._finish_task(response)
+
+    async def atask_stream(self, user_task: str, tool_call_enabled: bool = True, return_tool_response_as_is: bool = False, reasoning_effort: Optional[str] = None) -> AsyncIterator[AgentEvent]:
+        """Async-iterator variant of ``task_stream``."""
+        with self._turn_span(stream=True):
+            params = self._prepare_task(user_task, tool_call_enabled, reasoning_effort)
+
+            accumulator = StreamAccumulator()
+            async for event in astream_completion(self.language_model_interface, params, accumulator):
+                yield event
+            response = accumulator.completion()
+
+            tool_calls = response.choices[0].message.tool_calls
+            if tool_call_enabled and tool_calls and self.tool_manager:
+                self.logger.info("Model requested %d tool call(s).", len(tool_calls))
+                async for event in self.tool_manager.astream_tool_call_sequence(
+                    response,
+                    return_tool_response_as_is,
+                    self.messages,
+                    self.model_name,
+                    reasoning_effort=params.get("reasoning_effort")
+                ):
+                    yield event
+                return
+
+            yield AgentEvent(AgentEvent.DONE, self._finish_task(response))
+
+    def task(self, user_task: str, tool_call_enabled: bool = True, return_tool_response_as_is: bool = False, reasoning_effort: Optional[str] = None) -> str:
+        """Process a user task and return the agent's response."""
+        return run_sync(self.atask(user_task, tool_call_enabled, return_tool_response_as_is, reasoning_effort))
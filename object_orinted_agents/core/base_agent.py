@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Dict, Iterator, Optional
+from object_orinted_agents.core.agent_event import AgentEvent, stream_completion
 from object_orinted_agents.core.agent_signeture import AgentSignature
 from object_orinted_agents.core.chat_message import ChatMessages
+from object_orinted_agents.core.prefetch import Prefetcher
+from object_orinted_agents.core.session_store import SessionStore
+from object_orinted_agents.core.summarizer import Summarizer
 from object_orinted_agents.services.language_model_interface import LanguageModelInterface  
 from object_orinted_agents.core.tool_manager import ToolManager
-from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.services.stream_accumulator import StreamAccumulator
+from object_orinted_agents.utils.logger import PAYLOAD, get_logger, truncate
+from object_orinted_agents.utils.tracing import get_tracer
 
 
 class BaseAgent(ABC):
@@ -13,15 +19,31 @@ class BaseAgent(ABC):
                  model_name: str,
                  logger=None,
                  language_model_interface: LanguageModelInterface = None,
-                 reasoning_effort: Optional[str] = None
+                 reasoning_effort: Optional[str] = None,
+                 token_budget: Optional[int] = None,
+                 summarizer: Optional[Summarizer] = None,
+                 session_store: Optional[SessionStore] = None,
+                 session_id: Optional[str] = None,
+                 prefetcher: Optional[Prefetcher] = None,
         ):
         self.developer_prompt = developer_prompt
         self.model_name = model_name
-        self.messages = ChatMessages(developer_prompt)
-        self.tool_manager : Optional[ToolManager] = None
         self.logger = logger or get_logger(self.__class__.__name__)
+        # token_budget bounds the history resent on every call; None keeps everything.
+        # With a session_store the history is persisted as it grows and resumed for a known session_id.
+        self.messages = ChatMessages(
+            developer_prompt,
+            token_budget=token_budget,
+            summarizer=summarizer,
+            logger=self.logger,
+            store=session_store,
+            session_id=session_id,
+        )
+        self.tool_manager : Optional[ToolManager] = None
         self.language_model_interface = language_model_interface
         self.reasoning_effort = reasoning_effort
+        # Sees every context and user message, so tools can start on the files they name right away.
+        self.prefetcher = prefetcher
 
     @abstractmethod
     def setup_tools(self) -> None:
@@ -31,17 +53,72 @@ class BaseAgent(ABC):
     def add_context(self, content: str) -> None:
         """Add context to the agent's message history."""
         self.messages.add_system_message(content)
-        self.logger.debug(f"Added context to messages: {content}")
+        self.logger.debug("Added context to messages: %s", truncate(content), extra=PAYLOAD)
+        if self.prefetcher is not None:
+            self.prefetcher.observe(content)
 
     def add_messages(self, content: str) -> None:
         """Add a message to the agent's message history."""
         self.messages.add_user_message(content)
-        self.logger.debug(f"Added user message: {content}")
+        self.logger.debug("Added user message: %s", truncate(content), extra=PAYLOAD)
+        if self.prefetcher is not None:
+            self.prefetcher.observe(content)
         
 
     def task(self, user_task: str, tool_call_enabled: bool = True, return_tool_response_as_is: bool = False, reasoning_effort: Optional[str] = None) -> str:
         """Process a user task and return the agent's response."""
-        self.logger.debug(f"Task method called with: {user_task}...")
+        with self._turn_span():
+            params = self._prepare_task(user_task, tool_call_enabled, reasoning_effort)
+
+            response = self.language_model_interface.generate_completion(**params)
+            tool_calls = response.choices[0].message.tool_calls
+            if tool_call_enabled and tool_calls and self.tool_manager:
+                self.logger.info("Model requested %d tool call(s).", len(tool_calls))
+                return self.tool_manager.handle_tool_call_sequence(
+                    response,
+                    return_tool_response_as_is,
+                    self.messages,
+                    self.model_name,
+                    reasoning_effort=params.get("reasoning_effort")
+                )
+
+            return self._finish_task(response)
+
+    def task_stream(self, user_task: str, tool_call_enabled: bool = True, return_tool_response_as_is: bool = False, reasoning_effort: Optional[str] = None) -> Iterator[AgentEvent]:
+        """
+        Process a user task, yielding the response as it is produced.
+
+        Yields ``text`` events for answer deltas, ``tool_start``/``tool_output``/``tool_end``
+        events around tool runs (``tool_output`` carries sandbox stdout), and finally a
+        ``done`` event whose content is the complete answer.
+        """
+        with self._turn_span(stream=True):
+            params = self._prepare_task(user_task, tool_call_enabled, reasoning_effort)
+
+            accumulator = StreamAccumulator()
+            yield from stream_completion(self.language_model_interface, params, accumulator)
+            response = accumulator.completion()
+
+            tool_calls = response.choices[0].message.tool_calls
+            if tool_call_enabled and tool_calls and self.tool_manager:
+                self.logger.info("Model requested %d tool call(s).", len(tool_calls))
+                yield from self.tool_manager.stream_tool_call_sequence(
+                    response,
+                    return_tool_response_as_is,
+                    self.messages,
+                    self.model_name,
+                    reasoning_effort=params.get("reasoning_effort")
+                )
+                return
+
+            yield AgentEvent(AgentEvent.DONE, self._finish_task(response))
+
+    def _turn_span(self, stream: bool = False):
+        """Span covering one ``task`` call, parent of the model, tool and sandbox spans it causes."""
+        return get_tracer().span("agent.turn", agent=self.__class__.__name__, model=self.model_name, stream=stream)
+
+    def _prepare_task(self, user_task: str, tool_call_enabled: bool, reasoning_effort: Optional[str]) -> Dict[str, Any]:
+        """Record the user message and build the completion request for a task."""
         final_reasoning_effort = reasoning_effort if reasoning_effort else self.reasoning_effort
 
         if self.language_model_interface is None:
@@ -49,9 +126,7 @@ class BaseAgent(ABC):
             self.logger.error(error_msg)
             raise ValueError(error_msg)
 
-        self.logger.debug(f"Language model interface: {self.language_model_interface}")
-        self.logger.debug(f"Task method called with: {user_task[:50]}...")
-        self.logger.debug(f"Starting task: {user_task} (tool_call_enabled={tool_call_enabled})")
+        self.logger.debug("Starting task with %s (tool_call_enabled=%s).", self.language_model_interface, tool_call_enabled)
 
         # Add user message
 
@@ -59,8 +134,8 @@ class BaseAgent(ABC):
 
         tools = []
         if tool_call_enabled and self.tool_manager:
-            tools = self.tool_manager.get_tool_definitions()
-            self.logger.debug(f"Available tools: {tools}")
+            tools = self.tool_manager.get_tool_definitions(query=user_task)
+            self.logger.debug("Available tools: %s", truncate(tools), extra=PAYLOAD)
 
         params = {
             "model": self.model_name,
@@ -70,27 +145,24 @@ class BaseAgent(ABC):
 
         if final_reasoning_effort:
             params["reasoning_effort"] = final_reasoning_effort
-        
-        response = self.language_model_interface.generate_completion(**params)
-        tool_calls = response.choices[0].message.tool_calls
-        if tool_call_enabled and tool_calls and self.tool_manager:
-            self.logger.info(f"Tool call detected in response: {tool_calls}")
-            return self.tool_manager.handle_tool_call_sequence(
-                response,
-                return_tool_response_as_is,
-                self.messages,
-                self.model_name,
-                reasoning_effort=final_reasoning_effort
-            )
-        
+        return params
+
+    def _finish_task(self, response) -> str:
         # No tool call mormal assistance response
-        final_message = response.choices[0].message.content
+        final_message = response.choices[0].message.content or ""
         self.messages.add_assistant_message(final_message)
-        self.logger.info(f"Assistant response: {final_message}")
+        self.logger.debug("Assistant response: %s", truncate(final_message), extra=PAYLOAD)
         self.logger.debug("Task completed successfully.")
 
         return final_message
 
+    def close(self) -> None:
+        """Release the agent's tools and cancel its prefetching. The agent should not be used afterwards."""
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        if self.tool_manager:
+            self.tool_manager.close()
+
     def get_agent_signature(self) -> AgentSignature:
         """Get the agent's signature."""
         signature_obj = AgentSignature(
@@ -1,19 +1,264 @@
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional
+
+from object_orinted_agents.core.session_store import SessionStore
+from object_orinted_agents.core.summarizer import Summarizer
+from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.token_counter import count_message_tokens, estimate_tokens
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
 
 
 class ChatMessages:
-    def __init__(self, developer_prompt: str):
-        self.messages: List[Dict[str, str]] = []
-        self.add_system_message(developer_prompt)
-    
-    def add_system_message(self, content: str):
-        self.messages.append({"role": "developer", "content": content})
+    """
+    Conversation history sent to the language model.
+
+    With a ``token_budget`` the history is kept under that many tokens. Token counts are
+    tracked per message as messages are added. When the budget is exceeded:
+
+    1. tool outputs from earlier turns are truncated to ``max_tool_output_tokens``;
+    2. the oldest turns are evicted and, if a ``summarizer`` is set, folded into a
+       pinned summary message;
+    3. tool outputs of the current turn are truncated, except the most recent one.
+
+    Developer/context messages are pinned and never evicted.
+
+    With a ``store`` every change is appended to the session's log as it happens, and
+    every ``compact_every`` changes the whole history is written as a snapshot that
+    replaces the log. Creating ``ChatMessages`` for a ``session_id`` the store already
+    has resumes that conversation (its saved developer prompt included) from the
+    snapshot and the few changes logged after it.
+    """
+
+    def __init__(
+        self,
+        developer_prompt: str,
+        token_budget: Optional[int] = None,
+        max_tool_output_tokens: int = 400,
+        summarizer: Optional[Summarizer] = None,
+        token_counter: Callable[[str], int] = estimate_tokens,
+        logger=None,
+        store: Optional[SessionStore] = None,
+        session_id: Optional[str] = None,
+        compact_every: int = 200,
+    ):
+        self.messages: List[Dict[str, Any]] = []
+        self.token_budget = token_budget
+        self.max_tool_output_tokens = max_tool_output_tokens
+        self.summarizer = summarizer
+        self.token_counter = token_counter
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.total_tokens = 0
+        self.evicted_messages = 0
+        self._token_counts: List[int] = []
+        self._pinned: List[bool] = []
+        self._summary: Optional[str] = None
+        if store is not None and not session_id:
+            raise ValueError("A session_id is required to persist messages to a store.")
+        self.store = store
+        self.session_id = session_id
+        self.compact_every = compact_every
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._restoring = False
+        saved = store.load(session_id) if store is not None else None
+        if saved is not None:
+            self._restore(*saved)
+            self.logger.debug("Resumed session %s with %s messages.", session_id, len(self.messages))
+        else:
+            self.add_system_message(developer_prompt)
+
+    def add_system_message(self, content: str, pinned: bool = True):
+        self._append({"role": "developer", "content": content}, pinned)
 
     def add_user_message(self, content: str):
-        self.messages.append({"role": "user", "content": content})
+        self._append({"role": "user", "content": content})
 
     def add_assistant_message(self, content: str):
-        self.messages.append({"role": "assistant", "content": content})
+        self._append({"role": "assistant", "content": content})
+
+    def add_assistant_tool_calls(self, message: Any):
+        """Add an assistant message that requested tool calls, converted from the SDK object to a plain dict."""
+        self._append({
+            "role": "assistant",
+            "content": message.content,
+            "tool_calls": [
+                {
+                    "id": tool_call.id,
+                    "type": "function",
+                    "function": {
+                        "name": tool_call.function.name,
+                        "arguments": tool_call.function.arguments,
+                    },
+                }
+                for tool_call in message.tool_calls
+            ],
+        })
+
+    def add_tool_message(self, content: str, tool_call_id: str):
+        self._append({"role": "tool", "content": content, "tool_call_id": tool_call_id})
+
+    def get_messages(self) -> List[Dict[str, Any]]:
+        return self.messages
+
+    def to_state(self) -> Dict[str, Any]:
+        """The whole history as JSON-serializable data, as stored in snapshots."""
+        return {
+            "seq": self._seq,
+            "messages": self.messages,
+            "pinned": self._pinned,
+            "summary": self._summary,
+            "evicted_messages": self.evicted_messages,
+        }
+
+    def compact(self) -> None:
+        """Snapshot the history to the store, replacing the log records it covers."""
+        if self.store is None:
+            return
+        self.store.snapshot(self.session_id, self.to_state())
+        self._snapshot_seq = self._seq
+
+    def _restore(self, snapshot: Optional[Dict[str, Any]], records: List[Dict[str, Any]]) -> None:
+        self._restoring = True
+        try:
+            if snapshot is not None:
+                for message, pinned in zip(snapshot["messages"], snapshot["pinned"]):
+                    self._insert(len(self.messages), message, pinned)
+                self._summary = snapshot.get("summary")
+                self.evicted_messages = snapshot.get("evicted_messages", 0)
+                self._seq = self._snapshot_seq = snapshot["seq"]
+            for record in records:
+                self._apply(record)
+                self._seq = record["seq"]
+        finally:
+            self._restoring = False
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        # Replays one logged change; budget enforcement is not rerun, its effects were logged too.
+        op = record["op"]
+        if op == "insert":
+            self._insert(record["index"], record["message"], record.get("pinned", False))
+        elif op == "replace":
+            self._replace(record["index"], record["message"])
+        elif op == "remove":
+            self._remove(record["index"])
+        elif op == "evicted":
+            self.evicted_messages = record["evicted_messages"]
+            self._summary = record.get("summary")
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        if self.store is None or self._restoring:
+            return
+        self._seq += 1
+        self.store.append(self.session_id, {"seq": self._seq, **record})
+        if self._seq - self._snapshot_seq >= self.compact_every:
+            self.compact()
+
+    def _append(self, message: Dict[str, Any], pinned: bool = False) -> None:
+        self._insert(len(self.messages), message, pinned)
+        if self.token_budget is not None and self.total_tokens > self.token_budget:
+            self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        current_turn = self._current_turn_start()
+
+        for index in range(current_turn):
+            if self.total_tokens <= self.token_budget:
+                return
+            self._truncate_tool_output(index)
+
+        if self.total_tokens > self.token_budget:
+            self._evict_old_turns()
+
+        current_turn = self._current_turn_start()
+        last_tool = max((i for i, m in enumerate(self.messages) if m["role"] == "tool"), default=None)
+        for index in range(current_turn, len(self.messages)):
+            if self.total_tokens <= self.token_budget:
+                return
+            if index != last_tool:
+                self._truncate_tool_output(index)
+
+        if self.total_tokens > self.token_budget:
+            self.logger.debug("Conversation is %s tokens, over its budget of %s, after eviction.", self.total_tokens, self.token_budget)
+
+    def _current_turn_start(self) -> int:
+        for index in range(len(self.messages) - 1, -1, -1):
+            if self.messages[index]["role"] == "user":
+                return index
+        return len(self.messages)
+
+    def _truncate_tool_output(self, index: int) -> None:
+        message = self.messages[index]
+        if message["role"] != "tool" or self._token_counts[index] <= self.max_tool_output_tokens:
+            return
+        content = str(message.get("content") or "")
+        # Keep the head and the tail: headers and final results are usually the useful parts.
+        keep_chars = self.max_tool_output_tokens * 2
+        if len(content) <= keep_chars * 2:
+            return
+        omitted = len(content) - keep_chars * 2
+        truncated = f"{content[:keep_chars]}\n...[{omitted} characters truncated]...\n{content[-keep_chars:]}"
+        self._replace(index, {**message, "content": truncated})
+
+    def _evict_old_turns(self) -> None:
+        """Drop whole turns (a user message up to the next one), oldest first, keeping the current turn."""
+        evicted: List[Dict[str, Any]] = []
+        while self.total_tokens > self.token_budget:
+            turn = self._oldest_evictable_turn()
+            if turn is None:
+                break
+            start, end = turn
+            for index in range(end - 1, start - 1, -1):
+                if self._pinned[index]:
+                    continue
+                evicted.insert(0, self.messages[index])
+                self._remove(index)
+        if not evicted:
+            return
+
+        self.evicted_messages += len(evicted)
+        self.logger.debug("Evicted %s messages; conversation is now %s tokens.", len(evicted), self.total_tokens)
+        if self.summarizer is not None:
+            self._summary = self.summarizer.summarize(self._summary, evicted)
+            self._set_summary_message(SUMMARY_PREFIX + self._summary)
+        self._record({"op": "evicted", "evicted_messages": self.evicted_messages, "summary": self._summary})
+
+    def _oldest_evictable_turn(self):
+        user_indexes = [i for i, m in enumerate(self.messages) if m["role"] == "user" and not self._pinned[i]]
+        if len(user_indexes) < 2:
+            return None
+        return user_indexes[0], user_indexes[1]
+
+    def _set_summary_message(self, content: str) -> None:
+        for index, message in enumerate(self.messages):
+            if self._pinned[index] and str(message.get("content", "")).startswith(SUMMARY_PREFIX):
+                self._replace(index, {"role": "developer", "content": content})
+                return
+        # Place the summary after the pinned prefix (developer prompt and context).
+        position = 0
+        while position < len(self.messages) and self._pinned[position]:
+            position += 1
+        self._insert(position, {"role": "developer", "content": content}, True)
+
+    # All changes to the history go through _insert, _replace and _remove, which log them.
+
+    def _insert(self, index: int, message: Dict[str, Any], pinned: bool) -> None:
+        tokens = count_message_tokens(message, self.token_counter)
+        self.messages.insert(index, message)
+        self._token_counts.insert(index, tokens)
+        self._pinned.insert(index, pinned)
+        self.total_tokens += tokens
+        self._record({"op": "insert", "index": index, "message": message, "pinned": pinned})
+
+    def _replace(self, index: int, message: Dict[str, Any]) -> None:
+        tokens = count_message_tokens(message, self.token_counter)
+        self.total_tokens += tokens - self._token_counts[index]
+        self.messages[index] = message
+        self._token_counts[index] = tokens
+        self._record({"op": "replace", "index": index, "message": message})
 
-    def get_messages(self) -> List[Dict[str, str]]:
-        return self.messages
\ No newline at end of file
+    def _remove(self, index: int) -> None:
+        self.total_tokens -= self._token_counts[index]
+        del self.messages[index]
+        del self._token_counts[index]
+        del self._pinned[index]
+        self._record({"op": "remove", "index": index})
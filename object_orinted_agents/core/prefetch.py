@@ -0,0 +1,139 @@
+import concurrent.futures
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from object_orinted_agents.datasets import formats
+from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.tracing import get_tracer
+
+_EXTENSIONS = "|".join(re.escape(extension) for extension in sorted(formats.EXTENSIONS, key=len, reverse=True))
+_DATASET_NAME = re.compile(rf"[\w./-]*\w(?:{_EXTENSIONS})\b", re.IGNORECASE)
+
+
+def dataset_mentions(text: str) -> List[str]:
+    """File names with a supported dataset extension in ``text``, in order of first mention."""
+    names: List[str] = []
+    for match in _DATASET_NAME.finditer(text or ""):
+        if match.group(0) not in names:
+            names.append(match.group(0))
+    return names
+
+
+class Prefetcher:
+    """
+    Background work for one session, started as soon as it is likely to be needed instead
+    of when a tool call asks for it: staging and profiling a data file named in the
+    conversation while the model is still answering, starting the kernel, loading a
+    staged file into it.
+
+    Jobs are futures keyed by ``(kind, subject)``. Submitting a key whose job is running
+    or has succeeded returns that job, and the tool call that needs its result ``join``s
+    it. Tools take part through listeners: ``observe`` calls the ``"mention"`` listeners
+    with every dataset file a message names, and tools ``notify`` each other, e.g. the
+    file tool announces ``"staged"`` files for the interpreter to load. ``close`` cancels
+    jobs that have not started; jobs already running finish, but nothing waits for them.
+
+    Args:
+        max_workers (int): Jobs run at the same time.
+    """
+
+    def __init__(self, max_workers: int = 2, logger=None):
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._futures: Dict[Tuple[str, str], Future] = {}
+        self._listeners: Dict[str, List[Callable[..., Any]]] = {}
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def add_listener(self, event: str, listener: Callable[..., Any]) -> None:
+        self._listeners.setdefault(event, []).append(listener)
+
+    def notify(self, event: str, *args) -> List[Any]:
+        """Call the listeners of ``event`` and return what they returned, leaving out None and failures."""
+        results = []
+        for listener in self._listeners.get(event, []):
+            try:
+                result = listener(*args)
+            except Exception as e:
+                self.logger.warning("Prefetch listener for %s failed: %s", event, e)
+                continue
+            if result is not None:
+                results.append(result)
+        return results
+
+    def observe(self, text: str) -> List[str]:
+        """Tell the ``"mention"`` listeners about the dataset files ``text`` names, and return the names."""
+        names = dataset_mentions(text)
+        for name in names:
+            self.notify("mention", name)
+        return names
+
+    def submit(self, kind: str, subject: str, function: Callable[..., Any], *args) -> Optional[Future]:
+        """
+        Run ``function(*args)`` in the background unless a job for ``(kind, subject)`` is
+        running or has succeeded. Returns the job, or None once the prefetcher is closed.
+        """
+        key = (kind, subject)
+        with self._lock:
+            if self.closed:
+                return None
+            future = self._futures.get(key)
+            if future is not None and not (future.done() and (future.cancelled() or future.exception() is not None)):
+                return future
+            future = self._executor.submit(self._run, kind, subject, function, *args)
+            self._futures[key] = future
+            return future
+
+    def join(self, kind: str, subject: str, timeout: Optional[float] = None) -> Any:
+        """
+        The result of the job for ``(kind, subject)``, waiting for it if it is still running.
+
+        Returns None if there is no such job or it failed or was cancelled, so the caller
+        does the work itself; jobs that are joined should therefore not return None.
+        """
+        with self._lock:
+            future = self._futures.get((kind, subject))
+        if future is None:
+            return None
+        try:
+            return future.result(timeout)
+        except Exception:
+            return None
+
+    def wait(self, kind: str, timeout: Optional[float] = None) -> None:
+        """Wait for every job of ``kind`` submitted so far, whatever its outcome."""
+        with self._lock:
+            futures = [future for (job_kind, _), future in self._futures.items() if job_kind == kind]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Future.result, unlike concurrent.futures.wait, also returns for jobs cancelled by ``close``.
+        for future in futures:
+            try:
+                future.result(None if deadline is None else max(deadline - time.monotonic(), 0))
+            except concurrent.futures.TimeoutError:
+                return
+            except BaseException:
+                continue
+
+    def close(self) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            cancelled = sum(future.cancel() for future in self._futures.values())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if cancelled:
+            self.logger.debug("Cancelled %d prefetch jobs.", cancelled)
+
+    def _run(self, kind: str, subject: str, function: Callable[..., Any], *args) -> Any:
+        started = time.perf_counter()
+        with get_tracer().span(f"prefetch.{kind}", subject=subject):
+            try:
+                result = function(*args)
+            except Exception as e:
+                self.logger.warning("Prefetching %s %s failed: %s", kind, subject, e)
+                raise
+        self.logger.debug("Prefetched %s %s in %.2fs", kind, subject, time.perf_counter() - started)
+        return result
@@ -0,0 +1,208 @@
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+SessionState = Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]
+
+
+def _check_session_id(session_id: str) -> str:
+    if not session_id or not _SESSION_ID.match(session_id) or session_id.startswith("."):
+        raise ValueError(f"Invalid session id {session_id!r}; use letters, digits, '-', '_' and '.'.")
+    return session_id
+
+
+class SessionStore(ABC):
+    """
+    Durable history of ``ChatMessages`` sessions.
+
+    A session is a snapshot of the full state plus an append-only log of the changes made
+    since. Every record carries a sequence number ``seq``; a snapshot stores the ``seq`` of
+    the last change it includes, and ``load`` returns only the log records after it.
+    Writing a snapshot compacts the log.
+    """
+
+    @abstractmethod
+    def append(self, session_id: str, record: Dict[str, Any]) -> None:
+        """Durably add one change record to the session's log."""
+        pass
+
+    @abstractmethod
+    def snapshot(self, session_id: str, state: Dict[str, Any]) -> None:
+        """Replace the session's snapshot with ``state`` and drop the log records it covers."""
+        pass
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[SessionState]:
+        """Return ``(snapshot or None, log records after it)``, or None for an unknown session."""
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def list_sessions(self) -> List[str]:
+        pass
+
+    def exists(self, session_id: str) -> bool:
+        return self.load(session_id) is not None
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlSessionStore(SessionStore):
+    """
+    One directory, two files per session: ``<id>.log.jsonl`` gets a line per change and
+    ``<id>.snapshot.json`` is replaced atomically on compaction.
+
+    Args:
+        directory (str): Where session files are kept.
+        fsync (bool): Flush every appended record to disk, trading latency for durability
+            across power loss (a process crash loses nothing either way).
+    """
+
+    def __init__(self, directory: str, fsync: bool = False):
+        self.directory = directory
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, session_id: str, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock, open(self._log_path(session_id), "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def snapshot(self, session_id: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".snapshot-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(state, f, ensure_ascii=False, default=str)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self._snapshot_path(session_id))
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            # A crash before this truncation is harmless: load skips records the snapshot covers.
+            open(self._log_path(session_id), "w").close()
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        snapshot_path, log_path = self._snapshot_path(session_id), self._log_path(session_id)
+        if not os.path.exists(snapshot_path) and not os.path.exists(log_path):
+            return None
+        snapshot = None
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        covered = snapshot["seq"] if snapshot else 0
+        records = []
+        if os.path.exists(log_path):
+            with open(log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A crash mid-write can leave a partial last line.
+                        continue
+                    if record["seq"] > covered:
+                        records.append(record)
+        return snapshot, records
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            for path in (self._snapshot_path(session_id), self._log_path(session_id)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def list_sessions(self) -> List[str]:
+        suffixes = (".log.jsonl", ".snapshot.json")
+        return sorted({
+            name[:-len(suffix)]
+            for name in os.listdir(self.directory)
+            for suffix in suffixes
+            if name.endswith(suffix) and not name.startswith(".")
+        })
+
+    def _log_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, _check_session_id(session_id) + ".log.jsonl")
+
+    def _snapshot_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, _check_session_id(session_id) + ".snapshot.json")
+
+
+class SQLiteSessionStore(SessionStore):
+    """All sessions in one SQLite database; a snapshot and its compaction commit together."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS session_log (session_id TEXT NOT NULL, seq INTEGER NOT NULL, record TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, seq))"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS session_snapshots (session_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, state TEXT NOT NULL)"
+        )
+        self._connection.commit()
+
+    def append(self, session_id: str, record: Dict[str, Any]) -> None:
+        payload = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO session_log (session_id, seq, record) VALUES (?, ?, ?)",
+                (session_id, record["seq"], payload),
+            )
+            self._connection.commit()
+
+    def snapshot(self, session_id: str, state: Dict[str, Any]) -> None:
+        payload = json.dumps(state, ensure_ascii=False, default=str)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO session_snapshots (session_id, seq, state) VALUES (?, ?, ?)",
+                (session_id, state["seq"], payload),
+            )
+            self._connection.execute("DELETE FROM session_log WHERE session_id = ? AND seq <= ?", (session_id, state["seq"]))
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            row = self._connection.execute("SELECT seq, state FROM session_snapshots WHERE session_id = ?", (session_id,)).fetchone()
+            covered = row[0] if row else 0
+            rows = self._connection.execute(
+                "SELECT record FROM session_log WHERE session_id = ? AND seq > ? ORDER BY seq", (session_id, covered)
+            ).fetchall()
+        if row is None and not rows:
+            return None
+        return (json.loads(row[1]) if row else None), [json.loads(record) for (record,) in rows]
+
+    def delete(self, session_id: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM session_log WHERE session_id = ?", (session_id,))
+            self._connection.execute("DELETE FROM session_snapshots WHERE session_id = ?", (session_id,))
+
+    def list_sessions(self) -> List[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT session_id FROM session_snapshots UNION SELECT session_id FROM session_log ORDER BY session_id"
+            ).fetchall()
+        return [session_id for (session_id,) in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
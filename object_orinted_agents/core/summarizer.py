@@ -0,0 +1,68 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from object_orinted_agents.services.language_model_interface import LanguageModelInterface
+
+
+class Summarizer(ABC):
+    """Condenses conversation turns evicted from a token-budgeted ``ChatMessages``."""
+
+    @abstractmethod
+    def summarize(self, previous_summary: Optional[str], evicted_messages: List[Dict[str, Any]]) -> str:
+        """
+        Return an updated summary of the conversation so far.
+
+        Args:
+            previous_summary (Optional[str]): Summary of turns evicted earlier, if any.
+            evicted_messages (List[Dict[str, Any]]): Messages that were just evicted, oldest first.
+
+        Returns:
+            str: Summary covering both.
+        """
+        pass
+
+
+class ExtractiveSummarizer(Summarizer):
+    """Keeps the start of each user question and assistant answer. Cheap and needs no model call."""
+
+    def __init__(self, max_chars_per_message: int = 200, max_chars: int = 4000):
+        self.max_chars_per_message = max_chars_per_message
+        self.max_chars = max_chars
+
+    def summarize(self, previous_summary: Optional[str], evicted_messages: List[Dict[str, Any]]) -> str:
+        lines = [previous_summary] if previous_summary else []
+        for message in evicted_messages:
+            content = message.get("content")
+            if message.get("role") not in ("user", "assistant") or not content:
+                continue
+            text = " ".join(str(content).split())
+            if len(text) > self.max_chars_per_message:
+                text = text[:self.max_chars_per_message] + "..."
+            lines.append(f"{message['role']}: {text}")
+        summary = "\n".join(lines)
+        # Keep the most recent part when the summary itself outgrows its budget.
+        return summary[-self.max_chars:]
+
+
+class LanguageModelSummarizer(Summarizer):
+    """Asks a (preferably small, fast) model to fold evicted turns into a running summary."""
+
+    def __init__(self, language_model_interface: LanguageModelInterface, model_name: str = "gpt-4o-mini", max_words: int = 200):
+        self.language_model_interface = language_model_interface
+        self.model_name = model_name
+        self.max_words = max_words
+
+    def summarize(self, previous_summary: Optional[str], evicted_messages: List[Dict[str, Any]]) -> str:
+        transcript = "\n".join(
+            f"{message.get('role')}: {message.get('content')}" for message in evicted_messages if message.get("content")
+        )
+        prompt = (
+            f"Update the summary of a data analysis conversation in at most {self.max_words} words. "
+            "Keep facts, numbers, variable names and conclusions; drop raw tables and code.\n\n"
+            f"Current summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}"
+        )
+        response = self.language_model_interface.generate_completion(
+            model=self.model_name,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return response.choices[0].message.content or (previous_summary or "")
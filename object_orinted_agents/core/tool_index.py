@@ -0,0 +1,60 @@
+import math
+import re
+from typing import Any, Dict, List, Set
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str) -> Set[str]:
+    return {word for word in _WORD.findall(text.lower()) if len(word) > 2}
+
+
+def _definition_words(definition: Dict[str, Any]) -> Set[str]:
+    # The name is split on underscores too, so "safe_read_file" matches "read" and "file".
+    words = _words(definition.get("name", "").replace("_", " "))
+    words |= _words(definition.get("description", ""))
+    for name, schema in (definition.get("parameters") or {}).get("properties", {}).items():
+        words |= _words(name.replace("_", " "))
+        words |= _words(str(schema.get("description", "")))
+    return words
+
+
+class ToolRelevanceIndex:
+    """
+    Ranks tools against a request by the words they share, weighted by how few tools use
+    each word (inverse document frequency). Cheap enough to run on every turn; no model
+    call or embedding.
+    """
+
+    def __init__(self):
+        self._words: Dict[str, Set[str]] = {}
+        self._weights: Dict[str, float] = {}
+
+    def add(self, name: str, definition: Dict[str, Any]) -> None:
+        self._words[name] = _definition_words(definition)
+        self._reweight()
+
+    def remove(self, name: str) -> None:
+        self._words.pop(name, None)
+        self._reweight()
+
+    def rank(self, query: str, limit: int) -> List[str]:
+        """
+        Names of the ``limit`` tools most relevant to ``query``, best first. Tools sharing
+        no word with the query are left out, so the result may be shorter or empty.
+        """
+        query_words = _words(query)
+        scores = []
+        for position, (name, words) in enumerate(self._words.items()):
+            score = sum(self._weights[word] for word in query_words & words)
+            if score > 0:
+                scores.append((-score, position, name))
+        return [name for _, _, name in sorted(scores)[:limit]]
+
+    def _reweight(self) -> None:
+        counts: Dict[str, int] = {}
+        for words in self._words.values():
+            for word in words:
+                counts[word] = counts.get(word, 0) + 1
+        total = len(self._words)
+        self._weights = {word: math.log(1 + total / count) for word, count in counts.items()}
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 class ToolInterface(ABC):
     @abstractmethod
@@ -30,4 +31,26 @@ class ToolInterface(ABC):
         """
         pass
 
-    
+    async def aexecute(self, arguments: Dict[str, Any]) -> Any:
+        """
+        Asynchronous variant of ``execute``.
+
+        By default the blocking ``execute`` is offloaded to a worker thread. Tools with
+        native async I/O can override this.
+        """
+        return await asyncio.to_thread(self.execute, arguments)
+
+    def execute_streaming(self, arguments: Dict[str, Any], on_output: Callable[[str], None]) -> Any:
+        """
+        Execute the tool, reporting intermediate output (e.g. sandbox stdout) as it is produced.
+
+        Tools without incremental output just run ``execute``.
+
+        Args:
+            arguments (Dict[str, Any]): The arguments required to execute the tool's function.
+            on_output (Callable[[str], None]): Called with each piece of output.
+
+        Returns:
+            Any: The complete result, as returned by ``execute``.
+        """
+        return self.execute(arguments)
@@ -1,30 +1,123 @@
 from object_orinted_agents.services.language_model_interface import LanguageModelInterface
-from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.logger import PAYLOAD, get_logger, truncate
 from object_orinted_agents.core.tool_interface import ToolInterface
 from object_orinted_agents.core.chat_message import ChatMessages
-from typing import Optional
+from object_orinted_agents.core.agent_event import AgentEvent, astream_completion, stream_completion
+from object_orinted_agents.core.tool_index import ToolRelevanceIndex
+from object_orinted_agents.services.stream_accumulator import StreamAccumulator
+from object_orinted_agents.utils.tracing import get_tracer
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import contextvars
 import json
+import queue
+import time
 
 class ToolManager:
-    def __init__(self, logger=None, language_model_interface: LanguageModelInterface = None):
+    """
+    Registers tools and runs the tool-call loop for an agent turn.
+
+    Every tool call in a model response is executed, concurrently when there are
+    several, and the model is called again with all results until it answers
+    without calling tools, or the step/time budget is used up.
+
+    Tool definitions are built once, when a tool is registered, in a canonical form
+    (sorted keys, registration order), so every request carries byte-identical tool
+    schemas and provider-side prompt caching can reuse them.
+
+    Args:
+        max_steps (int): Maximum number of tool-calling rounds per turn.
+        time_budget (Optional[float]): Seconds after which no further tool rounds are started.
+        max_parallel_tools (int): Maximum number of tool calls executed at the same time.
+        max_tools_per_turn (Optional[int]): Send only this many tools per turn, those most
+            relevant to the user's message. None sends every tool.
+    """
+
+    def __init__(
+        self,
+        logger=None,
+        language_model_interface: LanguageModelInterface = None,
+        max_steps: int = 8,
+        time_budget: Optional[float] = None,
+        max_parallel_tools: int = 8,
+        max_tools_per_turn: Optional[int] = None,
+    ):
         self.tools = {}
         self.logger = logger or get_logger(__name__)
         self.language_model_interface = language_model_interface
+        self.max_steps = max_steps
+        self.time_budget = time_budget
+        self.max_parallel_tools = max_parallel_tools
+        self.max_tools_per_turn = max_tools_per_turn
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        self._all_definitions: List[Dict[str, Any]] = []
+        self._definitions_json = "[]"
+        self._subsets: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        self._index = ToolRelevanceIndex()
 
     def register_tool(self, tool: ToolInterface) -> None:
         tool_def = tool.get_defination()
         tool_name = tool_def["function"]["name"]
+        # A canonical deep copy: later changes to the tool's own dict cannot leak into requests.
+        definition = json.loads(json.dumps(tool_def["function"], sort_keys=True))
         self.tools[tool_name] = tool
-        self.logger.info(f"Registered tool: {tool_name} and its defination: {tool_def}")
+        self._definitions[tool_name] = definition
+        self._index.add(tool_name, definition)
+        self._rebuild_definitions()
+        self.logger.info("Registered tool: %s", tool_name)
+        self.logger.debug("Defination of %s: %s", tool_name, truncate(tool_def), extra=PAYLOAD)
+
+    def unregister_tool(self, tool_name: str) -> None:
+        if tool_name not in self.tools:
+            raise ValueError(f"Tool '{tool_name}' not found.")
+        del self.tools[tool_name]
+        del self._definitions[tool_name]
+        self._index.remove(tool_name)
+        self._rebuild_definitions()
+        self.logger.info("Unregistered tool: %s", tool_name)
+
+    def _rebuild_definitions(self) -> None:
+        self._all_definitions = list(self._definitions.values())
+        self._definitions_json = json.dumps(self._all_definitions, sort_keys=True, separators=(",", ":"))
+        self._subsets = {}
+
+    def close(self) -> None:
+        """Stop the tool-call threads and release tool resources (e.g. kernels a tool started)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        for tool in self.tools.values():
+            close = getattr(tool, "close", None)
+            if callable(close):
+                close()
 
-    def get_tool_definitions(self):
+    def get_tool_definitions(self, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Function definitions of the registered tools, as precomputed at registration.
 
-        definations = []
-        for name, tool in self.tools.items():
-            tool_def = tool.get_defination()["function"]
-            self.logger.debug(f"Tool name: {name}, Defination: {tool_def}")
-            definations.append(tool_def)
-        return definations
+        The same list is returned until a tool is registered or unregistered, so callers
+        must not modify it. With ``max_tools_per_turn`` set and a ``query`` (the user's
+        message), only the tools most relevant to it are returned, still in registration
+        order; a query that matches no tool gets all of them.
+        """
+        if query is None or self.max_tools_per_turn is None or len(self._all_definitions) <= self.max_tools_per_turn:
+            return self._all_definitions
+        relevant = set(self._index.rank(query, self.max_tools_per_turn))
+        if not relevant:
+            return self._all_definitions
+        key = tuple(name for name in self._definitions if name in relevant)
+        subset = self._subsets.get(key)
+        if subset is None:
+            if len(self._subsets) >= 256:
+                self._subsets = {}
+            subset = self._subsets[key] = [self._definitions[name] for name in key]
+        return subset
+
+    def tool_definitions_json(self) -> str:
+        """All tool definitions serialized once, canonically; stable across calls and processes."""
+        return self._definitions_json
     
     def handle_tool_call_sequence(
             self,
@@ -35,54 +128,302 @@ class ToolManager:
             reasoning_effort: Optional[str] = None,
         ) -> str:
 
-        first_tool_call = response.choices[0].message.tool_calls[0]
-        tool_name = first_tool_call.function.name
-        self.logger.info(f"Handing tool call : {tool_name}")
+        deadline = None if self.time_budget is None else time.monotonic() + self.time_budget
+        steps = 0
+        while True:
+            tool_calls = response.choices[0].message.tool_calls
+            if not tool_calls or self._budget_exhausted(steps, deadline):
+                return self._finish(response, messages)
+
+            # 1. Invoke every requested tool
+            tool_responses = self._execute_tool_calls(tool_calls)
+
+            if return_tool_response_as_is:
+                return self._return_as_is(tool_responses, messages)
+
+            self._record_tool_round(response, tool_calls, tool_responses, messages)
+            steps += 1
+
+            # 2. Ask the model to continue; it may call more tools
+            param = self._follow_up_params(messages, model_name, reasoning_effort, steps, deadline)
+            response = self.language_model_interface.generate_completion(**param)
+
+    async def ahandle_tool_call_sequence(
+            self,
+            response,
+            return_tool_response_as_is: bool,
+            messages: ChatMessages,
+            model_name: str,
+            reasoning_effort: Optional[str] = None,
+        ) -> str:
+        """Async variant of ``handle_tool_call_sequence``. Tools are awaited via ``aexecute``."""
+
+        deadline = None if self.time_budget is None else time.monotonic() + self.time_budget
+        steps = 0
+        while True:
+            tool_calls = response.choices[0].message.tool_calls
+            if not tool_calls or self._budget_exhausted(steps, deadline):
+                return self._finish(response, messages)
+
+            tool_responses = await self._aexecute_tool_calls(tool_calls)
+
+            if return_tool_response_as_is:
+                return self._return_as_is(tool_responses, messages)
+
+            self._record_tool_round(response, tool_calls, tool_responses, messages)
+            steps += 1
+
+            param = self._follow_up_params(messages, model_name, reasoning_effort, steps, deadline)
+            response = await self.language_model_interface.agenerate_completion(**param)
+
+    def stream_tool_call_sequence(
+            self,
+            response,
+            return_tool_response_as_is: bool,
+            messages: ChatMessages,
+            model_name: str,
+            reasoning_effort: Optional[str] = None,
+        ) -> Iterator[AgentEvent]:
+        """
+        Streaming variant of ``handle_tool_call_sequence``.
+
+        Yields ``tool_start``/``tool_output``/``tool_end`` events while tools run, ``text``
+        events while the model answers, and a final ``done`` event with the answer.
+        """
+
+        deadline = None if self.time_budget is None else time.monotonic() + self.time_budget
+        steps = 0
+        while True:
+            tool_calls = response.choices[0].message.tool_calls
+            if not tool_calls or self._budget_exhausted(steps, deadline):
+                yield AgentEvent(AgentEvent.DONE, self._finish(response, messages))
+                return
+
+            tool_responses = {}
+            for event in self._stream_tool_calls(tool_calls):
+                if event.type == AgentEvent.TOOL_END:
+                    tool_responses[event.tool_call_id] = event.content
+                yield event
+            ordered_responses = [tool_responses[tool_call.id] for tool_call in tool_calls]
+
+            if return_tool_response_as_is:
+                yield AgentEvent(AgentEvent.DONE, self._return_as_is(ordered_responses, messages))
+                return
 
-        args = json.loads(first_tool_call.function.arguments)
-        self.logger.debug(f"Tool call arguments: {args}")
+            self._record_tool_round(response, tool_calls, ordered_responses, messages)
+            steps += 1
+
+            param = self._follow_up_params(messages, model_name, reasoning_effort, steps, deadline)
+            accumulator = StreamAccumulator()
+            yield from stream_completion(self.language_model_interface, param, accumulator)
+            response = accumulator.completion()
+
+    async def astream_tool_call_sequence(
+            self,
+            response,
+            return_tool_response_as_is: bool,
+            messages: ChatMessages,
+            model_name: str,
+            reasoning_effort: Optional[str] = None,
+        ) -> AsyncIterator[AgentEvent]:
+        """Async variant of ``stream_tool_call_sequence``."""
+
+        deadline = None if self.time_budget is None else time.monotonic() + self.time_budget
+        steps = 0
+        while True:
+            tool_calls = response.choices[0].message.tool_calls
+            if not tool_calls or self._budget_exhausted(steps, deadline):
+                yield AgentEvent(AgentEvent.DONE, self._finish(response, messages))
+                return
+
+            tool_responses = {}
+            async for event in self._astream_tool_calls(tool_calls):
+                if event.type == AgentEvent.TOOL_END:
+                    tool_responses[event.tool_call_id] = event.content
+                yield event
+            ordered_responses = [tool_responses[tool_call.id] for tool_call in tool_calls]
+
+            if return_tool_response_as_is:
+                yield AgentEvent(AgentEvent.DONE, self._return_as_is(ordered_responses, messages))
+                return
+
+            self._record_tool_round(response, tool_calls, ordered_responses, messages)
+            steps += 1
+
+            param = self._follow_up_params(messages, model_name, reasoning_effort, steps, deadline)
+            accumulator = StreamAccumulator()
+            async for event in astream_completion(self.language_model_interface, param, accumulator):
+                yield event
+            response = accumulator.completion()
+
+    def _stream_tool_calls(self, tool_calls) -> Iterator[AgentEvent]:
+        events = queue.Queue()
+
+        def run(tool_call) -> None:
+            events.put(self._tool_start_event(tool_call))
+            on_output = lambda text: events.put(AgentEvent(AgentEvent.TOOL_OUTPUT, text, tool_call.function.name, tool_call.id))
+            tool_response = self._execute_tool_call(tool_call, on_output)
+            events.put(AgentEvent(AgentEvent.TOOL_END, str(tool_response), tool_call.function.name, tool_call.id))
+
+        for tool_call in tool_calls:
+            self._submit(run, tool_call)
+
+        finished = 0
+        while finished < len(tool_calls):
+            event = events.get()
+            if event.type == AgentEvent.TOOL_END:
+                finished += 1
+            yield event
+
+    async def _astream_tool_calls(self, tool_calls) -> AsyncIterator[AgentEvent]:
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_parallel_tools)
+
+        async def run(tool_call) -> None:
+            async with semaphore:
+                events.put_nowait(self._tool_start_event(tool_call))
+                on_output = lambda text: loop.call_soon_threadsafe(
+                    events.put_nowait, AgentEvent(AgentEvent.TOOL_OUTPUT, text, tool_call.function.name, tool_call.id)
+                )
+                tool_response = await self._aexecute_tool_call(tool_call, on_output)
+                events.put_nowait(AgentEvent(AgentEvent.TOOL_END, str(tool_response), tool_call.function.name, tool_call.id))
+
+        tasks = [asyncio.ensure_future(run(tool_call)) for tool_call in tool_calls]
+        try:
+            finished = 0
+            while finished < len(tool_calls):
+                event = await events.get()
+                if event.type == AgentEvent.TOOL_END:
+                    finished += 1
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _tool_start_event(self, tool_call) -> AgentEvent:
+        return AgentEvent(AgentEvent.TOOL_START, "", tool_call.function.name, tool_call.id, tool_call.function.arguments)
+
+    def _execute_tool_calls(self, tool_calls) -> List[str]:
+        if len(tool_calls) == 1:
+            return [self._execute_tool_call(tool_calls[0])]
+        self.logger.info("Executing %s tool calls concurrently.", len(tool_calls))
+        futures = [self._submit(self._execute_tool_call, tool_call) for tool_call in tool_calls]
+        return [future.result() for future in futures]
+
+    def _submit(self, function: Callable, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_parallel_tools, thread_name_prefix="tool-call")
+        # Run in a copy of the caller's context so tool spans nest under the current turn.
+        return self._executor.submit(contextvars.copy_context().run, function, *args)
+
+    async def _aexecute_tool_calls(self, tool_calls) -> List[str]:
+        semaphore = asyncio.Semaphore(self.max_parallel_tools)
+
+        async def run(tool_call) -> str:
+            async with semaphore:
+                return await self._aexecute_tool_call(tool_call)
+
+        if len(tool_calls) > 1:
+            self.logger.info("Executing %s tool calls concurrently.", len(tool_calls))
+        return list(await asyncio.gather(*(run(tool_call) for tool_call in tool_calls)))
+
+    def _execute_tool_call(self, tool_call, on_output: Optional[Callable[[str], None]] = None) -> str:
+        with self._tool_span(tool_call) as span:
+            try:
+                tool, tool_name, args = self._resolve_tool_call(tool_call)
+                self.logger.info("Invoking tool: %s", tool_name)
+                if on_output:
+                    tool_response = tool.execute_streaming(args, on_output)
+                else:
+                    tool_response = tool.execute(args)
+            except Exception as e:
+                span.record_error(e)
+                return self._tool_error(tool_call, e)
+            span.set_attribute("output_chars", len(str(tool_response)))
+        self.logger.info("Tool '%s' executed successfully.", tool_name)
+        self.logger.debug("Response of %s: %s", tool_name, truncate(tool_response), extra=PAYLOAD)
+        return tool_response
+
+    async def _aexecute_tool_call(self, tool_call, on_output: Optional[Callable[[str], None]] = None) -> str:
+        with self._tool_span(tool_call) as span:
+            try:
+                tool, tool_name, args = self._resolve_tool_call(tool_call)
+                self.logger.info("Invoking tool: %s", tool_name)
+                if on_output and type(tool).execute_streaming is not ToolInterface.execute_streaming:
+                    tool_response = await asyncio.to_thread(tool.execute_streaming, args, on_output)
+                else:
+                    tool_response = await tool.aexecute(args)
+            except Exception as e:
+                span.record_error(e)
+                return self._tool_error(tool_call, e)
+            span.set_attribute("output_chars", len(str(tool_response)))
+        self.logger.info("Tool '%s' executed successfully.", tool_name)
+        self.logger.debug("Response of %s: %s", tool_name, truncate(tool_response), extra=PAYLOAD)
+        return tool_response
+
+    def _tool_span(self, tool_call):
+        return get_tracer().span("tool.execute", tool=tool_call.function.name, argument_chars=len(tool_call.function.arguments or ""))
+
+    def _resolve_tool_call(self, tool_call) -> Tuple[ToolInterface, str, Any]:
+        tool_name = tool_call.function.name
+        self.logger.debug("Handing tool call : %s", tool_name)
 
         if tool_name not in self.tools:
-            error_msg = f"Tool '{tool_name}' not found."
-            self.logger.error(error_msg)
-            raise ValueError(error_msg)
-
-        # 1. Invoke tool
-
-        self.logger.info(f"Invoking tool: {tool_name} with args: {args}")
-        tool_response = self.tools[tool_name].execute(args)
-        self.logger.info(f"Tool '{tool_name}' executed successfully with response: {tool_response}")
-
-        if return_tool_response_as_is:
-            self.logger.info(f"Returning tool response as-is without further LLM calls.")
-            messages.add_assistant_message(tool_response)
-            return tool_response
-
-        self.logger.debug(f"Tool call: {first_tool_call}")
-        function_call_result_message = {
-            "role" : "tool",
-            "content": tool_response,
-            "tool_call_id" : first_tool_call.id,
-        }
+            raise ValueError(f"Tool '{tool_name}' not found.")
+
+        args = json.loads(tool_call.function.arguments)
+        self.logger.debug("Tool call arguments: %s", truncate(args), extra=PAYLOAD)
+        return self.tools[tool_name], tool_name, args
+
+    def _tool_error(self, tool_call, error: Exception) -> str:
+        # Reported back to the model as the tool result so it can correct itself.
+        error_msg = f"Error: tool call '{tool_call.function.name}' failed: {error}"
+        self.logger.error(error_msg)
+        return error_msg
 
-        complete_payload = messages.get_messages()
-        complete_payload.append(response.choices[0].message)
-        complete_payload.append(function_call_result_message)
+    def _return_as_is(self, tool_responses: List[str], messages: ChatMessages) -> str:
+        self.logger.info("Returning tool response as-is without further LLM calls.")
+        tool_response = "\n\n".join(str(tool_response) for tool_response in tool_responses)
+        messages.add_assistant_message(tool_response)
+        return tool_response
 
-        self.logger.debug(f"Calling model again for final answer with payload: {complete_payload}")
+    def _record_tool_round(self, response, tool_calls, tool_responses: List[str], messages: ChatMessages) -> None:
+        messages.add_assistant_tool_calls(response.choices[0].message)
+        for tool_call, tool_response in zip(tool_calls, tool_responses):
+            messages.add_tool_message(str(tool_response), tool_call.id)
 
+    def _follow_up_params(self, messages: ChatMessages, model_name: str, reasoning_effort: Optional[str], steps: int, deadline: Optional[float]):
         param = {
             "model": model_name,
-            "messages": complete_payload,
+            "messages": messages.get_messages(),
         }
+        if self._budget_exhausted(steps, deadline):
+            # Without tools the model has to answer with what it has.
+            self.logger.info("Tool budget used up after %s round(s); asking the model for a final answer.", steps)
+        else:
+            param["tools"] = self.get_tool_definitions(self._turn_query(messages))
         if reasoning_effort:
             param["reasoning_effort"] = reasoning_effort
+        self.logger.debug("Calling model again after tool round %s.", steps)
+        return param
 
-        response_after_tool_call = self.language_model_interface.generate_completion(**param)
+    def _turn_query(self, messages: ChatMessages) -> Optional[str]:
+        # Follow-up calls of a turn offer the same tool subset as its first call.
+        if self.max_tools_per_turn is None:
+            return None
+        for message in reversed(messages.get_messages()):
+            if message["role"] == "user":
+                return str(message.get("content") or "")
+        return None
+
+    def _budget_exhausted(self, steps: int, deadline: Optional[float]) -> bool:
+        return steps >= self.max_steps or (deadline is not None and time.monotonic() >= deadline)
+
+    def _finish(self, response_after_tool_call, messages: ChatMessages) -> str:
+        # Any tool calls still requested at this point are over budget and ignored.
+        final_message = response_after_tool_call.choices[0].message.content or ""
+        self.logger.debug("Final response after tool call: %s", truncate(final_message), extra=PAYLOAD)
+        messages.add_assistant_message(final_message)
 
-        final_message = response_after_tool_call.choices[0].message.content
-        self.logger.info(f"Final response after tool call: {final_message}")
-        messages.add_assistant_message(final_message)   
-    
         return final_message
-    
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+
+from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.tracing import get_tracer
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file in fixed-size chunks so large files are never held in memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StagedDataset:
+    """
+    A file staged into the dataset store.
+
+    ``sandbox_path`` is where code running in a sandbox reads the file; ``host_path``
+    is the staged copy on this machine, if the backend keeps one.
+    """
+
+    def __init__(self, source_path: str, sha256: str, size: int, host_path: Optional[str], sandbox_path: str, reused: bool):
+        self.source_path = source_path
+        self.sha256 = sha256
+        self.size = size
+        self.host_path = host_path
+        self.sandbox_path = sandbox_path
+        self.reused = reused
+
+    def __repr__(self) -> str:
+        return f"StagedDataset(source={self.source_path!r}, sandbox_path={self.sandbox_path!r}, reused={self.reused})"
+
+
+class StagingBackend(ABC):
+    """Storage that staged datasets live in, shared read-only with the sandboxes."""
+
+    @abstractmethod
+    def contains(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def put(self, source_path: str, key: str) -> None:
+        """Store ``source_path`` under ``key``. Must be safe to call concurrently for the same key."""
+        pass
+
+    @abstractmethod
+    def host_path(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def sandbox_path(self, key: str) -> str:
+        pass
+
+
+class LocalDirectoryBackend(StagingBackend):
+    """
+    Stages files into a local directory.
+
+    Local sandboxes read the staged files directly. For Docker sandboxes, mount
+    ``root_dir`` read-only into each container at ``sandbox_root``
+    (``-v <root_dir>:<sandbox_root>:ro``) so the model is given container paths.
+
+    Args:
+        root_dir (str): Host directory holding the staged files.
+        sandbox_root (Optional[str]): Where ``root_dir`` is mounted inside sandboxes.
+            None means sandboxes see the host path.
+    """
+
+    def __init__(self, root_dir: str, sandbox_root: Optional[str] = None):
+        self.root_dir = os.path.abspath(root_dir)
+        self.sandbox_root = sandbox_root
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def contains(self, key: str) -> bool:
+        return os.path.isfile(self.host_path(key))
+
+    def put(self, source_path: str, key: str) -> None:
+        destination = self.host_path(key)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        # Copy to a temporary name and rename, so readers never see a partial file and
+        # concurrent stagers of the same content simply replace each other's identical copy.
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(destination), prefix=".staging-")
+        try:
+            with os.fdopen(fd, "wb") as target, open(source_path, "rb") as source:
+                shutil.copyfileobj(source, target, HASH_CHUNK_BYTES)
+            os.chmod(temp_path, 0o444)
+            os.replace(temp_path, destination)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def host_path(self, key: str) -> str:
+        return os.path.join(self.root_dir, *key.split("/"))
+
+    def sandbox_path(self, key: str) -> str:
+        if self.sandbox_root is None:
+            return self.host_path(key)
+        return posixpath.join(self.sandbox_root, key)
+
+
+class DatasetStore:
+    """
+    Content-addressed store of input files shared with sandboxes.
+
+    Each distinct file content is staged once, under ``<sha256>/<file name>``. A file is
+    re-hashed only when its modification time or size changes; those fingerprints are
+    kept in ``index_path`` so they survive restarts. Staging a file that is already in
+    the store costs a ``stat`` call.
+
+    Args:
+        backend (StagingBackend): Where staged files are kept.
+        index_path (Optional[str]): JSON file for the fingerprint index. Defaults to
+            ``index.json`` in the backend's directory for a ``LocalDirectoryBackend``.
+    """
+
+    def __init__(self, backend: StagingBackend, index_path: Optional[str] = None, logger=None):
+        self.backend = backend
+        if index_path is None and isinstance(backend, LocalDirectoryBackend):
+            index_path = os.path.join(backend.root_dir, "index.json")
+        self.index_path = index_path
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, int]] = self._load_index()
+
+    def fingerprint(self, path: str) -> str:
+        """Return the SHA-256 of a file, reusing the recorded hash while mtime and size are unchanged."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._index.get(path)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                return entry["sha256"]
+
+        self.logger.debug("Hashing %s (%s bytes).", path, stat.st_size)
+        sha256 = file_sha256(path)
+        with self._lock:
+            self._index[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256}
+            self._save_index()
+        return sha256
+
+    def stage(self, path: str) -> StagedDataset:
+        """
+        Make a file available to sandboxes, copying it only if its content is not staged yet.
+
+        Args:
+            path (str): The file to stage.
+
+        Returns:
+            StagedDataset: Where sandboxes can read the file.
+        """
+        path = os.path.abspath(path)
+        sha256 = self.fingerprint(path)
+        key = f"{sha256}/{os.path.basename(path)}"
+        reused = self.backend.contains(key)
+        if reused:
+            self.logger.debug("%s is already staged as %s.", path, key)
+        else:
+            self.logger.info("Staging %s as %s.", path, key)
+            with get_tracer().span("dataset.stage", file=os.path.basename(path), bytes=os.path.getsize(path)):
+                self.backend.put(path, key)
+        return StagedDataset(
+            source_path=path,
+            sha256=sha256,
+            size=os.path.getsize(path),
+            host_path=self.backend.host_path(key),
+            sandbox_path=self.backend.sandbox_path(key),
+            reused=reused,
+        )
+
+    def stage_derived(self, path: str, file_name: str, build: Callable[[str, str], None]) -> StagedDataset:
+        """
+        Stage a file derived from ``path`` (e.g. a converted copy) next to the staged original.
+
+        The derived file is keyed on the original's content, so it is built only once per
+        version of the original.
+
+        Args:
+            path (str): The original file.
+            file_name (str): Name of the derived file.
+            build (Callable[[str, str], None]): Called as ``build(path, output_path)`` to
+                write the derived file when it is not staged yet.
+
+        Returns:
+            StagedDataset: Where sandboxes can read the derived file.
+        """
+        path = os.path.abspath(path)
+        sha256 = self.fingerprint(path)
+        key = f"{sha256}/{file_name}"
+        reused = self.backend.contains(key)
+        if not reused:
+            self.logger.info("Building %s from %s.", file_name, path)
+            with get_tracer().span("dataset.derive", file=file_name), tempfile.TemporaryDirectory(prefix="derived-") as directory:
+                output_path = os.path.join(directory, file_name)
+                build(path, output_path)
+                self.backend.put(output_path, key)
+        host_path = self.backend.host_path(key)
+        return StagedDataset(
+            source_path=path,
+            sha256=sha256,
+            size=os.path.getsize(host_path) if host_path and os.path.exists(host_path) else 0,
+            host_path=host_path,
+            sandbox_path=self.backend.sandbox_path(key),
+            reused=reused,
+        )
+
+    def _load_index(self) -> Dict[str, Dict[str, int]]:
+        if not self.index_path or not os.path.isfile(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning("Ignoring unreadable dataset index %s: %s", self.index_path, e)
+            return {}
+
+    def _save_index(self) -> None:
+        if not self.index_path:
+            return
+        directory = os.path.dirname(self.index_path) or "."
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".index-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(temp_path, self.index_path)
@@ -0,0 +1,100 @@
+import os
+from typing import Optional
+
+CSV = "csv"
+TSV = "tsv"
+JSONL = "jsonl"
+PARQUET = "parquet"
+FEATHER = "feather"
+
+EXTENSIONS = {
+    ".csv": CSV,
+    ".tsv": TSV,
+    ".tab": TSV,
+    ".jsonl": JSONL,
+    ".ndjson": JSONL,
+    ".parquet": PARQUET,
+    ".pq": PARQUET,
+    ".feather": FEATHER,
+    ".arrow": FEATHER,
+    ".ipc": FEATHER,
+}
+
+TEXT_FORMATS = {CSV, TSV, JSONL}
+DELIMITERS = {CSV: ",", TSV: "\t"}
+
+# How analysis code in the sandbox should load each format.
+PANDAS_READERS = {
+    CSV: "pd.read_csv",
+    TSV: "pd.read_csv(..., sep='\\t')",
+    JSONL: "pd.read_json(..., lines=True)",
+    PARQUET: "pd.read_parquet",
+    FEATHER: "pd.read_feather",
+}
+
+CONVERSION_BATCH_BYTES = 16 * 1024 * 1024
+
+
+def detect_format(path: str) -> Optional[str]:
+    """Return the dataset format of a file from its extension, or None if it is not supported."""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def read_expression(path: str, file_format: str) -> str:
+    """The pandas call that loads ``path`` in sandboxed code, e.g. ``pd.read_csv('/data/x.csv')``."""
+    arguments = {TSV: ", sep='\\t'", JSONL: ", lines=True"}.get(file_format, "")
+    function = {CSV: "read_csv", TSV: "read_csv", JSONL: "read_json", PARQUET: "read_parquet", FEATHER: "read_feather"}[file_format]
+    return f"pd.{function}({path!r}{arguments})"
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def require_pyarrow(purpose: str) -> None:
+    """Raise an ImportError that says how to fix it if pyarrow, needed for ``purpose``, is missing."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(f"{purpose} needs pyarrow, which is not installed. Install it with `pip install pyarrow`.") from e
+
+
+def convert_to_parquet(source_path: str, destination_path: str, file_format: str) -> None:
+    """
+    Write a Parquet copy of a CSV, TSV or JSON Lines file.
+
+    Delimited files are converted batch by batch so memory stays bounded. If a later
+    batch does not fit the schema inferred from the first one, the file is re-read
+    whole with the schema inferred from all of it.
+
+    Args:
+        source_path (str): The text file.
+        destination_path (str): Where to write the Parquet file.
+        file_format (str): One of ``TEXT_FORMATS``.
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    require_pyarrow("Converting to Parquet")
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.json
+    import pyarrow.parquet
+
+    if file_format == JSONL:
+        pyarrow.parquet.write_table(pyarrow.json.read_json(source_path), destination_path)
+        return
+
+    parse_options = pyarrow.csv.ParseOptions(delimiter=DELIMITERS[file_format])
+    read_options = pyarrow.csv.ReadOptions(block_size=CONVERSION_BATCH_BYTES)
+    try:
+        reader = pyarrow.csv.open_csv(source_path, read_options=read_options, parse_options=parse_options)
+        with pyarrow.parquet.ParquetWriter(destination_path, reader.schema) as writer:
+            for batch in reader:
+                writer.write_table(pyarrow.Table.from_batches([batch]))
+    except pyarrow.ArrowInvalid:
+        table = pyarrow.csv.read_csv(source_path, parse_options=parse_options)
+        pyarrow.parquet.write_table(table, destination_path)
@@ -0,0 +1,466 @@
+import collections
+import csv
+import heapq
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from object_orinted_agents.datasets.dataset_store import DatasetStore
+from object_orinted_agents.datasets.formats import DELIMITERS, JSONL, PARQUET, detect_format, require_pyarrow
+from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.tracing import get_tracer
+
+NULL_VALUES = {"", "na", "n/a", "nan", "null", "none", "#n/a"}
+BOOL_VALUES = {"true", "false"}
+HASH_SPACE = 2 ** 64
+
+
+class DistinctCounter:
+    """
+    Approximate distinct count in constant memory (k-minimum-values sketch).
+
+    Exact up to ``k`` distinct values; beyond that the estimate has a relative error of
+    roughly ``1 / sqrt(k)``.
+    """
+
+    def __init__(self, k: int = 256):
+        self.k = k
+        self._heap: List[int] = []  # negated hashes: a max-heap of the k smallest
+        self._members = set()
+
+    def add(self, value: str) -> None:
+        h = hash(value) % HASH_SPACE
+        if h in self._members:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, -h)
+            self._members.add(h)
+        elif h < -self._heap[0]:
+            evicted = -heapq.heappushpop(self._heap, -h)
+            self._members.discard(evicted)
+            self._members.add(h)
+
+    def estimate(self) -> int:
+        if len(self._heap) < self.k:
+            return len(self._heap)
+        kth_smallest = -self._heap[0]
+        return int((self.k - 1) * HASH_SPACE / (kth_smallest + 1))
+
+
+class ColumnStats:
+    """Summary of one column. ``distinct`` is approximate, and None when it is not known."""
+
+    def __init__(self, name: str, dtype: str, min: Any, max: Any, null_count: Optional[int], distinct: Optional[int]):
+        self.name = name
+        self.dtype = dtype
+        self.min = min
+        self.max = max
+        self.null_count = null_count
+        self.distinct = distinct
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "dtype": self.dtype,
+            "min": self.min,
+            "max": self.max,
+            "null_count": self.null_count,
+            "distinct": self.distinct,
+        }
+
+
+class ColumnProfile:
+    """Running statistics for one column, updated one value at a time."""
+
+    def __init__(self, name: str, distinct_k: int = 256):
+        self.name = name
+        self.null_count = 0
+        self.value_count = 0
+        self.is_int = True
+        self.is_float = True
+        self.is_bool = True
+        self.min_number: Optional[float] = None
+        self.max_number: Optional[float] = None
+        self.min_text: Optional[str] = None
+        self.max_text: Optional[str] = None
+        self.distinct = DistinctCounter(distinct_k)
+
+    def add(self, value: str) -> None:
+        value = value.strip()
+        if value.lower() in NULL_VALUES:
+            self.null_count += 1
+            return
+        self.value_count += 1
+        self.distinct.add(value)
+        if self.min_text is None or value < self.min_text:
+            self.min_text = value
+        if self.max_text is None or value > self.max_text:
+            self.max_text = value
+        if self.is_bool and value.lower() not in BOOL_VALUES:
+            self.is_bool = False
+        if self.is_float:
+            try:
+                number = float(int(value)) if self.is_int else float(value)
+            except ValueError:
+                self.is_int = False
+                try:
+                    number = float(value)
+                except ValueError:
+                    self.is_float = False
+                    return
+            if self.min_number is None or number < self.min_number:
+                self.min_number = number
+            if self.max_number is None or number > self.max_number:
+                self.max_number = number
+
+    @property
+    def distinct_count(self) -> int:
+        # The sketch can overshoot slightly; there cannot be more distinct values than values.
+        return min(self.distinct.estimate(), self.value_count)
+
+    @property
+    def dtype(self) -> str:
+        """Pandas-style name of the inferred type."""
+        if self.value_count == 0:
+            return "object"
+        if self.is_bool:
+            return "bool"
+        if self.is_int:
+            return "int64"
+        if self.is_float:
+            return "float64"
+        return "object"
+
+    @property
+    def min(self) -> Any:
+        return self._bound(self.min_number, self.min_text)
+
+    @property
+    def max(self) -> Any:
+        return self._bound(self.max_number, self.max_text)
+
+    def _bound(self, number: Optional[float], text: Optional[str]) -> Any:
+        dtype = self.dtype
+        if dtype == "int64":
+            return int(number)
+        if dtype == "float64":
+            return number
+        return text
+
+    def stats(self) -> ColumnStats:
+        return ColumnStats(self.name, self.dtype, self.min, self.max, self.null_count, self.distinct_count)
+
+
+class DatasetProfile:
+    """
+    Preview and schema summary of a data file.
+
+    When the file is larger than the scan limit, the column statistics describe the
+    scanned prefix and ``row_count`` is extrapolated from its bytes per row.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size_bytes: int,
+        header: List[str],
+        preview_rows: List[List[str]],
+        columns: List[ColumnStats],
+        file_format: str,
+        row_count: int,
+        scanned_bytes: int,
+        row_count_estimated: bool,
+    ):
+        self.path = path
+        self.size_bytes = size_bytes
+        self.header = header
+        self.preview_rows = preview_rows
+        self.columns = columns
+        self.file_format = file_format
+        self.row_count = row_count
+        self.scanned_bytes = scanned_bytes
+        self.row_count_estimated = row_count_estimated
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "size_bytes": self.size_bytes,
+            "format": self.file_format,
+            "row_count": self.row_count,
+            "row_count_estimated": self.row_count_estimated,
+            "scanned_bytes": self.scanned_bytes,
+            "columns": [column.to_dict() for column in self.columns],
+            "preview": [self.header] + self.preview_rows,
+        }
+
+    def to_text(self) -> str:
+        """Compact summary for the model: size, schema with statistics, and the preview rows."""
+        rows = f"~{self.row_count:,}" if self.row_count_estimated else f"{self.row_count:,}"
+        lines = [f"File: {os.path.basename(self.path)} ({self.file_format}, {_format_bytes(self.size_bytes)}, {rows} rows)"]
+        if self.row_count_estimated:
+            lines.append(f"Column statistics are from the first {_format_bytes(self.scanned_bytes)}.")
+        lines.append(f"Columns ({len(self.columns)}):")
+        name_width = max((len(column.name) for column in self.columns), default=0)
+        for column in self.columns:
+            line = f"  {column.name:<{name_width}}  {column.dtype:<7}  min={column.min}  max={column.max}  nulls={column.null_count}"
+            if column.distinct is not None:
+                line += f"  distinct~{column.distinct}"
+            lines.append(line)
+        lines.append(f"First {len(self.preview_rows)} rows:")
+        lines.append(_format_table(self.header, self.preview_rows))
+        return "\n".join(lines)
+
+
+class DatasetProfiler:
+    """
+    Profiles data files in one streaming pass and bounded memory.
+
+    CSV, TSV and JSON Lines files are scanned keeping only the preview rows and per-column
+    running statistics, never the data. Scanning stops after ``max_scan_bytes`` (None
+    scans the whole file). Parquet and Feather files are profiled with ``pyarrow`` from
+    their metadata and first batch. Profiles are cached by file fingerprint: the content
+    hash from ``dataset_store`` when given, otherwise path, modification time and size.
+
+    Args:
+        preview_rows (int): Rows to include in the preview.
+        max_scan_bytes (Optional[int]): Bytes to read for statistics and the row estimate.
+        distinct_k (int): Sketch size of the approximate distinct counts.
+        max_cached_profiles (int): Size bound of the profile cache.
+        dataset_store (Optional[DatasetStore]): Supplies content fingerprints.
+    """
+
+    def __init__(
+        self,
+        preview_rows: int = 15,
+        max_scan_bytes: Optional[int] = 16 * 1024 * 1024,
+        distinct_k: int = 256,
+        max_cached_profiles: int = 64,
+        dataset_store: Optional[DatasetStore] = None,
+        logger=None,
+    ):
+        self.preview_rows = preview_rows
+        self.max_scan_bytes = max_scan_bytes
+        self.distinct_k = distinct_k
+        self.max_cached_profiles = max_cached_profiles
+        self.dataset_store = dataset_store
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._cache: "collections.OrderedDict[Tuple, DatasetProfile]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def profile(self, path: str, file_format: Optional[str] = None) -> DatasetProfile:
+        """
+        Return the profile of a data file, from the cache when the file is unchanged.
+
+        Args:
+            path (str): The file to profile.
+            file_format (Optional[str]): One of the ``formats`` constants. Detected from
+                the file extension when not given.
+
+        Returns:
+            DatasetProfile: Preview rows, inferred schema and column statistics.
+        """
+        file_format = file_format or detect_format(path)
+        if file_format is None:
+            raise ValueError(f"Unsupported file type: {path}")
+        key = (self._fingerprint(path), file_format, self.preview_rows, self.max_scan_bytes)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.logger.debug("Profile cache hit for %s.", path)
+                return cached
+
+        with get_tracer().span("dataset.profile", file=os.path.basename(path), format=file_format) as span:
+            if file_format == JSONL:
+                profile = self._scan_json_lines(path)
+            elif file_format in DELIMITERS:
+                profile = self._scan_delimited(path, file_format)
+            else:
+                profile = self._read_columnar(path, file_format)
+            span.set_attributes({"bytes": profile.size_bytes, "scanned_bytes": profile.scanned_bytes})
+        with self._lock:
+            self._cache[key] = profile
+            while len(self._cache) > self.max_cached_profiles:
+                self._cache.popitem(last=False)
+        return profile
+
+    def _fingerprint(self, path: str) -> Tuple:
+        if self.dataset_store is not None:
+            return (self.dataset_store.fingerprint(path),)
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def _scan_delimited(self, path: str, file_format: str) -> DatasetProfile:
+        size_bytes = os.path.getsize(path)
+        counter = _ByteCounter()
+        header: List[str] = []
+        columns: List[ColumnProfile] = []
+        preview: List[List[str]] = []
+        header_bytes = 0
+        rows = 0
+        truncated = False
+
+        with open(path, "rb") as f:
+            reader = csv.reader(counter.decode_lines(f), delimiter=DELIMITERS[file_format])
+            for record in reader:
+                if not header:
+                    header = [name.strip() for name in record]
+                    columns = [ColumnProfile(name, self.distinct_k) for name in header]
+                    header_bytes = counter.bytes_read
+                    continue
+                rows += 1
+                if len(preview) < self.preview_rows:
+                    preview.append(record)
+                for column, value in zip(columns, record):
+                    column.add(value)
+                if self.max_scan_bytes is not None and counter.bytes_read >= self.max_scan_bytes:
+                    truncated = counter.bytes_read < size_bytes
+                    break
+
+        row_count = self._row_count(rows, truncated, counter.bytes_read, header_bytes, size_bytes)
+        self.logger.debug("Profiled %s: %s rows scanned in %s bytes.", path, rows, counter.bytes_read)
+        stats = [column.stats() for column in columns]
+        return DatasetProfile(path, size_bytes, header, preview, stats, file_format, row_count, counter.bytes_read, truncated)
+
+    def _scan_json_lines(self, path: str) -> DatasetProfile:
+        size_bytes = os.path.getsize(path)
+        counter = _ByteCounter()
+        columns: Dict[str, ColumnProfile] = {}
+        preview: List[Dict[str, Any]] = []
+        rows = 0
+        truncated = False
+
+        with open(path, "rb") as f:
+            for line in counter.decode_lines(f):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    record = {"value": record}
+                rows += 1
+                if len(preview) < self.preview_rows:
+                    preview.append(record)
+                for name in record:
+                    if name not in columns:
+                        columns[name] = ColumnProfile(name, self.distinct_k)
+                        # The key was missing from every earlier record.
+                        columns[name].null_count = rows - 1
+                for name, column in columns.items():
+                    column.add(_json_cell(record.get(name)))
+                if self.max_scan_bytes is not None and counter.bytes_read >= self.max_scan_bytes:
+                    truncated = counter.bytes_read < size_bytes
+                    break
+
+        header = list(columns)
+        preview_rows = [[_json_cell(record.get(name)) for name in header] for record in preview]
+        row_count = self._row_count(rows, truncated, counter.bytes_read, 0, size_bytes)
+        self.logger.debug("Profiled %s: %s records scanned in %s bytes.", path, rows, counter.bytes_read)
+        stats = [column.stats() for column in columns.values()]
+        return DatasetProfile(path, size_bytes, header, preview_rows, stats, JSONL, row_count, counter.bytes_read, truncated)
+
+    def _read_columnar(self, path: str, file_format: str) -> DatasetProfile:
+        require_pyarrow(f"Reading {file_format} files")
+        import pyarrow.compute
+        import pyarrow.feather
+        import pyarrow.parquet
+
+        if file_format == PARQUET:
+            parquet_file = pyarrow.parquet.ParquetFile(path)
+            row_count = parquet_file.metadata.num_rows
+            schema = parquet_file.schema_arrow
+            first_batch = next(parquet_file.iter_batches(batch_size=max(self.preview_rows, 1)), None)
+            preview = first_batch.to_pylist() if first_batch is not None else []
+            stats = [self._parquet_column_stats(parquet_file, index, field) for index, field in enumerate(schema)]
+        else:
+            # Memory-mapped, so only the pages touched by the statistics are read.
+            table = pyarrow.feather.read_table(path, memory_map=True)
+            row_count = table.num_rows
+            schema = table.schema
+            preview = table.slice(0, self.preview_rows).to_pylist()
+            stats = []
+            for field, column in zip(schema, table.columns):
+                try:
+                    bounds = pyarrow.compute.min_max(column).as_py()
+                except (pyarrow.ArrowNotImplementedError, pyarrow.ArrowInvalid):
+                    bounds = {"min": None, "max": None}
+                stats.append(ColumnStats(field.name, str(field.type), bounds["min"], bounds["max"], column.null_count, None))
+
+        header = [field.name for field in schema]
+        preview_rows = [[_json_cell(record.get(name)) for name in header] for record in preview]
+        size_bytes = os.path.getsize(path)
+        return DatasetProfile(path, size_bytes, header, preview_rows, stats, file_format, row_count, size_bytes, False)
+
+    def _parquet_column_stats(self, parquet_file, index: int, field) -> ColumnStats:
+        """Combine the per-row-group statistics in the Parquet footer; no column data is read."""
+        minimum = maximum = None
+        null_count = 0
+        metadata = parquet_file.metadata
+        if metadata.num_columns != len(parquet_file.schema_arrow):
+            # Nested columns span several Parquet leaf columns; their statistics don't map one to one.
+            return ColumnStats(field.name, str(field.type), None, None, None, None)
+        for row_group in range(metadata.num_row_groups):
+            statistics = metadata.row_group(row_group).column(index).statistics
+            if statistics is None:
+                null_count = None
+                continue
+            if null_count is not None and statistics.has_null_count:
+                null_count += statistics.null_count
+            if statistics.has_min_max:
+                minimum = statistics.min if minimum is None else min(minimum, statistics.min)
+                maximum = statistics.max if maximum is None else max(maximum, statistics.max)
+        return ColumnStats(field.name, str(field.type), minimum, maximum, null_count, None)
+
+    def _row_count(self, rows: int, truncated: bool, bytes_read: int, header_bytes: int, size_bytes: int) -> int:
+        if not truncated or not rows:
+            return rows
+        # Extrapolate from the average row size of the scanned part.
+        bytes_per_row = (bytes_read - header_bytes) / rows
+        return int((size_bytes - header_bytes) / bytes_per_row)
+
+
+class _ByteCounter:
+    """Yields decoded lines of a binary file while counting the raw bytes consumed."""
+
+    def __init__(self):
+        self.bytes_read = 0
+
+    def decode_lines(self, binary_file) -> Iterator[str]:
+        first = True
+        for raw_line in binary_file:
+            self.bytes_read += len(raw_line)
+            if first:
+                raw_line = raw_line.removeprefix(b"\xef\xbb\xbf")
+                first = False
+            yield raw_line.decode("utf-8", errors="replace")
+
+
+def _json_cell(value: Any) -> str:
+    """Render a JSON or Arrow value as the text a delimited file would hold."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _format_table(header: List[str], rows: List[List[str]], max_width: int = 20) -> str:
+    cells = [[_clip(value, max_width) for value in row] for row in [header] + rows]
+    widths = [max(len(row[i]) for row in cells if i < len(row)) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(value.rjust(widths[i]) if i < len(widths) else value for i, value in enumerate(row)) for row in cells
+    )
+
+
+def _clip(value: str, max_width: int) -> str:
+    value = value.strip()
+    return value if len(value) <= max_width else value[:max_width - 3] + "..."
@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+from object_orinted_agents.sandbox.kernel import KernelBackend
+from object_orinted_agents.utils.logger import get_logger
+
+HANDLE_PREFIX = "artifact://"
+
+
+class Artifact:
+    """
+    A file saved by sandboxed code with ``save_artifact``.
+
+    ``sandbox_path`` is where the kernel wrote it; ``host_path`` is set once the file
+    has been fetched to this machine.
+    """
+
+    def __init__(self, artifact_id: str, name: str, kind: str, sandbox_path: str, size: int, summary: str, backend: Optional[KernelBackend]):
+        self.artifact_id = artifact_id
+        self.name = name
+        self.kind = kind
+        self.sandbox_path = sandbox_path
+        self.size = size
+        self.summary = summary
+        self.backend = backend
+        self.host_path: Optional[str] = None
+
+    @property
+    def handle(self) -> str:
+        return HANDLE_PREFIX + self.artifact_id
+
+    def describe(self) -> str:
+        """One line for the model: the handle, kind, size and summary, never the content."""
+        return f"{self.handle} ({self.kind}, {self.size} bytes) {self.summary}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "handle": self.handle,
+            "name": self.name,
+            "kind": self.kind,
+            "sandbox_path": self.sandbox_path,
+            "bytes": self.size,
+            "summary": self.summary,
+        }
+
+    def __repr__(self) -> str:
+        return f"Artifact(handle={self.handle!r}, kind={self.kind!r}, name={self.name!r})"
+
+
+class ArtifactStore:
+    """
+    Index of the artifacts saved during a session.
+
+    Registering an artifact records only its metadata. The file stays in the sandbox
+    until ``path`` or ``load`` asks for it, and is then copied once into ``cache_dir``
+    (files of local kernels are read in place).
+
+    Args:
+        cache_dir (str): Host directory that fetched artifacts are copied into.
+    """
+
+    def __init__(self, cache_dir: str = ".cache/artifacts", logger=None):
+        self.cache_dir = cache_dir
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._artifacts: Dict[str, Artifact] = {}
+        self._lock = threading.Lock()
+
+    def register(self, saved: List[Dict], backend: KernelBackend) -> List[Artifact]:
+        """
+        Record the artifacts listed in a kernel result.
+
+        Args:
+            saved (List[Dict]): ``KernelResult.artifacts``.
+            backend (KernelBackend): Backend of the kernel that wrote them, used to fetch them later.
+
+        Returns:
+            List[Artifact]: The registered artifacts, in the order given.
+        """
+        artifacts = []
+        with self._lock:
+            for entry in saved:
+                artifact = Artifact(
+                    artifact_id=uuid.uuid4().hex[:12],
+                    name=entry["name"],
+                    kind=entry.get("kind", "file"),
+                    sandbox_path=entry["path"],
+                    size=entry.get("bytes", 0),
+                    summary=entry.get("summary", ""),
+                    backend=backend,
+                )
+                self._artifacts[artifact.artifact_id] = artifact
+                artifacts.append(artifact)
+        return artifacts
+
+    def register_copies(self, saved: List[Dict]) -> List[Artifact]:
+        """
+        Record artifacts from files already on this machine (e.g. served from an execution
+        cache), copying each into ``cache_dir`` so the artifact outlives the original.
+
+        Args:
+            saved (List[Dict]): Artifact records whose ``path`` is a host path.
+
+        Returns:
+            List[Artifact]: The registered artifacts, in the order given.
+        """
+        artifacts = []
+        for entry in saved:
+            artifact = Artifact(
+                artifact_id=uuid.uuid4().hex[:12],
+                name=entry["name"],
+                kind=entry.get("kind", "file"),
+                sandbox_path=entry["path"],
+                size=entry.get("bytes", 0),
+                summary=entry.get("summary", ""),
+                backend=None,
+            )
+            target = os.path.join(self.cache_dir, artifact.artifact_id, os.path.basename(entry["path"]))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(entry["path"], target)
+            artifact.host_path = target
+            with self._lock:
+                self._artifacts[artifact.artifact_id] = artifact
+            artifacts.append(artifact)
+        return artifacts
+
+    def get(self, handle: str) -> Artifact:
+        """Look up an artifact by handle (``artifact://<id>``) or bare id. Raises KeyError if unknown."""
+        artifact_id = handle[len(HANDLE_PREFIX):] if handle.startswith(HANDLE_PREFIX) else handle
+        with self._lock:
+            if artifact_id not in self._artifacts:
+                raise KeyError(f"Unknown artifact: {handle}")
+            return self._artifacts[artifact_id]
+
+    def list(self) -> List[Artifact]:
+        with self._lock:
+            return list(self._artifacts.values())
+
+    def path(self, handle: str) -> str:
+        """Return a host path to the artifact's file, fetching it from the sandbox on first use."""
+        artifact = self.get(handle)
+        if artifact.host_path is None or not os.path.exists(artifact.host_path):
+            target = os.path.join(self.cache_dir, artifact.artifact_id, artifact.name)
+            self.logger.debug("Fetching artifact %s from %s", artifact.handle, artifact.sandbox_path)
+            artifact.host_path = artifact.backend.fetch(artifact.sandbox_path, target)
+        return artifact.host_path
+
+    def load(self, handle: str) -> Any:
+        """
+        Read an artifact into memory: tables as pandas DataFrames, JSON as Python objects
+        and images as PNG bytes.
+        """
+        artifact = self.get(handle)
+        path = self.path(handle)
+        if artifact.kind == "json":
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        if artifact.kind == "table":
+            import pandas as pd
+
+            return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+        with open(path, "rb") as f:
+            return f.read()
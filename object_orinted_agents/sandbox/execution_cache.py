@@ -0,0 +1,712 @@
+import ast
+import builtins
+import collections
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from object_orinted_agents.utils.logger import get_logger
+
+# Builtins that can read or change any global.
+DYNAMIC_BUILTINS = {"exec", "eval", "compile", "globals", "locals", "vars", "dir", "__import__"}
+# Builtins that interact with the user or the process, or whose result differs between processes.
+UNSAFE_BUILTINS = DYNAMIC_BUILTINS | {"input", "breakpoint", "exit", "quit", "help", "getattr", "setattr", "delattr", "id", "hash"}
+BUILTIN_NAMES = {name for name in dir(builtins) if not name.startswith("_")}
+
+# Importing these means talking to the system, the network, the clock or a random source.
+UNSAFE_MODULES = {
+    "os", "sys", "subprocess", "shutil", "socket", "requests", "urllib", "http", "httpx", "aiohttp",
+    "ftplib", "smtplib", "random", "secrets", "uuid", "time", "threading", "multiprocessing",
+    "concurrent", "asyncio", "signal", "ctypes", "importlib", "builtins", "tempfile", "pathlib",
+    "glob", "sqlite3", "webbrowser", "gc", "inspect", "IPython",
+}
+
+# Calls whose result changes from run to run unless given a fixed seed.
+NONDETERMINISTIC_CALLS = {
+    "rand", "randn", "randint", "random_sample", "choice", "choices", "shuffle", "permutation",
+    "sample", "default_rng", "seed", "now", "today", "utcnow", "time", "time_ns", "perf_counter",
+    "monotonic", "process_time", "urandom", "uuid1", "uuid4", "getpid",
+    "KMeans", "MiniBatchKMeans", "TSNE", "train_test_split", "KFold", "StratifiedKFold",
+    "DecisionTreeClassifier", "DecisionTreeRegressor", "ExtraTreesClassifier", "ExtraTreesRegressor",
+    "GradientBoostingClassifier", "GradientBoostingRegressor", "IsolationForest",
+    "MLPClassifier", "MLPRegressor", "SGDClassifier", "SGDRegressor",
+}
+SEED_KEYWORDS = {"random_state", "seed"}
+
+# Calls that write files or change library-wide settings.
+SIDE_EFFECT_CALLS = {
+    "to_csv", "to_parquet", "to_excel", "to_json", "to_pickle", "to_sql", "to_feather", "to_hdf",
+    "to_stata", "to_orc", "savefig", "save", "savez", "savez_compressed", "savetxt", "tofile", "dump",
+    "write", "writelines", "write_text", "write_bytes", "set_option", "reset_option", "use", "rc",
+    "set_printoptions", "seterr",
+}
+
+# Functions and methods known to leave their receiver and arguments unchanged (unless given
+# inplace=True or out=...). Any other call on or with an object of an earlier execution may
+# change it, so code making one is not cached. Names that also mean an in-place method on
+# some type (sort, add, update, fill...) are deliberately missing.
+PURE_CALLS = {
+    # Builtins
+    "abs", "all", "any", "ascii", "bin", "bool", "bytes", "callable", "chr", "complex", "dict",
+    "divmod", "enumerate", "filter", "float", "format", "frozenset", "hasattr", "hex", "int",
+    "isinstance", "issubclass", "iter", "len", "list", "map", "max", "min", "oct", "ord", "pow",
+    "print", "range", "repr", "reversed", "round", "set", "slice", "sorted", "str", "sum", "tuple",
+    "type", "zip",
+    # str, list, dict and set reads
+    "capitalize", "casefold", "center", "count", "endswith", "find", "format_map", "get", "index",
+    "isalnum", "isalpha", "isdigit", "islower", "isnumeric", "isspace", "isupper", "items", "join",
+    "keys", "ljust", "lower", "lstrip", "partition", "removeprefix", "removesuffix", "replace",
+    "rfind", "rjust", "rsplit", "rstrip", "split", "splitlines", "startswith", "strip", "swapcase",
+    "title", "upper", "values", "zfill", "difference", "intersection", "isdisjoint", "issubset",
+    "issuperset", "symmetric_difference", "union",
+    # pandas and numpy computations that return new objects
+    "DataFrame", "Series", "agg", "aggregate", "apply", "applymap", "argmax", "argmin", "array",
+    "asarray", "assign", "astype", "between", "clip", "concat", "concatenate", "contains", "copy",
+    "corr", "corrcoef", "cov", "crosstab", "cummax", "cummin", "cumprod", "cumsum", "cut",
+    "describe", "diff", "dot", "drop", "drop_duplicates", "dropna", "duplicated", "equals",
+    "explode", "fillna", "flatten", "get_dummies", "groupby", "head", "histogram", "hstack",
+    "idxmax", "idxmin", "info", "isin", "isna", "isnan", "isnull", "item", "linspace", "log",
+    "log10", "matmul", "maximum", "mean", "median", "melt", "memory_usage", "merge", "minimum",
+    "mode", "nan_to_num", "nlargest", "notna", "notnull", "nsmallest", "nunique", "ones",
+    "pct_change", "percentile", "pivot", "pivot_table", "prod", "qcut", "quantile", "query",
+    "rank", "ravel", "rename", "reset_index", "reshape", "resample", "rolling", "expanding",
+    "select_dtypes", "set_index", "shift", "sort_index", "sort_values", "sqrt", "stack", "std",
+    "exp", "tail", "to_datetime", "to_dict", "to_frame", "to_list", "to_markdown", "to_numeric",
+    "to_numpy", "to_string", "tolist", "transpose", "unique", "unstack", "value_counts", "var",
+    "vstack", "where", "zeros", "size", "nonzero", "floor", "ceil",
+    # Fitted models
+    "predict", "predict_proba", "predict_log_proba", "decision_function", "score", "transform",
+    "get_params",
+    # Plotting; the kernel saves and closes open figures after every execution.
+    "plot", "scatter", "bar", "barh", "hist", "boxplot", "pie", "imshow", "heatmap", "lineplot",
+    "scatterplot", "histplot", "barplot", "countplot", "pairplot", "title", "xlabel", "ylabel",
+    "legend", "subplots", "figure", "tight_layout", "set_title", "set_xlabel", "set_ylabel",
+    "grid", "xticks", "yticks", "suptitle",
+    # Other modules
+    "dumps", "loads", "isclose", "fsum", "match", "search", "findall", "fullmatch", "sub",
+    "save_artifact",
+}
+
+# Calls that read a file named by their first argument.
+READER_CALLS = {"open", "load", "loadtxt", "genfromtxt", "fromfile", "ExcelFile", "HDFStore", "imread", "load_workbook"}
+PATH_KEYWORDS = {"filepath_or_buffer", "path", "path_or_buf", "io", "file", "fname", "filename"}
+
+KERNEL_NAMES = {"save_artifact"}
+
+
+def _dotted(node: ast.AST) -> List[str]:
+    """``np.random.rand`` -> ["np", "random", "rand"]; parts that are not plain names are skipped."""
+    parts = []
+    while True:
+        if isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        elif isinstance(node, ast.Call):
+            node = node.func
+        elif isinstance(node, ast.Subscript):
+            node = node.value
+        elif isinstance(node, ast.Name):
+            parts.append(node.id)
+            break
+        else:
+            break
+    return parts[::-1]
+
+
+def _root_name(node: ast.AST) -> Optional[str]:
+    while isinstance(node, (ast.Attribute, ast.Subscript, ast.Call, ast.Starred)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _target_names(target: ast.AST) -> Set[str]:
+    if isinstance(target, ast.Name):
+        return {target.id}
+    if isinstance(target, (ast.Tuple, ast.List)):
+        return set().union(*(_target_names(element) for element in target.elts)) if target.elts else set()
+    if isinstance(target, ast.Starred):
+        return _target_names(target.value)
+    return set()
+
+
+def _scope_nodes(node: ast.AST) -> Iterable[ast.AST]:
+    """Walk a node without entering nested function, lambda or class bodies."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        for child in ast.iter_child_nodes(current):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+                yield child
+                continue
+            stack.append(child)
+
+
+def _stored_names(statements: Iterable[ast.AST]) -> Set[str]:
+    """Names a block of statements binds in its own scope."""
+    names = set()
+    for statement in statements:
+        for node in _scope_nodes(statement):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+                names.add(node.id)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names.add(node.name)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                names.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                names.add(node.name)
+            elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+                names.add(node.name)
+            elif isinstance(node, ast.MatchMapping) and node.rest:
+                names.add(node.rest)
+    return names
+
+
+def _parameters(function: ast.AST) -> Set[str]:
+    args = function.args
+    names = {arg.arg for arg in args.posonlyargs + args.args + args.kwonlyargs}
+    names.update(arg.arg for arg in (args.vararg, args.kwarg) if arg)
+    return names
+
+
+def _function_locals(function: ast.AST) -> Set[str]:
+    body = function.body if isinstance(function.body, list) else [function.body]
+    return _parameters(function) | _stored_names(body)
+
+
+def _loaded_names(node: ast.AST) -> Set[str]:
+    """
+    Names ``node`` reads from its enclosing scope, including those read later by the
+    functions, lambdas and classes it defines.
+    """
+    if isinstance(node, ast.Name):
+        return {node.id} if isinstance(node.ctx, ast.Load) else set()
+    names = set()
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+        for part in node.args.defaults + [default for default in node.args.kw_defaults if default] + getattr(node, "decorator_list", []):
+            names |= _loaded_names(part)
+        body = node.body if isinstance(node.body, list) else [node.body]
+        inner = set().union(*(_loaded_names(statement) for statement in body))
+        return names | (inner - _function_locals(node))
+    if isinstance(node, ast.ClassDef):
+        for part in node.bases + node.decorator_list + [keyword.value for keyword in node.keywords]:
+            names |= _loaded_names(part)
+        inner = set().union(*(_loaded_names(statement) for statement in node.body))
+        return names | (inner - _stored_names(node.body))
+    if isinstance(node, (ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp)):
+        # Comprehension variables live in the comprehension's own scope; only the first
+        # iterable is evaluated outside it.
+        targets = set().union(*(_target_names(generator.target) for generator in node.generators))
+        inner = set().union(*(_loaded_names(child) for child in ast.iter_child_nodes(node)))
+        return (inner - targets) | _loaded_names(node.generators[0].iter)
+    for child in ast.iter_child_nodes(node):
+        names |= _loaded_names(child)
+    return names
+
+
+class CodeAnalysis:
+    """
+    What static analysis of one code snippet found.
+
+    ``free_names`` are the globals the snippet reads from earlier executions, ``binds`` the
+    globals it sets. A snippet is ``cacheable`` when it has no side effects, no randomness
+    and no reads of the clock, the network or the interpreter state; ``reason`` says why
+    not otherwise. ``dynamic`` snippets (``exec``, ``globals()``, ``global``...) may read or
+    change any global. ``file_literals`` are the paths it opens, which must all be known
+    datasets for a result to be reused.
+    """
+
+    def __init__(self, canonical: str):
+        self.canonical = canonical
+        self.free_names: Set[str] = set()
+        self.binds: Set[str] = set()
+        self.file_literals: Set[str] = set()
+        self.string_literals: Set[str] = set()
+        self.reasons: List[str] = []
+        self.dynamic = False
+
+    @property
+    def cacheable(self) -> bool:
+        return not self.reasons
+
+    @property
+    def reason(self) -> Optional[str]:
+        return "; ".join(self.reasons) if self.reasons else None
+
+
+class _Analyzer:
+    def __init__(self, tree: ast.Module, analysis: CodeAnalysis, modules: Iterable[str] = ()):
+        self.analysis = analysis
+        # Names of modules: calling their functions does not change them.
+        self.modules = set(modules)
+        self.bound: Set[str] = set()
+        self.imported: Set[str] = set()
+        # Module names that may refer to an object owned by earlier executions.
+        self.aliases: Set[str] = set()
+        self.literals: Dict[str, str] = {}
+        self.handles: Set[str] = set()
+        self._scan_block(tree.body)
+        self.analysis.binds = set(self.bound)
+        self.analysis.free_names -= BUILTIN_NAMES
+        self.modules |= self.imported
+        self._find_aliases(tree)
+        self._check(tree, None)
+
+    def _flag(self, reason: str) -> None:
+        if reason not in self.analysis.reasons:
+            self.analysis.reasons.append(reason)
+
+    def _use(self, node: Optional[ast.AST]) -> None:
+        if node is not None:
+            self.analysis.free_names |= _loaded_names(node) - self.bound
+            for child in _scope_nodes(node):
+                if isinstance(child, ast.NamedExpr):
+                    self.bound |= _target_names(child.target)
+
+    def _bind(self, names: Iterable[str]) -> None:
+        for name in names:
+            self.bound.add(name)
+            self.literals.pop(name, None)
+            self.handles.discard(name)
+
+    def _external(self, name: Optional[str], local: Optional[Set[str]]) -> bool:
+        if name is None or name in self.aliases:
+            return True
+        if local is not None:
+            return name not in local
+        return name in self.analysis.free_names or name not in self.bound or name in self.imported or name in self.aliases
+
+    def _scan_block(self, statements: List[ast.stmt]) -> None:
+        for statement in statements:
+            self._scan(statement)
+
+    def _scan(self, statement: ast.stmt) -> None:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            self.analysis.free_names |= _loaded_names(statement) - self.bound - {statement.name}
+            self._bind([statement.name])
+        elif isinstance(statement, (ast.For, ast.AsyncFor)):
+            self._use(statement.iter)
+            self._bind(_target_names(statement.target))
+            self._scan_block(statement.body + statement.orelse)
+        elif isinstance(statement, (ast.While, ast.If)):
+            self._use(statement.test)
+            self._scan_block(statement.body + statement.orelse)
+        elif isinstance(statement, (ast.With, ast.AsyncWith)):
+            for item in statement.items:
+                self._use(item.context_expr)
+                if item.optional_vars is not None:
+                    names = _target_names(item.optional_vars)
+                    self._bind(names)
+                    if isinstance(item.context_expr, ast.Call) and _dotted(item.context_expr.func)[-1:] == ["open"]:
+                        self.handles |= names
+            self._scan_block(statement.body)
+        elif isinstance(statement, ast.Try) or type(statement).__name__ == "TryStar":
+            self._scan_block(statement.body)
+            for handler in statement.handlers:
+                self._use(handler.type)
+                if handler.name:
+                    self._bind([handler.name])
+                self._scan_block(handler.body)
+            self._scan_block(statement.orelse + statement.finalbody)
+        elif isinstance(statement, ast.Match):
+            self._use(statement.subject)
+            for case in statement.cases:
+                self._bind(_stored_names([case.pattern]))
+                self._use(case.guard)
+                self._scan_block(case.body)
+        elif isinstance(statement, (ast.Import, ast.ImportFrom)):
+            names = _stored_names([statement])
+            self._bind(names)
+            self.imported |= names
+        elif isinstance(statement, ast.Assign):
+            self._use(statement.value)
+            for target in statement.targets:
+                self._use(target)
+            names = set().union(*(_target_names(target) for target in statement.targets))
+            self._bind(names)
+            self._track_value(names, statement.value)
+        elif isinstance(statement, ast.AugAssign):
+            self._use(statement.value)
+            self._use(statement.target)
+            if isinstance(statement.target, ast.Name) and statement.target.id not in self.bound:
+                self.analysis.free_names.add(statement.target.id)
+            self._bind(_target_names(statement.target))
+        elif isinstance(statement, ast.AnnAssign):
+            self._use(statement.value)
+            if statement.value is not None:
+                self._bind(_target_names(statement.target))
+                self._track_value(_target_names(statement.target), statement.value)
+        elif isinstance(statement, ast.Delete):
+            for target in statement.targets:
+                self._use(target)
+                names = _target_names(target)
+                self.analysis.free_names |= names - self.bound
+                self._bind(names)
+        elif isinstance(statement, (ast.Global, ast.Nonlocal)):
+            self.analysis.dynamic = True
+            self._flag("declares global names")
+        else:
+            self._use(statement)
+
+    def _track_value(self, names: Set[str], value: ast.AST) -> None:
+        if len(names) == 1 and isinstance(value, ast.Constant) and isinstance(value.value, str):
+            self.literals[next(iter(names))] = value.value
+
+    def _find_aliases(self, tree: ast.Module) -> None:
+        """
+        Collect the names, in any scope, that may refer to an object of an earlier execution
+        or to part of one: "a = df" and "s = df['x']" share the object, "v = df.to_numpy()"
+        may return a view of it, and the variables of loops and comprehensions over one
+        share its items. A name stays an alias even if it is rebound later.
+        """
+        sources = []
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.For, ast.AsyncFor, ast.comprehension)):
+                sources.append((_target_names(node.target), self._value_roots(node.iter)))
+            elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.NamedExpr)) and node.value is not None:
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                sources.append((set().union(*(_target_names(target) for target in targets)), self._value_roots(node.value)))
+        # Repeat until nothing changes, for aliases of aliases.
+        changed = True
+        while changed:
+            changed = False
+            for names, roots in sources:
+                if names - self.aliases and any(self._external(root, None) for root in roots):
+                    self.aliases |= names
+                    changed = True
+
+    def _value_roots(self, value: ast.AST) -> Set[str]:
+        """Names whose objects ``value`` may evaluate to, or to a part or view of."""
+        if isinstance(value, (ast.Tuple, ast.List, ast.Set)):
+            return set().union(set(), *(self._value_roots(element) for element in value.elts))
+        if isinstance(value, (ast.Starred, ast.NamedExpr)):
+            return self._value_roots(value.value)
+        if isinstance(value, ast.IfExp):
+            return self._value_roots(value.body) | self._value_roots(value.orelse)
+        if isinstance(value, ast.BoolOp):
+            return set().union(*(self._value_roots(operand) for operand in value.values))
+        if isinstance(value, ast.Call):
+            roots = set()
+            if isinstance(value.func, ast.Attribute):
+                roots |= self._value_roots(value.func.value)
+            for argument in value.args + [keyword.value for keyword in value.keywords]:
+                roots |= self._value_roots(argument)
+            return roots
+        if isinstance(value, (ast.Name, ast.Attribute, ast.Subscript)):
+            root = _root_name(value)
+            return {root} if root is not None and root not in self.modules else set()
+        return set()
+
+    def _check(self, node: ast.AST, local: Optional[Set[str]]) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                # Parameters may be objects of earlier executions, so they count as external.
+                self._check(child, (_function_locals(child) | (local or set())) - _parameters(child))
+                continue
+            self._check_node(child, local)
+            self._check(child, local)
+
+    def _check_node(self, node: ast.AST, local: Optional[Set[str]]) -> None:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            modules = [alias.name for alias in node.names] if isinstance(node, ast.Import) else [node.module or ""]
+            for module in modules:
+                if getattr(node, "level", 0) or module.split(".")[0] in UNSAFE_MODULES:
+                    self._flag(f"imports {module or 'a relative module'}")
+        elif isinstance(node, ast.Name):
+            defined = node.id in self.bound or (local is not None and node.id in local)
+            if node.id.startswith("__") or (node.id in DYNAMIC_BUILTINS and not defined):
+                self.analysis.dynamic = True
+                self._flag(f"uses {node.id}")
+            elif node.id in UNSAFE_BUILTINS and not defined:
+                self._flag(f"uses {node.id}")
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            self.analysis.string_literals.add(node.value)
+        elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name) and node.target.id in self.aliases:
+            # "l += [4]" extends the list in place when l shares it.
+            self._flag(f"modifies {node.target.id}")
+        elif isinstance(node, (ast.Attribute, ast.Subscript)) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            root = _root_name(node)
+            if self._external(root, local):
+                self._flag(f"modifies {root}")
+        elif isinstance(node, ast.Call):
+            self._check_call(node, local)
+
+    def _check_call(self, call: ast.Call, local: Optional[Set[str]]) -> None:
+        parts = _dotted(call.func)
+        if not parts:
+            return
+        name = parts[-1]
+        keywords = {keyword.arg: keyword.value for keyword in call.keywords if keyword.arg}
+        seeded = any(isinstance(keywords.get(keyword), ast.Constant) for keyword in SEED_KEYWORDS)
+        if not seeded and any(part in NONDETERMINISTIC_CALLS or part.lower().startswith("random") for part in parts):
+            self._flag(f"calls {'.'.join(parts)}, which is not deterministic")
+        if name in SIDE_EFFECT_CALLS:
+            self._flag(f"calls {name}, which has side effects")
+        inplace = keywords.get("inplace")
+        if isinstance(call.func, ast.Attribute) and isinstance(inplace, ast.Constant) and inplace.value:
+            root = _root_name(call.func.value)
+            if self._external(root, local):
+                self._flag(f"modifies {root}")
+        if "out" in keywords:
+            self._flag(f"calls {name} with out=, which writes to an existing array")
+        self._check_callee(call, name, local)
+        if name in READER_CALLS or name.startswith("read_"):
+            self._check_read(call, name, keywords)
+
+    def _check_callee(self, call: ast.Call, name: str, local: Optional[Set[str]]) -> None:
+        """
+        Reject calls that may change an object of an earlier execution: calling a method
+        on one, passing one to a function, or calling a function an earlier execution
+        defined. Functions and methods in ``PURE_CALLS`` and functions the snippet defines
+        itself, whose bodies are checked like the rest of the code, are allowed.
+        """
+        if isinstance(call.func, ast.Name):
+            callee = call.func.id
+            defined = (local is not None and callee in local) or (callee in self.bound and callee not in self.aliases and callee not in self.imported)
+            if defined:
+                return
+            if callee not in BUILTIN_NAMES and callee not in KERNEL_NAMES and callee not in self.imported:
+                self._flag(f"calls {callee}, which an earlier execution defined")
+                return
+        elif not isinstance(call.func, ast.Attribute):
+            self._flag("calls a computed function")
+            return
+        if name in READER_CALLS or name.startswith("read_") or name in PURE_CALLS:
+            return
+        if isinstance(call.func, ast.Attribute):
+            receiver = _root_name(call.func.value)
+            if receiver not in self.modules and self._external(receiver, local):
+                self._flag(f"possibly modifies {receiver or 'an expression'}: {name} is not known to be pure")
+                return
+        for argument in call.args + [keyword.value for keyword in call.keywords]:
+            for argument_name in sorted(_loaded_names(argument)):
+                if argument_name not in self.modules and argument_name not in BUILTIN_NAMES and self._external(argument_name, local):
+                    self._flag(f"possibly modifies {argument_name}: passes it to {name}, which is not known to be pure")
+                    return
+
+    def _check_read(self, call: ast.Call, name: str, keywords: Dict[str, ast.AST]) -> None:
+        if name == "open":
+            mode = call.args[1] if len(call.args) > 1 else keywords.get("mode")
+            if mode is not None and not (isinstance(mode, ast.Constant) and isinstance(mode.value, str) and not set(mode.value) & set("wax+")):
+                self._flag("opens a file for writing")
+        source = call.args[0] if call.args else next((keywords[key] for key in PATH_KEYWORDS if key in keywords), None)
+        if source is None:
+            return
+        if isinstance(source, ast.Constant) and isinstance(source.value, str):
+            self.analysis.file_literals.add(source.value)
+        elif isinstance(source, ast.Name) and source.id in self.literals:
+            self.analysis.file_literals.add(self.literals[source.id])
+        elif not (isinstance(source, ast.Name) and source.id in self.handles):
+            self._flag(f"calls {name} on a computed path")
+
+
+def analyze_code(code: str, modules: Iterable[str] = ()) -> CodeAnalysis:
+    """
+    Statically decide whether running ``code`` can be replaced by a stored result.
+
+    The check is conservative: anything it cannot prove harmless is reported as not
+    cacheable. In particular a call that receives or is made on an object of an earlier
+    execution is only allowed if the function or method is in ``PURE_CALLS``. Comments
+    and formatting do not change ``canonical``.
+
+    Args:
+        code (str): The snippet.
+        modules (Iterable[str]): Global names that are modules, e.g. the kernel's pre-imports;
+            calling their functions does not change them.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        analysis = CodeAnalysis(code)
+        analysis.reasons.append(f"does not parse: {e.msg}")
+        return analysis
+    analysis = CodeAnalysis(ast.dump(tree, annotate_fields=False))
+    _Analyzer(tree, analysis, modules)
+    return analysis
+
+
+def execution_key(canonical: str, inputs: Dict[str, str], datasets: Dict[str, str]) -> str:
+    """
+    Key of one execution: the canonical code, the keys of the executions that produced
+    the globals it reads, and the fingerprints of the data files it names.
+    """
+    payload = json.dumps({"code": canonical, "inputs": inputs, "datasets": datasets}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SandboxDatasets:
+    """
+    Content fingerprints of the data files a sandbox can read, by every path code may use
+    for them (the sandbox path, the file name, ...).
+
+    Shared by the tools that stage files into a sandbox and the interpreter running in it.
+    Listeners are called with the old fingerprint when a path is re-staged with new content.
+    """
+
+    def __init__(self):
+        self._fingerprints: Dict[str, str] = {}
+        self._listeners: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def record(self, paths: Iterable[str], fingerprint: str) -> None:
+        replaced = set()
+        with self._lock:
+            for path in paths:
+                path = self._normalize(path)
+                previous = self._fingerprints.get(path)
+                if previous is not None and previous != fingerprint:
+                    replaced.add(previous)
+                self._fingerprints[path] = fingerprint
+            listeners = list(self._listeners)
+            replaced -= set(self._fingerprints.values())
+        for old in replaced:
+            for listener in listeners:
+                listener(old)
+
+    def resolve(self, path: str) -> Optional[str]:
+        """Fingerprint of the file code names as ``path``, or None if it was never staged."""
+        with self._lock:
+            return self._fingerprints.get(self._normalize(path))
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        path = posixpath.normpath(path.replace("\\", "/"))
+        return path[2:] if path.startswith("./") else path
+
+
+class CachedExecution:
+    """A stored execution result: its stdout and copies of the artifacts it saved."""
+
+    def __init__(self, key: str, stdout: str, artifacts: List[Dict], datasets: FrozenSet[str], size: int):
+        self.key = key
+        self.stdout = stdout
+        self.artifacts = artifacts
+        self.datasets = datasets
+        self.size = size
+        self.hits = 0
+
+
+class ExecutionCache:
+    """
+    Results of pure code executions, shared across sessions.
+
+    Entries are kept in least-recently-used order within ``max_entries`` and ``max_bytes``
+    (stdout plus artifact files). Artifact files are copied into ``artifact_dir`` so an
+    entry outlives the sandbox that produced it. Entries naming a dataset are dropped by
+    ``invalidate_dataset`` when that dataset changes. Sandboxes sharing a cache should run
+    the same image, since results are reused between them.
+
+    Args:
+        max_entries (int): Entries kept at most.
+        max_bytes (int): Total size of stdout and artifacts kept at most.
+        artifact_dir (str): Where artifact copies are kept.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024, artifact_dir: str = ".cache/executions", logger=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.artifact_dir = artifact_dir
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._entries: "collections.OrderedDict[str, CachedExecution]" = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters = collections.Counter()
+
+    def get(self, key: str) -> Optional[CachedExecution]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.counters["hits"] += 1
+            return entry
+
+    def put(self, key: str, stdout: str, artifacts: List[Tuple[Dict, str]], datasets: Iterable[str], inputs: Iterable[str] = ()) -> None:
+        """
+        Store a result.
+
+        Args:
+            key (str): ``execution_key`` of the code.
+            stdout (str): Its output.
+            artifacts (List[Tuple[Dict, str]]): ``(artifact record, host path)`` for every artifact it saved.
+            datasets (Iterable[str]): Fingerprints of the datasets it read.
+            inputs (Iterable[str]): Keys of the executions that produced the globals it read;
+                their datasets become this entry's too.
+        """
+        records, size = [], len(stdout.encode("utf-8"))
+        directory = os.path.join(self.artifact_dir, key)
+        try:
+            for record, host_path in artifacts:
+                os.makedirs(directory, exist_ok=True)
+                copy = os.path.join(directory, os.path.basename(record["path"]))
+                shutil.copyfile(host_path, copy)
+                size += os.path.getsize(copy)
+                records.append({**record, "path": copy})
+        except OSError as e:
+            self.logger.debug("Not caching an execution whose artifacts could not be copied: %s", e)
+            shutil.rmtree(directory, ignore_errors=True)
+            return
+        if size > self.max_bytes:
+            shutil.rmtree(directory, ignore_errors=True)
+            return
+        with self._lock:
+            datasets = set(datasets)
+            for input_key in inputs:
+                if input_key in self._entries:
+                    datasets |= self._entries[input_key].datasets
+            entry = CachedExecution(key, stdout, records, frozenset(datasets), size)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += size
+            self.counters["stored"] += 1
+            evicted = []
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._bytes -= oldest.size
+                evicted.append(oldest)
+            self.counters["evicted"] += len(evicted)
+        for oldest in evicted:
+            self._discard(oldest)
+
+    def invalidate_dataset(self, fingerprint: str) -> int:
+        """Drop every entry that read the dataset with this fingerprint. Returns how many were dropped."""
+        with self._lock:
+            stale = [entry for entry in self._entries.values() if fingerprint in entry.datasets]
+            for entry in stale:
+                del self._entries[entry.key]
+                self._bytes -= entry.size
+            self.counters["invalidated"] += len(stale)
+        for entry in stale:
+            self._discard(entry)
+        if stale:
+            self.logger.debug("Dropped %d cached executions that read dataset %s.", len(stale), fingerprint[:12])
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._bytes = 0
+        for entry in entries:
+            self._discard(entry)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, **self.counters}
+
+    def _discard(self, entry: CachedExecution) -> None:
+        if entry.artifacts:
+            shutil.rmtree(os.path.join(self.artifact_dir, entry.key), ignore_errors=True)
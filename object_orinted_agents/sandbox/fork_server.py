@@ -0,0 +1,246 @@
+import collections
+import json
+import queue
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from object_orinted_agents.sandbox.kernel import DEFAULT_PREIMPORTS, KernelBackend, KernelCrashedError, LocalKernelBackend, PythonKernel
+from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.tracing import get_tracer
+
+
+def new_socket_path(prefix: str) -> str:
+    """A fresh Unix socket path under /tmp, which exists both locally and in the sandbox image."""
+    return f"/tmp/{prefix}-{uuid.uuid4().hex[:12]}.sock"
+
+
+class ForkedKernelBackend(KernelBackend):
+    """
+    Starts kernels by forking them from a fork server in the sandbox instead of starting
+    a new interpreter.
+
+    ``base`` runs the small connector process that hands its stdin and stdout to the
+    forked kernel, so forking works wherever ``base`` can run the kernel server. The
+    connector's working directory and environment are those of the kernel.
+
+    Args:
+        base (KernelBackend): Backend that runs the connector, e.g. a ``DockerKernelBackend``.
+        socket_path (str): Unix socket of the fork server in the sandbox.
+        server (ForkServer): Restarted before a connection if it has died; None for snapshots.
+    """
+
+    def __init__(self, base: KernelBackend, socket_path: str, server: Optional["ForkServer"] = None):
+        self.base = base
+        self.socket_path = socket_path
+        self.server = server
+
+    def command(self, kernel_args: List[str]) -> List[str]:
+        if self.server is not None:
+            self.server.ensure_running()
+        return self.base.command(["--connect", self.socket_path, *kernel_args])
+
+    def cwd(self) -> Optional[str]:
+        return self.base.cwd()
+
+    def env(self) -> Optional[Dict[str, str]]:
+        return self.base.env()
+
+    def kill(self, process: subprocess.Popen, kernel_pid: Optional[int]) -> None:
+        # The kernel is a child of the fork server, not of the connector process.
+        if kernel_pid:
+            self.base.kill_pid(kernel_pid)
+        process.kill()
+
+    def kill_pid(self, pid: int, signum: int = getattr(signal, "SIGKILL", signal.SIGTERM)) -> None:
+        self.base.kill_pid(pid, signum)
+
+    def fetch(self, sandbox_path: str, host_path: str) -> str:
+        return self.base.fetch(sandbox_path, host_path)
+
+
+class ForkServer:
+    """
+    A zygote: one process in the sandbox that imports the heavy libraries once and forks
+    a kernel from itself for every session.
+
+    Forked kernels are ready in milliseconds and share the imported modules with the
+    zygote copy-on-write, so each one only costs the memory it changes. Kernels keep
+    running if the zygote stops; the next kernel start restarts it.
+
+    Args:
+        backend (KernelBackend): Where the zygote runs, and by default the connectors of its kernels.
+        preimports (List[str]): Modules imported once in the zygote, as for ``PythonKernel``.
+        socket_path (str): Unix socket the zygote listens on in the sandbox.
+        start_timeout (float): Seconds to wait for the zygote to finish importing.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[KernelBackend] = None,
+        preimports: Optional[List[str]] = None,
+        socket_path: Optional[str] = None,
+        start_timeout: float = 300.0,
+        logger=None,
+    ):
+        self.backend = backend or LocalKernelBackend()
+        self.preimports = DEFAULT_PREIMPORTS if preimports is None else preimports
+        self.socket_path = socket_path or new_socket_path("kernel-zygote")
+        self.start_timeout = start_timeout
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.process: Optional[subprocess.Popen] = None
+        self.ready_info: Dict = {}
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._stderr_tail = collections.deque(maxlen=50)
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        with self._lock:
+            if self.is_alive:
+                return
+            with get_tracer().span("sandbox.fork_server.start", backend=self.backend.__class__.__name__) as span:
+                args = ["--zygote", self.socket_path]
+                for spec in self.preimports:
+                    args += ["--preimport", spec]
+                started = time.perf_counter()
+                self.process = subprocess.Popen(
+                    self.backend.command(args),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    bufsize=1,
+                    cwd=self.backend.cwd(),
+                    env=self.backend.env(),
+                )
+                self._stderr_tail.clear()
+                lines: "queue.Queue[Optional[str]]" = queue.Queue()
+                threading.Thread(target=self._read_stdout, args=(self.process, lines), daemon=True).start()
+                threading.Thread(target=self._drain_stderr, args=(self.process,), daemon=True).start()
+                try:
+                    line = lines.get(timeout=self.start_timeout)
+                except queue.Empty:
+                    line = None
+                if line is None:
+                    self.process.kill()
+                    self.process.wait()
+                    stderr = "".join(self._stderr_tail)
+                    raise KernelCrashedError(f"Fork server did not start (exit code {self.process.returncode}). {stderr}".strip())
+                self.ready_info = json.loads(line)
+                if self.ready_info.get("failed"):
+                    self.logger.warning("Fork server could not pre-import: %s", self.ready_info["failed"])
+                self.logger.info(
+                    "Fork server started in %.2fs (pid=%s, socket=%s, preimported=%s)",
+                    time.perf_counter() - started, self.ready_info.get("pid"), self.socket_path, self.ready_info.get("preimported"),
+                )
+                span.set_attribute("pid", self.ready_info.get("pid"))
+
+    def ensure_running(self) -> None:
+        if self.is_alive:
+            return
+        if self.process is not None:
+            self.logger.warning("Fork server exited with code %s, restarting it.", self.process.returncode)
+            self.restarts += 1
+        self.start()
+
+    def kernel_backend(self, connector_backend: Optional[KernelBackend] = None) -> ForkedKernelBackend:
+        """
+        A backend whose kernels are forked from this server.
+
+        Args:
+            connector_backend (KernelBackend): Runs the connector, e.g. a ``LocalKernelBackend`` with
+                the session's working directory. Must reach the same sandbox as the server's backend.
+        """
+        return ForkedKernelBackend(connector_backend or self.backend, self.socket_path, server=self)
+
+    def new_kernel(self, connector_backend: Optional[KernelBackend] = None, **kernel_args) -> PythonKernel:
+        """A ``PythonKernel`` forked from this server; ``kernel_args`` are passed to it."""
+        kernel_args.setdefault("logger", self.logger)
+        return PythonKernel(backend=self.kernel_backend(connector_backend), preimports=self.preimports, **kernel_args)
+
+    def shutdown(self) -> None:
+        """Stop the zygote. Kernels forked from it keep running until they are shut down."""
+        with self._lock:
+            if self.process is None:
+                return
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.backend.kill(self.process, self.ready_info.get("pid"))
+                self.process.wait()
+            self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    @staticmethod
+    def _read_stdout(process: subprocess.Popen, lines: "queue.Queue[Optional[str]]") -> None:
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def _drain_stderr(self, process: subprocess.Popen) -> None:
+        for line in process.stderr:
+            self._stderr_tail.append(line)
+
+
+class KernelSnapshot:
+    """
+    A copy of a kernel's globals taken with ``PythonKernel.snapshot``, held by a fork
+    server in the sandbox.
+
+    Kernels forked from it start with everything the kernel had loaded, e.g. a parsed
+    dataset, and are independent of the original kernel, the snapshot and each other.
+    Resetting a forked kernel clears its globals, not back to the snapshot.
+
+    Args:
+        backend (KernelBackend): Backend of the sandbox the snapshot lives in.
+        socket_path (str): Unix socket the snapshot serves forks on.
+        pid (int): Pid of the snapshot's fork server in the sandbox.
+        preimports (List[str]): Pre-imports of the kernel the snapshot was taken from.
+    """
+
+    def __init__(self, backend: KernelBackend, socket_path: str, pid: int, preimports: Optional[List[str]] = None, logger=None):
+        self.backend = backend
+        self.socket_path = socket_path
+        self.pid = pid
+        self.preimports = list(preimports or [])
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.closed = False
+
+    def kernel_backend(self, connector_backend: Optional[KernelBackend] = None) -> ForkedKernelBackend:
+        return ForkedKernelBackend(connector_backend or self.backend, self.socket_path)
+
+    def fork(self, connector_backend: Optional[KernelBackend] = None, **kernel_args) -> PythonKernel:
+        """A new ``PythonKernel`` starting from the snapshot's globals; ``kernel_args`` are passed to it."""
+        if self.closed:
+            raise RuntimeError("The snapshot is closed.")
+        kernel_args.setdefault("logger", self.logger)
+        return PythonKernel(backend=self.kernel_backend(connector_backend), preimports=self.preimports, **kernel_args)
+
+    def close(self) -> None:
+        """Stop the snapshot's fork server. Kernels already forked from it keep running."""
+        if not self.closed:
+            self.closed = True
+            self.backend.kill_pid(self.pid, signal.SIGTERM)
+
+    def __enter__(self) -> "KernelSnapshot":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"KernelSnapshot(pid={self.pid}, socket={self.socket_path!r}, closed={self.closed})"
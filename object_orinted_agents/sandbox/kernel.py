@@ -0,0 +1,523 @@
+import collections
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.tracing import get_tracer
+
+_KERNEL_SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kernel_server.py")
+
+DEFAULT_PREIMPORTS = ["pandas:pd", "numpy:np", "sklearn"]
+
+
+def kernel_server_source() -> str:
+    """Return the source of the in-sandbox kernel so it can be passed with ``python -c``."""
+    with open(_KERNEL_SERVER_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class KernelBackend(ABC):
+    """Describes how to launch a kernel process."""
+
+    @abstractmethod
+    def command(self, kernel_args: List[str]) -> List[str]:
+        """Return the argv used to start the kernel with the given kernel arguments."""
+        pass
+
+    def cwd(self) -> Optional[str]:
+        return None
+
+    def env(self) -> Optional[Dict[str, str]]:
+        return None
+
+    def kill(self, process: subprocess.Popen, kernel_pid: Optional[int]) -> None:
+        """Forcibly stop a kernel that no longer responds."""
+        process.kill()
+
+    def kill_pid(self, pid: int, signum: int = getattr(signal, "SIGKILL", signal.SIGTERM)) -> None:
+        """Send a signal to a process in the sandbox, e.g. a forked kernel or a fork server."""
+        try:
+            os.kill(pid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def fetch(self, sandbox_path: str, host_path: str) -> str:
+        """
+        Make a file the kernel wrote readable on the host and return its host path.
+
+        Local kernels share the host filesystem, so the file is used where it is.
+        """
+        return sandbox_path
+
+
+class LocalKernelBackend(KernelBackend):
+    """Runs the kernel as a local subprocess. Used for tests and Docker-less setups."""
+
+    def __init__(self, python_executable: str = sys.executable, working_dir: Optional[str] = None, env: Optional[Dict[str, str]] = None):
+        self.python_executable = python_executable
+        self.working_dir = working_dir
+        self.extra_env = env or {}
+
+    def command(self, kernel_args: List[str]) -> List[str]:
+        return [self.python_executable, "-u", "-c", kernel_server_source(), *kernel_args]
+
+    def cwd(self) -> Optional[str]:
+        return self.working_dir
+
+    def env(self) -> Optional[Dict[str, str]]:
+        if not self.extra_env:
+            return None
+        return {**os.environ, **self.extra_env}
+
+
+class DockerKernelBackend(KernelBackend):
+    """Runs the kernel inside an already running sandbox container via ``docker exec -i``."""
+
+    def __init__(self, container_name: str = "python_sandbox", python_executable: str = "python3"):
+        self.container_name = container_name
+        self.python_executable = python_executable
+
+    def command(self, kernel_args: List[str]) -> List[str]:
+        return ["docker", "exec", "-i", self.container_name, self.python_executable, "-u", "-c", kernel_server_source(), *kernel_args]
+
+    def kill(self, process: subprocess.Popen, kernel_pid: Optional[int]) -> None:
+        # Killing the local `docker exec` client would leave the kernel running in the container.
+        if kernel_pid:
+            self.kill_pid(kernel_pid)
+        process.kill()
+
+    def kill_pid(self, pid: int, signum: int = getattr(signal, "SIGKILL", signal.SIGTERM)) -> None:
+        subprocess.run(["docker", "exec", self.container_name, "kill", f"-{int(signum)}", str(pid)], capture_output=True, text=True)
+
+    def fetch(self, sandbox_path: str, host_path: str) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(host_path)), exist_ok=True)
+        subprocess.run(["docker", "cp", f"{self.container_name}:{sandbox_path}", host_path], check=True, capture_output=True, text=True)
+        return host_path
+
+
+class ExecutionLimits:
+    """
+    Limits applied to every execution in a kernel.
+
+    ``timeout`` and ``cpu_seconds`` interrupt the running code with an exception inside the
+    kernel, so its variables survive. Code that cannot be interrupted (e.g. stuck in a C
+    extension) gets ``kill_grace`` more seconds, then the kernel is killed and restarted.
+
+    Args:
+        timeout (Optional[float]): Wall-clock seconds per execution.
+        cpu_seconds (Optional[float]): CPU seconds per execution.
+        memory_mb (Optional[int]): Address-space cap of the kernel process; allocations past
+            it raise MemoryError.
+        max_output_chars (Optional[int]): Characters of stdout and of stderr kept per
+            execution; longer output keeps its beginning and end.
+        kill_grace (float): Seconds past ``timeout`` before the kernel is killed.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = 120.0,
+        cpu_seconds: Optional[float] = None,
+        memory_mb: Optional[int] = None,
+        max_output_chars: Optional[int] = 20000,
+        kill_grace: float = 5.0,
+    ):
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_output_chars = max_output_chars
+        self.kill_grace = kill_grace
+
+
+class ResourceUsage:
+    """Resources one execution used, as measured inside the kernel."""
+
+    def __init__(self, wall_seconds: float = 0.0, cpu_seconds: float = 0.0, peak_rss_kb: Optional[int] = None, output_bytes: int = 0):
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self.peak_rss_kb = peak_rss_kb
+        self.output_bytes = output_bytes
+
+    @classmethod
+    def from_dict(cls, usage: Optional[Dict]) -> Optional["ResourceUsage"]:
+        if not usage:
+            return None
+        return cls(usage.get("wall_seconds", 0.0), usage.get("cpu_seconds", 0.0), usage.get("peak_rss_kb"), usage.get("output_bytes", 0))
+
+    def to_dict(self) -> Dict:
+        return {
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss_kb": self.peak_rss_kb,
+            "output_bytes": self.output_bytes,
+        }
+
+    def __repr__(self) -> str:
+        return f"ResourceUsage({self.to_dict()})"
+
+
+class KernelRestartPolicy:
+    """
+    When a kernel should be restarted.
+
+    Args:
+        restart_on_crash (bool): Start a fresh kernel when the process dies.
+        max_restarts (Optional[int]): Give up after this many restarts. None means unlimited.
+        max_memory_mb (Optional[int]): Restart once the kernel's resident memory exceeds this.
+        max_executions (Optional[int]): Restart after this many executions.
+    """
+
+    def __init__(
+        self,
+        restart_on_crash: bool = True,
+        max_restarts: Optional[int] = 5,
+        max_memory_mb: Optional[int] = None,
+        max_executions: Optional[int] = None,
+    ):
+        self.restart_on_crash = restart_on_crash
+        self.max_restarts = max_restarts
+        self.max_memory_mb = max_memory_mb
+        self.max_executions = max_executions
+
+
+class KernelResult:
+    """Outcome of one ``execute`` request."""
+
+    def __init__(
+        self,
+        stdout: str = "",
+        stderr: str = "",
+        error: Optional[str] = None,
+        rss_kb: Optional[int] = None,
+        notice: Optional[str] = None,
+        timed_out: bool = False,
+        truncated: bool = False,
+        usage: Optional[ResourceUsage] = None,
+        artifacts: Optional[List[Dict]] = None,
+    ):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.error = error
+        self.rss_kb = rss_kb
+        self.notice = notice
+        self.timed_out = timed_out
+        self.truncated = truncated
+        self.usage = usage
+        # Files saved by the code, as {"name", "kind", "path", "bytes", "summary"} with sandbox paths.
+        self.artifacts = artifacts or []
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def errors(self) -> str:
+        """stderr and traceback combined, in the shape the interpreter tool reports."""
+        return "".join(part for part in (self.stderr, self.error) if part)
+
+
+class KernelCrashedError(RuntimeError):
+    pass
+
+
+class KernelTimeoutError(RuntimeError):
+    pass
+
+
+class PythonKernel:
+    """
+    A persistent Python process that keeps its globals between executions.
+
+    Heavy libraries are imported once at start-up, so each call only pays for the
+    code it runs. The kernel is started lazily on the first execution. Every
+    execution runs under ``limits`` (a two-minute timeout and 20,000 characters of
+    output by default). Artifacts saved with ``save_artifact`` go to ``artifact_dir``
+    inside the sandbox, ``artifacts/`` under the kernel's working directory by default.
+    A kernel that is not ready within ``start_timeout`` seconds, e.g. because a
+    pre-import hangs, is killed and ``start`` raises ``KernelCrashedError``.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[KernelBackend] = None,
+        preimports: Optional[List[str]] = None,
+        restart_policy: Optional[KernelRestartPolicy] = None,
+        logger=None,
+        on_execute: Optional[Callable[[float], None]] = None,
+        limits: Optional[ExecutionLimits] = None,
+        artifact_dir: Optional[str] = None,
+        start_timeout: float = 300.0,
+    ):
+        self.backend = backend or LocalKernelBackend()
+        self.artifact_dir = artifact_dir
+        self.start_timeout = start_timeout
+        self.limits = limits or ExecutionLimits()
+        self.preimports = DEFAULT_PREIMPORTS if preimports is None else preimports
+        self.restart_policy = restart_policy or KernelRestartPolicy()
+        self.logger = logger or get_logger(self.__class__.__name__)
+        # Called with the wall-clock seconds of every execution, e.g. by a sandbox pool for metrics.
+        self.on_execute = on_execute
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self.executions = 0
+        self.ready_info: Dict = {}
+        self._next_id = 0
+        self._lock = threading.RLock()
+        self._stderr_tail = collections.deque(maxlen=50)
+        self._messages: "queue.Queue[Optional[str]]" = queue.Queue()
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        with self._lock:
+            if self.is_alive:
+                return
+            with get_tracer().span("sandbox.start", backend=self.backend.__class__.__name__) as span:
+                kernel_args = []
+                for spec in self.preimports:
+                    kernel_args += ["--preimport", spec]
+                if self.limits.memory_mb:
+                    kernel_args += ["--memory-mb", str(self.limits.memory_mb)]
+                if self.artifact_dir:
+                    kernel_args += ["--artifact-dir", self.artifact_dir]
+                self.logger.debug("Starting kernel with backend %s", self.backend.__class__.__name__)
+                self.process = subprocess.Popen(
+                    self.backend.command(kernel_args),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    bufsize=1,
+                    cwd=self.backend.cwd(),
+                    env=self.backend.env(),
+                )
+                self._stderr_tail.clear()
+                self._messages = queue.Queue()
+                threading.Thread(target=self._drain_stderr, args=(self.process,), daemon=True).start()
+                threading.Thread(target=self._read_stdout, args=(self.process, self._messages), daemon=True).start()
+                self.executions = 0
+
+                try:
+                    self.ready_info = self._read_message(time.monotonic() + self.start_timeout)
+                except KernelTimeoutError:
+                    # The kernel's pid is only known once it is ready, so only the process we started can be killed.
+                    self.backend.kill(self.process, None)
+                    self.process.wait()
+                    self.process = None
+                    stderr = "".join(self._stderr_tail)
+                    raise KernelCrashedError(f"Kernel did not start within {self.start_timeout}s. {stderr}".strip())
+                if self.ready_info.get("failed"):
+                    self.logger.warning("Kernel could not pre-import: %s", self.ready_info['failed'])
+                self.logger.info("Kernel started (pid=%s, preimported=%s)", self.ready_info.get('pid'), self.ready_info.get('preimported'))
+                span.set_attribute("pid", self.ready_info.get("pid"))
+
+    def execute(self, code: str, on_output: Optional[Callable[[str], None]] = None) -> KernelResult:
+        """
+        Run code in the kernel's persistent namespace.
+
+        Args:
+            code (str): Python source to execute.
+            on_output (Optional[Callable[[str], None]]): Receives stdout while the code runs.
+
+        Returns:
+            KernelResult: Complete stdout/stderr and the traceback, if any.
+        """
+        with self._lock, get_tracer().span("sandbox.execute", code_chars=len(code)) as span:
+            self._ensure_started()
+            limits = self.limits
+            request = {
+                "op": "execute",
+                "code": code,
+                "stream": on_output is not None,
+                "timeout": limits.timeout,
+                "cpu_seconds": limits.cpu_seconds,
+                "max_output": limits.max_output_chars,
+            }
+            deadline = None if limits.timeout is None else time.monotonic() + limits.timeout + limits.kill_grace
+            started = time.perf_counter()
+            try:
+                response = self._request(request, on_stream=on_output, deadline=deadline)
+            except KernelTimeoutError as e:
+                span.record_error(e)
+                return self._handle_timeout(e)
+            except KernelCrashedError as e:
+                span.record_error(e)
+                return self._handle_crash(e)
+            finally:
+                if self.on_execute:
+                    self.on_execute(time.perf_counter() - started)
+
+            self.executions += 1
+            result = KernelResult(
+                stdout=response.get("stdout", ""),
+                stderr=response.get("stderr", ""),
+                error=response.get("error"),
+                rss_kb=response.get("rss_kb"),
+                timed_out=response.get("timed_out", False),
+                truncated=response.get("truncated", False),
+                usage=ResourceUsage.from_dict(response.get("usage")),
+                artifacts=response.get("artifacts"),
+            )
+            span.set_attributes({
+                "stdout_chars": len(result.stdout),
+                "stderr_chars": len(result.stderr),
+                "rss_kb": result.rss_kb,
+                "raised": result.error is not None,
+                "timed_out": result.timed_out,
+                "truncated": result.truncated,
+                "artifacts": len(result.artifacts),
+            })
+            if result.usage is not None:
+                span.set_attributes(result.usage.to_dict())
+            self._apply_restart_policy(result)
+            return result
+
+    def reset(self) -> None:
+        """Clear the kernel's globals without restarting the process."""
+        with self._lock:
+            self._ensure_started()
+            self._request({"op": "reset"})
+
+    def snapshot(self, socket_path: Optional[str] = None) -> "KernelSnapshot":
+        """
+        Copy the kernel's current globals, e.g. a loaded dataset, into a fork server in the
+        sandbox that new kernels can be forked from. The kernel itself carries on unchanged.
+
+        Args:
+            socket_path (str): Unix socket for the snapshot in the sandbox; a new path under /tmp by default.
+
+        Returns:
+            KernelSnapshot: Forks kernels from the snapshot; ``close`` it when no longer needed.
+        """
+        from object_orinted_agents.sandbox.fork_server import ForkedKernelBackend, KernelSnapshot, new_socket_path
+
+        with self._lock:
+            self._ensure_started()
+            socket_path = socket_path or new_socket_path("kernel-snapshot")
+            response = self._request({"op": "snapshot", "socket": socket_path}, deadline=time.monotonic() + 60)
+            if not response.get("ok"):
+                raise RuntimeError(f"Could not snapshot the kernel: {response.get('error')}")
+            backend = self.backend.base if isinstance(self.backend, ForkedKernelBackend) else self.backend
+            self.logger.info("Snapshot of kernel %s served by pid %s on %s", self.ready_info.get("pid"), response["pid"], socket_path)
+            return KernelSnapshot(backend, socket_path, response["pid"], preimports=self.preimports, logger=self.logger)
+
+    def restart(self) -> None:
+        with self._lock:
+            self.shutdown()
+            self.start()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self.process is None:
+                return
+            if self.is_alive:
+                try:
+                    self._request({"op": "shutdown"}, deadline=time.monotonic() + 5)
+                    self.process.wait(timeout=5)
+                except (KernelCrashedError, KernelTimeoutError, OSError, subprocess.TimeoutExpired):
+                    self.backend.kill(self.process, self.ready_info.get("pid"))
+                    self.process.wait()
+            self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def _ensure_started(self) -> None:
+        if self.is_alive:
+            return
+        if self.process is not None:
+            # The process died between calls.
+            self._restart_after_crash("Kernel process exited unexpectedly.")
+        else:
+            self.start()
+
+    def _request(self, message: Dict, on_stream: Optional[Callable[[str], None]] = None, deadline: Optional[float] = None) -> Dict:
+        self._next_id += 1
+        message["id"] = self._next_id
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise KernelCrashedError(f"Kernel is not accepting requests: {e}")
+        while True:
+            response = self._read_message(deadline)
+            if response.get("id") != message["id"]:
+                continue
+            if response.get("op") == "stream":
+                if on_stream:
+                    on_stream(response.get("text", ""))
+                continue
+            return response
+
+    def _read_message(self, deadline: Optional[float] = None) -> Dict:
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        try:
+            line = self._messages.get(timeout=timeout)
+        except queue.Empty:
+            raise KernelTimeoutError(f"Kernel did not respond within {self.limits.timeout}s (+{self.limits.kill_grace}s grace).")
+        if line is None:
+            self.process.wait()
+            stderr = "".join(self._stderr_tail)
+            raise KernelCrashedError(f"Kernel exited with code {self.process.returncode}. {stderr}".strip())
+        return json.loads(line)
+
+    def _read_stdout(self, process: subprocess.Popen, messages: "queue.Queue[Optional[str]]") -> None:
+        # A reader thread lets _read_message wait with a deadline; None marks the end of output.
+        for line in process.stdout:
+            messages.put(line)
+        messages.put(None)
+
+    def _drain_stderr(self, process: subprocess.Popen) -> None:
+        for line in process.stderr:
+            self._stderr_tail.append(line)
+
+    def _handle_crash(self, error: KernelCrashedError) -> KernelResult:
+        self.logger.error("Kernel crashed: %s", error)
+        self._restart_after_crash(str(error))
+        return KernelResult(error=str(error), notice="The kernel was restarted and all variables were lost.")
+
+    def _handle_timeout(self, error: KernelTimeoutError) -> KernelResult:
+        # The kernel ignored the in-process timeout, so it is killed; restarting keeps the worker usable.
+        self.logger.error("Killing unresponsive kernel: %s", error)
+        self.backend.kill(self.process, self.ready_info.get("pid"))
+        self.process.wait()
+        self.process = None
+        self.restarts += 1
+        self.start()
+        return KernelResult(error=str(error), timed_out=True, notice="The kernel was restarted and all variables were lost.")
+
+    def _restart_after_crash(self, reason: str) -> None:
+        policy = self.restart_policy
+        if not policy.restart_on_crash:
+            raise KernelCrashedError(reason)
+        if policy.max_restarts is not None and self.restarts >= policy.max_restarts:
+            raise KernelCrashedError(f"{reason} Restart limit ({policy.max_restarts}) reached.")
+        self.process = None
+        self.restarts += 1
+        self.start()
+
+    def _apply_restart_policy(self, result: KernelResult) -> None:
+        policy = self.restart_policy
+        reason = None
+        if policy.max_memory_mb is not None and result.rss_kb and result.rss_kb > policy.max_memory_mb * 1024:
+            reason = f"memory usage {result.rss_kb // 1024} MB exceeded {policy.max_memory_mb} MB"
+        elif policy.max_executions is not None and self.executions >= policy.max_executions:
+            reason = f"reached {policy.max_executions} executions"
+        if reason is None:
+            return
+        self.logger.warning("Restarting kernel: %s", reason)
+        self.restart()
+        result.notice = f"The kernel was restarted ({reason}); variables from earlier steps were cleared."
@@ -0,0 +1,681 @@
+"""
+Long-lived Python kernel that runs inside the sandbox.
+
+The host starts this file with
+``python3 -u -c <source> [--preimport module[:alias] ...] [--memory-mb N] [--artifact-dir DIR]``
+so it must only depend on the standard library. Requests and responses are
+JSON objects, one per line, exchanged over stdin and the original stdout.
+
+Requests:
+    {"id": 1, "op": "execute", "code": "print(1 + 1)", "timeout": 60, "cpu_seconds": 30, "max_output": 20000}
+    {"id": 2, "op": "reset"}
+    {"id": 3, "op": "ping"}
+    {"id": 4, "op": "shutdown"}
+
+Responses:
+    {"id": 1, "ok": true, "stdout": "2\\n", "stderr": "", "error": null, "rss_kb": 51234,
+     "timed_out": false, "truncated": false, "artifacts": [],
+     "usage": {"wall_seconds": 0.001, "cpu_seconds": 0.001, "peak_rss_kb": 51234, "output_bytes": 2}}
+
+``timeout`` (wall-clock seconds) and ``cpu_seconds`` interrupt the running code with
+an exception, so the kernel and its variables survive. ``max_output`` caps stdout and
+stderr at that many characters each, keeping the beginning and the end.
+
+Sandboxed code can call ``save_artifact(obj, name=None)`` to write a DataFrame (Parquet),
+a matplotlib figure (PNG) or JSON-serializable data to the artifact directory; matplotlib
+figures left open are saved automatically. Each execute response lists the artifacts it
+created as ``{"name", "kind", "path", "bytes", "summary"}``.
+
+With ``"stream": true`` on an execute request, stdout is also sent while the code
+runs, as ``{"id": 1, "op": "stream", "name": "stdout", "text": "..."}`` messages
+ahead of the final response.
+
+Fork server:
+    ``--zygote SOCKET`` imports the pre-imports, reports ready and then forks a new
+    kernel for every connection to the Unix socket SOCKET, until its stdin closes.
+    Forked kernels share the imported modules copy-on-write, so they are ready in
+    milliseconds. ``--connect SOCKET [kernel args]`` is the small process started in
+    place of a kernel: it passes its stdin, stdout and stderr to the fork server, which
+    forks a kernel that talks the protocol above on them, and exits when that kernel
+    exits. Forking needs a POSIX system.
+
+    {"id": 5, "op": "snapshot", "socket": "/tmp/snapshot.sock"} leaves the session
+    running and starts a fork server on that socket that holds a copy of its current
+    globals, so new kernels can start from e.g. an already loaded dataset. It replies
+    with the server's pid and lasts until it receives SIGTERM.
+"""
+import builtins
+import collections
+import contextlib
+import importlib
+import io
+import json
+import math
+import os
+import select
+import signal
+import socket
+import sys
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+
+class ExecutionTimeout(BaseException):
+    """Raised in sandboxed code that runs past its wall-clock limit. Not an Exception, so
+    ``except Exception`` in that code cannot swallow it."""
+
+
+class CPUTimeExceeded(BaseException):
+    """Raised in sandboxed code that uses more CPU time than allowed."""
+
+
+_limits_armed = False
+
+ARTIFACT_SUMMARY_CHARS = 300
+
+
+def _rss_kb():
+    """Current resident set size of the kernel in KiB."""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+
+def _reset_peak_rss():
+    # Linux resets the VmHWM high-water mark when 5 is written to clear_refs.
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_kb():
+    """Peak resident set size in KiB since the last ``_reset_peak_rss``, where supported."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+
+def _cpu_seconds():
+    times = os.times()
+    return times.user + times.system
+
+
+class _Artifacts:
+    """Writes the files behind ``save_artifact`` and lists those saved by the current execution."""
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self.saved = []
+
+    def save(self, obj=None, name=None):
+        """
+        Save a DataFrame or Series as Parquet, a matplotlib figure as PNG, or other data
+        as JSON, and return the file path. Without ``obj`` the current figure is saved.
+        """
+        if obj is None:
+            import matplotlib.pyplot as plt
+            obj = plt.gcf()
+        os.makedirs(self.directory, exist_ok=True)
+        if hasattr(obj, "savefig"):
+            kind, path = "image", self._path(name or "figure", ".png")
+            obj.savefig(path, format="png", bbox_inches="tight")
+            width, height = obj.get_size_inches() * obj.dpi
+            summary = f"PNG figure, about {int(width)}x{int(height)} px"
+            title = getattr(obj, "_suptitle", None)
+            if title is not None and title.get_text():
+                summary += f": {title.get_text()}"
+        elif hasattr(obj, "to_parquet") or hasattr(obj, "to_frame"):
+            frame = obj if hasattr(obj, "to_parquet") else obj.to_frame()
+            kind = "table"
+            try:
+                path = self._path(name or "table", ".parquet")
+                frame.to_parquet(path)
+            except ImportError:
+                # No Parquet engine in the sandbox image.
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+                path = self._path(name or "table", ".csv")
+                frame.to_csv(path, index=False)
+            columns = ", ".join(f"{column} ({dtype})" for column, dtype in frame.dtypes.astype(str).items())
+            summary = f"{frame.shape[0]} rows x {frame.shape[1]} columns: {columns}"
+        else:
+            kind, path = "json", self._path(name or "data", ".json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(obj, f, default=str)
+            if isinstance(obj, dict):
+                summary = f"object with keys: {', '.join(map(str, obj))}"
+            elif isinstance(obj, (list, tuple)):
+                summary = f"list of {len(obj)} items"
+            else:
+                summary = repr(obj)
+        if len(summary) > ARTIFACT_SUMMARY_CHARS:
+            summary = summary[:ARTIFACT_SUMMARY_CHARS] + "..."
+        self.saved.append({
+            "name": os.path.basename(path),
+            "kind": kind,
+            "path": path,
+            "bytes": os.path.getsize(path),
+            "summary": summary,
+        })
+        return path
+
+    def save_open_figures(self):
+        # Only if the code used pyplot; importing matplotlib here would cost every execution.
+        pyplot = sys.modules.get("matplotlib.pyplot")
+        if pyplot is None:
+            return
+        for number in pyplot.get_fignums():
+            self.save(pyplot.figure(number), f"figure-{number}")
+        pyplot.close("all")
+
+    def _path(self, name, extension):
+        stem = os.path.splitext(os.path.basename(str(name)))[0]
+        stem = "".join(c if c.isalnum() or c in "-_" else "_" for c in stem) or "artifact"
+        path = os.path.join(self.directory, stem + extension)
+        counter = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{stem}-{counter}{extension}")
+            counter += 1
+        return path
+
+
+def _new_namespace(preimports, artifacts):
+    namespace = {"__name__": "__main__", "__builtins__": builtins, "save_artifact": artifacts.save}
+    loaded, failed = [], []
+    for spec in preimports:
+        module_name, _, alias = spec.partition(":")
+        try:
+            if alias:
+                namespace[alias] = importlib.import_module(module_name)
+            else:
+                namespace[module_name.split(".")[0]] = __import__(module_name)
+            loaded.append(spec)
+        except Exception as e:
+            failed.append(f"{spec}: {e}")
+    return namespace, loaded, failed
+
+
+class _CappedWriter(io.TextIOBase):
+    """
+    Keeps the first and last ``max_chars // 2`` characters written and counts the rest.
+
+    With ``send``, the kept beginning is also forwarded line by line while it is written;
+    output past it is not streamed.
+    """
+
+    def __init__(self, max_chars=None, send=None, max_pending=4096):
+        self._head_limit = None if max_chars is None else max_chars - max_chars // 2
+        self._tail_limit = None if max_chars is None else max_chars // 2
+        self._send = send
+        self._max_pending = max_pending
+        self._head = []
+        self._head_size = 0
+        self._tail = collections.deque()
+        self._tail_size = 0
+        self._pending = []
+        self._pending_size = 0
+        self.chars = 0
+        self.bytes = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.chars += len(text)
+        self.bytes += len(text.encode("utf-8", "replace"))
+        head_part = text
+        if self._head_limit is not None:
+            room = self._head_limit - self._head_size
+            head_part, rest = text[:max(room, 0)], text[max(room, 0):]
+            if rest:
+                self._add_to_tail(rest)
+        if head_part:
+            self._head.append(head_part)
+            self._head_size += len(head_part)
+            if self._send:
+                self._pending.append(head_part)
+                self._pending_size += len(head_part)
+                if "\n" in head_part or self._pending_size >= self._max_pending:
+                    self.flush()
+        return len(text)
+
+    def _add_to_tail(self, text):
+        text = text[len(text) - self._tail_limit:] if self._tail_limit else ""
+        self._tail.append(text)
+        self._tail_size += len(text)
+        while self._tail and self._tail_size - len(self._tail[0]) >= self._tail_limit:
+            self._tail_size -= len(self._tail.popleft())
+
+    def flush(self):
+        if self._pending:
+            self._send("".join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    @property
+    def truncated(self):
+        return self._head_limit is not None and self.chars > self._head_limit + self._tail_limit
+
+    def getvalue(self):
+        head = "".join(self._head)
+        tail = "".join(self._tail)
+        if not self.truncated:
+            return head + tail
+        tail = tail[len(tail) - self._tail_limit:] if self._tail_limit else ""
+        omitted = self.chars - len(head) - len(tail)
+        return f"{head}\n... [{omitted} characters omitted] ...\n{tail}"
+
+
+def _cap(text, max_chars):
+    writer = _CappedWriter(max_chars)
+    writer.write(text)
+    return writer.getvalue()
+
+
+def _raise_timeout(signum, frame):
+    if _limits_armed:
+        raise ExecutionTimeout("Execution exceeded its wall-clock time limit.")
+
+
+def _raise_cpu_exceeded(signum, frame):
+    if _limits_armed:
+        raise CPUTimeExceeded("Execution exceeded its CPU time limit.")
+
+
+def _arm_limits(timeout, cpu_seconds):
+    global _limits_armed
+    _limits_armed = True
+    if timeout and hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    if cpu_seconds and resource is not None:
+        soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        limit = math.ceil(_cpu_seconds() + cpu_seconds)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+        return soft
+    return None
+
+
+def _disarm_limits(previous_cpu_limit):
+    global _limits_armed
+    _limits_armed = False
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    if previous_cpu_limit is not None:
+        resource.setrlimit(resource.RLIMIT_CPU, (previous_cpu_limit, resource.getrlimit(resource.RLIMIT_CPU)[1]))
+
+
+def _execute(code, namespace, artifacts, on_stdout=None, timeout=None, cpu_seconds=None, max_output=None):
+    stdout = _CappedWriter(max_output, on_stdout)
+    stderr = _CappedWriter(max_output)
+    error = None
+    timed_out = False
+    if sys.stdin.closed:
+        sys.stdin = open(os.devnull, "r")
+    artifacts.saved = []
+    _reset_peak_rss()
+    started = time.perf_counter()
+    cpu_started = _cpu_seconds()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        previous_cpu_limit = None
+        try:
+            previous_cpu_limit = _arm_limits(timeout, cpu_seconds)
+            exec(compile(code, "<sandbox>", "exec"), namespace)
+            artifacts.save_open_figures()
+        except BaseException as e:
+            timed_out = isinstance(e, ExecutionTimeout)
+            # Drop this frame so the traceback starts at the sandboxed code.
+            error = _cap("".join(traceback.format_exception(type(e), e, e.__traceback__.tb_next)), max_output)
+        finally:
+            _disarm_limits(previous_cpu_limit)
+    stdout.flush()
+    usage = {
+        "wall_seconds": round(time.perf_counter() - started, 6),
+        "cpu_seconds": round(_cpu_seconds() - cpu_started, 6),
+        "peak_rss_kb": _peak_rss_kb(),
+        "output_bytes": stdout.bytes + stderr.bytes,
+    }
+    return {
+        "ok": error is None,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "error": error,
+        "timed_out": timed_out,
+        "truncated": stdout.truncated or stderr.truncated,
+        "artifacts": artifacts.saved,
+        "usage": usage,
+    }
+
+
+def _parse_args(argv):
+    options = {"preimports": [], "memory_mb": None, "artifact_dir": "artifacts", "zygote": None, "connect": None}
+    index = 0
+    while index < len(argv):
+        if argv[index] == "--preimport" and index + 1 < len(argv):
+            options["preimports"].append(argv[index + 1])
+            index += 2
+        elif argv[index] == "--memory-mb" and index + 1 < len(argv):
+            options["memory_mb"] = int(argv[index + 1])
+            index += 2
+        elif argv[index] == "--artifact-dir" and index + 1 < len(argv):
+            options["artifact_dir"] = argv[index + 1]
+            index += 2
+        elif argv[index] in ("--zygote", "--connect") and index + 1 < len(argv):
+            options[argv[index][2:]] = argv[index + 1]
+            index += 2
+        else:
+            index += 1
+    return options
+
+
+def _limit_memory(memory_mb):
+    # Caps the address space: allocations past it raise MemoryError in the sandboxed code.
+    if memory_mb and resource is not None:
+        limit = memory_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _open_protocol():
+    # Keep private handles on the real stdin/stdout for the protocol. fd 1 points
+    # at /dev/null so stray writes from C extensions cannot corrupt it, and user
+    # code gets an empty stdin so input() or exit() cannot touch the channel.
+    protocol_in = os.fdopen(os.dup(0), "r")
+    protocol_out = os.fdopen(os.dup(1), "w", buffering=1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    sys.stdin = open(os.devnull, "r")
+    return protocol_in, protocol_out
+
+
+def _send_line(protocol_out, message):
+    protocol_out.write(json.dumps(message) + "\n")
+    protocol_out.flush()
+
+
+def _serve(protocol_in, protocol_out, namespace, preimports, loaded, failed, artifacts, memory_mb, forked=False):
+    """Answer requests on the protocol handles until stdin closes or a shutdown request."""
+    send = lambda message: _send_line(protocol_out, message)
+    _limit_memory(memory_mb)
+    send({"op": "ready", "pid": os.getpid(), "preimported": loaded, "failed": failed, "rss_kb": _rss_kb(), "forked": forked})
+
+    while True:
+        line = protocol_in.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            send({"id": None, "ok": False, "error": f"Invalid request: {e}"})
+            continue
+
+        op = request.get("op")
+        if op == "execute":
+            on_stdout = None
+            if request.get("stream"):
+                request_id = request.get("id")
+                on_stdout = lambda text: send({"id": request_id, "op": "stream", "name": "stdout", "text": text})
+            response = _execute(
+                request.get("code", ""),
+                namespace,
+                artifacts,
+                on_stdout,
+                timeout=request.get("timeout"),
+                cpu_seconds=request.get("cpu_seconds"),
+                max_output=request.get("max_output"),
+            )
+        elif op == "reset":
+            namespace, loaded, failed = _new_namespace(preimports, artifacts)
+            response = {"ok": True, "preimported": loaded, "failed": failed}
+        elif op == "snapshot":
+            response = _snapshot(request.get("socket"), (protocol_in, protocol_out), namespace, preimports, loaded, failed, artifacts)
+        elif op == "ping":
+            response = {"ok": True}
+        elif op == "shutdown":
+            send({"id": request.get("id"), "ok": True, "rss_kb": _rss_kb()})
+            break
+        else:
+            response = {"ok": False, "error": f"Unknown op: {op}"}
+
+        response["id"] = request.get("id")
+        response["rss_kb"] = _rss_kb()
+        send(response)
+
+
+def _serve_forks(socket_path, inherited, namespace, preimports, loaded, failed, artifacts, on_ready, watch_fd=None):
+    """
+    Fork a kernel with a copy of ``namespace`` for every ``fork`` request on ``socket_path``.
+
+    Each forked kernel's pid is sent back on its connection when it starts and its exit
+    status when it ends. The server stops on SIGTERM or, with ``watch_fd``, when that
+    descriptor reaches end of file. ``inherited`` are file objects forked kernels close.
+    """
+    with contextlib.suppress(OSError):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(64)
+    # SIGCHLD only has to interrupt select(); the wake-up pipe makes sure it does.
+    wakeup_in, wakeup_out = os.pipe()
+    os.set_blocking(wakeup_in, False)
+    os.set_blocking(wakeup_out, False)
+    signal.set_wakeup_fd(wakeup_out)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    children = {}
+    on_ready()
+    try:
+        while True:
+            sources = [server, wakeup_in] + ([watch_fd] if watch_fd is not None else [])
+            readable, _, _ = select.select(sources, [], [])
+            if wakeup_in in readable:
+                with contextlib.suppress(BlockingIOError):
+                    os.read(wakeup_in, 4096)
+            _reap(children)
+            if watch_fd is not None and watch_fd in readable and not os.read(watch_fd, 4096):
+                break
+            if server not in readable:
+                continue
+            connection, _ = server.accept()
+            try:
+                message, fds, _, _ = socket.recv_fds(connection, 1 << 20, 3)
+                request = json.loads(message)
+            except (OSError, ValueError):
+                connection.close()
+                continue
+            if request.get("op") != "fork" or len(fds) != 3:
+                for fd in fds:
+                    os.close(fd)
+                connection.close()
+                continue
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                os.close(wakeup_in)
+                os.close(wakeup_out)
+                for handle in [connection, *children.values(), *inherited]:
+                    handle.close()
+                _run_forked(request, fds, namespace, preimports, loaded, failed, artifacts)
+            for fd in fds:
+                os.close(fd)
+            children[pid] = connection
+            with contextlib.suppress(OSError):
+                connection.sendall((json.dumps({"op": "forked", "pid": pid}) + "\n").encode())
+    finally:
+        server.close()
+        with contextlib.suppress(OSError):
+            os.remove(socket_path)
+        for connection in children.values():
+            connection.close()
+
+
+def _reap(children):
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        connection = children.pop(pid, None)
+        if connection is not None:
+            with contextlib.suppress(OSError):
+                connection.sendall((json.dumps({"op": "exit", "status": os.waitstatus_to_exitcode(status)}) + "\n").encode())
+            connection.close()
+
+
+def _run_forked(request, fds, namespace, preimports, loaded, failed, artifacts):
+    """Become a kernel on the descriptors a connector sent. Never returns."""
+    status = 0
+    try:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.setsid()
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        # Run where, and with the environment that, the connector was started with.
+        os.chdir(request.get("cwd") or os.getcwd())
+        os.environ.clear()
+        os.environ.update(request.get("env") or {})
+        options = _parse_args(request.get("args") or [])
+        artifacts.directory = os.path.abspath(options["artifact_dir"])
+        protocol_in, protocol_out = _open_protocol()
+        _serve(protocol_in, protocol_out, namespace, preimports, loaded, failed, artifacts, options["memory_mb"], forked=True)
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stderr.flush()
+        os._exit(status)
+
+
+def _snapshot(socket_path, inherited, namespace, preimports, loaded, failed, artifacts):
+    """Start a fork server holding a copy of ``namespace`` and return its pid."""
+    if not socket_path:
+        return {"ok": False, "error": "A snapshot needs a socket path."}
+    ready_in, ready_out = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Fork twice so the server is not a child, and never a zombie, of this kernel.
+        try:
+            os.close(ready_in)
+            for handle in inherited:
+                handle.close()
+            os.setsid()
+            if os.fork() == 0:
+                devnull = os.open(os.devnull, os.O_RDWR)
+                os.dup2(devnull, 2)
+                os.close(devnull)
+
+                def on_ready():
+                    os.write(ready_out, str(os.getpid()).encode())
+                    os.close(ready_out)
+
+                _serve_forks(socket_path, [], namespace, preimports, loaded, failed, artifacts, on_ready)
+        finally:
+            os._exit(0)
+    os.close(ready_out)
+    os.waitpid(pid, 0)
+    readable, _, _ = select.select([ready_in], [], [], 30)
+    server_pid = os.read(ready_in, 64) if readable else b""
+    os.close(ready_in)
+    if not server_pid:
+        return {"ok": False, "error": f"The snapshot server did not start on {socket_path}."}
+    return {"ok": True, "socket": socket_path, "pid": int(server_pid)}
+
+
+def _process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    # A zombie still accepts signals; it only waits for its parent to reap it.
+    with contextlib.suppress(OSError, IndexError):
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    return True
+
+
+def _connect(socket_path, argv):
+    """Have the fork server at ``socket_path`` fork a kernel on this process's stdio and wait for it."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError as e:
+        print(f"Cannot reach the fork server at {socket_path}: {e}", file=sys.stderr)
+        return 1
+    request = {"op": "fork", "args": argv, "cwd": os.getcwd(), "env": dict(os.environ)}
+    socket.send_fds(client, [json.dumps(request).encode()], [0, 1, 2])
+    kernel_pid = None
+    for line in client.makefile("r"):
+        message = json.loads(line)
+        if message.get("op") == "forked":
+            kernel_pid = message["pid"]
+        elif message.get("op") == "exit":
+            status = message["status"]
+            return 128 - status if status < 0 else status
+    # The fork server went away first; the kernel is still ours to wait for.
+    while kernel_pid is not None and _process_exists(kernel_pid):
+        time.sleep(0.1)
+    return 1
+
+
+def main(argv):
+    options = _parse_args(argv)
+    if options["connect"]:
+        sys.exit(_connect(options["connect"], argv))
+    artifacts = _Artifacts(options["artifact_dir"])
+    protocol_in, protocol_out = _open_protocol()
+
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _raise_cpu_exceeded)
+
+    preimports = options["preimports"]
+    namespace, loaded, failed = _new_namespace(preimports, artifacts)
+    if options["zygote"]:
+        ready = {"op": "ready", "pid": os.getpid(), "preimported": loaded, "failed": failed, "rss_kb": _rss_kb()}
+        _serve_forks(
+            options["zygote"],
+            [protocol_in, protocol_out],
+            namespace,
+            preimports,
+            loaded,
+            failed,
+            artifacts,
+            on_ready=lambda: _send_line(protocol_out, ready),
+            watch_fd=protocol_in.fileno(),
+        )
+        return
+    _serve(protocol_in, protocol_out, namespace, preimports, loaded, failed, artifacts, options["memory_mb"])
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,493 @@
+import collections
+import itertools
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from object_orinted_agents.sandbox.execution_cache import SandboxDatasets
+from object_orinted_agents.sandbox.fork_server import ForkedKernelBackend, ForkServer
+from object_orinted_agents.sandbox.kernel import DockerKernelBackend, ExecutionLimits, LocalKernelBackend, PythonKernel
+from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.stats import summarize
+
+
+class SandboxWorker:
+    """
+    One pre-started sandbox: a warm kernel plus the filesystem it works in.
+
+    For Docker workers ``container_name`` is set and ``working_dir`` is the path
+    inside the container. Local workers have no container and a host directory.
+    """
+
+    def __init__(self, worker_id: str, kernel: PythonKernel, working_dir: str, container_name: Optional[str] = None):
+        self.worker_id = worker_id
+        self.kernel = kernel
+        self.working_dir = working_dir
+        self.container_name = container_name
+        # Fingerprints of the data files staged into this sandbox, shared by the session's tools.
+        self.datasets = SandboxDatasets()
+        self.session_id: Optional[str] = None
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.idle_since = time.monotonic()
+
+    def __repr__(self) -> str:
+        return f"SandboxWorker(id={self.worker_id!r}, container={self.container_name!r}, session={self.session_id!r})"
+
+
+class WorkerFactory(ABC):
+    """Creates, resets and destroys sandbox workers for a pool."""
+
+    @abstractmethod
+    def create(self, worker_id: str) -> SandboxWorker:
+        pass
+
+    @abstractmethod
+    def destroy(self, worker: SandboxWorker) -> None:
+        pass
+
+    def reset(self, worker: SandboxWorker) -> None:
+        """Make a worker safe to hand to another session."""
+        if isinstance(worker.kernel.backend, ForkedKernelBackend):
+            # A new fork is as quick as clearing globals and keeps nothing of the last session.
+            worker.kernel.restart()
+        else:
+            worker.kernel.reset()
+        worker.datasets = SandboxDatasets()
+
+    def close(self) -> None:
+        """Release what the factory shares between workers, once the pool is shut down."""
+        pass
+
+
+class LocalWorkerFactory(WorkerFactory):
+    """
+    Workers are local kernel processes, each in its own scratch directory.
+
+    With ``fork_server`` set, one ``ForkServer`` imports ``preimports`` once and every
+    worker's kernel is forked from it.
+    """
+
+    def __init__(
+        self,
+        root_dir: Optional[str] = None,
+        preimports: Optional[List[str]] = None,
+        limits: Optional[ExecutionLimits] = None,
+        fork_server: bool = False,
+        logger=None,
+    ):
+        self.root_dir = root_dir
+        self.preimports = preimports
+        self.limits = limits
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.fork_server = ForkServer(preimports=preimports, logger=self.logger) if fork_server else None
+
+    def create(self, worker_id: str) -> SandboxWorker:
+        if self.root_dir:
+            os.makedirs(self.root_dir, exist_ok=True)
+        working_dir = tempfile.mkdtemp(prefix=f"sandbox-{worker_id}-", dir=self.root_dir)
+        backend = LocalKernelBackend(working_dir=working_dir)
+        if self.fork_server is not None:
+            kernel = self.fork_server.new_kernel(backend, logger=self.logger, limits=self.limits)
+        else:
+            kernel = PythonKernel(backend=backend, preimports=self.preimports, logger=self.logger, limits=self.limits)
+        kernel.start()
+        return SandboxWorker(worker_id, kernel, working_dir)
+
+    def close(self) -> None:
+        if self.fork_server is not None:
+            self.fork_server.shutdown()
+
+    def destroy(self, worker: SandboxWorker) -> None:
+        worker.kernel.shutdown()
+        shutil.rmtree(worker.working_dir, ignore_errors=True)
+
+    def reset(self, worker: SandboxWorker) -> None:
+        super().reset(worker)
+        for entry in os.listdir(worker.working_dir):
+            path = os.path.join(worker.working_dir, entry)
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+
+
+class DockerWorkerFactory(WorkerFactory):
+    """
+    Workers are containers started from the sandbox image, one kernel per container.
+
+    With ``dataset_dir`` set, that host directory (the root of a dataset store's
+    ``LocalDirectoryBackend``) is mounted read-only at ``dataset_mount`` in every
+    container, so staged datasets are shared instead of copied per worker.
+
+    With ``fork_server`` set, each container runs a ``ForkServer`` and its kernel is
+    forked from it, so restarting the kernel or resetting the worker for the next
+    session takes milliseconds instead of a fresh import of ``preimports``.
+    """
+
+    def __init__(
+        self,
+        image: str = "python_sandbox",
+        name_prefix: str = "python_sandbox",
+        run_args: Optional[List[str]] = None,
+        working_dir: str = "/home/sandboxuser/",
+        preimports: Optional[List[str]] = None,
+        dataset_dir: Optional[str] = None,
+        dataset_mount: str = "/data",
+        limits: Optional[ExecutionLimits] = None,
+        fork_server: bool = False,
+        logger=None,
+    ):
+        self.image = image
+        self.name_prefix = name_prefix
+        self.run_args = list(run_args or [])
+        if dataset_dir:
+            self.run_args += ["-v", f"{os.path.abspath(dataset_dir)}:{dataset_mount}:ro"]
+        self.working_dir = working_dir
+        self.preimports = preimports
+        self.limits = limits
+        self.fork_server = fork_server
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._fork_servers: Dict[str, ForkServer] = {}
+
+    def create(self, worker_id: str) -> SandboxWorker:
+        container_name = f"{self.name_prefix}_{worker_id}"
+        cmd = ["docker", "run", "-d", "--rm", "--name", container_name, *self.run_args, self.image, "sleep", "infinity"]
+        self.logger.debug("Starting sandbox container: %s", container_name)
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+        backend = DockerKernelBackend(container_name)
+        if self.fork_server:
+            server = ForkServer(backend, preimports=self.preimports, logger=self.logger)
+            server.start()
+            self._fork_servers[container_name] = server
+            kernel = server.new_kernel(logger=self.logger, limits=self.limits)
+        else:
+            kernel = PythonKernel(backend=backend, preimports=self.preimports, logger=self.logger, limits=self.limits)
+        kernel.start()
+        return SandboxWorker(worker_id, kernel, self.working_dir, container_name=container_name)
+
+    def destroy(self, worker: SandboxWorker) -> None:
+        worker.kernel.shutdown()
+        server = self._fork_servers.pop(worker.container_name, None)
+        if server is not None:
+            server.shutdown()
+        subprocess.run(["docker", "rm", "-f", worker.container_name], capture_output=True, text=True)
+
+
+class PoolExhaustedError(TimeoutError):
+    pass
+
+
+class WorkerStartError(RuntimeError):
+    """Sandbox workers keep failing to start; the last failure is the ``__cause__``."""
+
+
+class PoolMetrics:
+    """Queue-wait and execution-time samples plus lifecycle counters for a pool."""
+
+    def __init__(self, max_samples: int = 10000):
+        self._lock = threading.Lock()
+        self.queue_wait_seconds = collections.deque(maxlen=max_samples)
+        self.execution_seconds = collections.deque(maxlen=max_samples)
+        self.counters = collections.Counter()
+
+    def record_queue_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.queue_wait_seconds.append(seconds)
+
+    def record_execution(self, seconds: float) -> None:
+        with self._lock:
+            self.execution_seconds.append(seconds)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_wait_seconds": summarize(self.queue_wait_seconds),
+                "execution_seconds": summarize(self.execution_seconds),
+                "counters": dict(self.counters),
+            }
+
+
+class SandboxLease:
+    """A worker handed to one session. Use as a context manager or call ``release``."""
+
+    def __init__(self, pool: "SandboxPool", worker: SandboxWorker, session_id: str):
+        self.pool = pool
+        self.worker = worker
+        self.session_id = session_id
+        self.released = False
+
+    @property
+    def kernel(self) -> PythonKernel:
+        return self.worker.kernel
+
+    def release(self, recycle: bool = False) -> None:
+        if not self.released:
+            self.released = True
+            self.pool.release(self.worker, recycle=recycle)
+
+    def __enter__(self) -> "SandboxLease":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A session that failed may have left the sandbox in a bad state, so replace it.
+        self.release(recycle=exc_type is not None)
+
+
+class SandboxPool:
+    """
+    Keeps between ``min_workers`` and ``max_workers`` pre-started sandbox workers and
+    leases them to sessions.
+
+    When sessions are queued waiting for a worker the pool starts more workers, up to
+    ``max_workers``. Workers idle for longer than ``idle_timeout`` seconds are stopped
+    until the pool is back at ``min_workers``.
+
+    A worker that fails to start is retried after a backoff that doubles with every
+    consecutive failure, from ``start_backoff`` up to ``max_start_backoff`` seconds. After
+    ``max_start_failures`` failures in a row, sessions waiting for a worker get a
+    ``WorkerStartError`` instead of waiting on; a later lease tries one more start once
+    the backoff has passed.
+    """
+
+    def __init__(
+        self,
+        factory: WorkerFactory,
+        min_workers: int = 1,
+        max_workers: int = 4,
+        idle_timeout: float = 300.0,
+        max_uses_per_worker: Optional[int] = None,
+        max_start_failures: int = 3,
+        start_backoff: float = 0.5,
+        max_start_backoff: float = 30.0,
+        logger=None,
+    ):
+        if min_workers < 0 or max_workers < 1 or min_workers > max_workers:
+            raise ValueError(f"Invalid pool bounds: min_workers={min_workers}, max_workers={max_workers}")
+        self.factory = factory
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.idle_timeout = idle_timeout
+        self.max_uses_per_worker = max_uses_per_worker
+        self.max_start_failures = max_start_failures
+        self.start_backoff = start_backoff
+        self.max_start_backoff = max_start_backoff
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.metrics = PoolMetrics()
+
+        self._condition = threading.Condition()
+        self._idle: List[SandboxWorker] = []
+        self._leased: Dict[str, SandboxWorker] = {}
+        self._starting = 0
+        self._waiting = 0
+        self._closed = False
+        self._ids = itertools.count(1)
+        self._start_failures = 0
+        self._last_start_error: Optional[Exception] = None
+        self._next_start_at = 0.0
+
+    @property
+    def size(self) -> int:
+        with self._condition:
+            return len(self._idle) + len(self._leased) + self._starting
+
+    def start(self) -> None:
+        """Pre-start ``min_workers`` workers and wait until they are ready."""
+        threads = []
+        with self._condition:
+            missing = self.min_workers - (len(self._idle) + len(self._leased) + self._starting)
+            for _ in range(max(missing, 0)):
+                self._starting += 1
+                threads.append(self._spawn_in_background())
+        for thread in threads:
+            thread.join()
+
+    def lease(self, session_id: str, timeout: Optional[float] = None) -> SandboxLease:
+        """
+        Lease a worker to a session, waiting for one to become free if necessary.
+
+        Raises:
+            PoolExhaustedError: If no worker became available within ``timeout`` seconds.
+            WorkerStartError: If workers failed to start ``max_start_failures`` times in a row.
+        """
+        requested_at = time.monotonic()
+        deadline = None if timeout is None else requested_at + timeout
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Sandbox pool is shut down.")
+            self._waiting += 1
+            try:
+                while not self._idle:
+                    self._scale_up_locked()
+                    if self._start_failures >= self.max_start_failures and not self._starting:
+                        raise WorkerStartError(
+                            f"Sandbox workers failed to start {self._start_failures} times in a row: {self._last_start_error}"
+                        ) from self._last_start_error
+                    now = time.monotonic()
+                    remaining = None if deadline is None else deadline - now
+                    if remaining is not None and remaining <= 0:
+                        self.metrics.increment("lease_timeouts")
+                        raise PoolExhaustedError(f"No sandbox worker available for session {session_id} within {timeout}s.")
+                    if self._next_start_at > now and not self._starting:
+                        # Backing off after a failed start: wake up when the next start is due.
+                        backoff = self._next_start_at - now
+                        remaining = backoff if remaining is None else min(remaining, backoff)
+                    self._condition.wait(remaining)
+                    if self._closed:
+                        raise RuntimeError("Sandbox pool is shut down.")
+                worker = self._idle.pop()
+            finally:
+                self._waiting -= 1
+
+            worker.session_id = session_id
+            worker.uses += 1
+            self._leased[worker.worker_id] = worker
+            worker.kernel.on_execute = self.metrics.record_execution
+
+        self.metrics.record_queue_wait(time.monotonic() - requested_at)
+        self.metrics.increment("leases")
+        self.logger.debug("Leased %s to session %s", worker, session_id)
+        return SandboxLease(self, worker, session_id)
+
+    def release(self, worker: SandboxWorker, recycle: bool = False) -> None:
+        """Return a worker to the pool, resetting it, or replace it with a fresh one when ``recycle`` is set."""
+        with self._condition:
+            self._leased.pop(worker.worker_id, None)
+        worker.kernel.on_execute = None
+        session_id, worker.session_id = worker.session_id, None
+
+        if self.max_uses_per_worker is not None and worker.uses >= self.max_uses_per_worker:
+            recycle = True
+        if not recycle:
+            try:
+                self.factory.reset(worker)
+            except Exception as e:
+                self.logger.warning("Could not reset %s after session %s, recycling it: %s", worker.worker_id, session_id, e)
+                recycle = True
+
+        if recycle:
+            self.metrics.increment("recycles")
+            self._destroy(worker)
+            with self._condition:
+                if not self._closed and self._needs_replacement_locked():
+                    self._starting += 1
+                    self._spawn_in_background()
+            return
+
+        with self._condition:
+            if self._closed:
+                self._destroy(worker)
+                return
+            worker.idle_since = time.monotonic()
+            self._idle.append(worker)
+            self._condition.notify()
+        self._reap_idle()
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._closed = True
+            workers = self._idle + list(self._leased.values())
+            self._idle, self._leased = [], {}
+            self._condition.notify_all()
+        for worker in workers:
+            self._destroy(worker)
+        self.factory.close()
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.metrics.snapshot()
+        with self._condition:
+            snapshot.update({
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "starting": self._starting,
+                "waiting": self._waiting,
+            })
+        return snapshot
+
+    def __enter__(self) -> "SandboxPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    def _needs_replacement_locked(self) -> bool:
+        total = len(self._idle) + len(self._leased) + self._starting
+        return total < self.min_workers or (self._waiting > self._starting and total < self.max_workers)
+
+    def _scale_up_locked(self) -> None:
+        # Start one worker per queued session not already covered by a starting worker.
+        total = len(self._idle) + len(self._leased) + self._starting
+        if self._waiting > self._starting and total < self.max_workers and time.monotonic() >= self._next_start_at:
+            self._starting += 1
+            self.metrics.increment("scale_ups")
+            self._spawn_in_background()
+
+    def _spawn_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self._spawn, daemon=True)
+        thread.start()
+        return thread
+
+    def _spawn(self) -> None:
+        worker_id = f"w{next(self._ids)}"
+        try:
+            worker = self.factory.create(worker_id)
+        except Exception as e:
+            self.logger.error("Failed to start sandbox worker %s: %s", worker_id, e)
+            self.metrics.increment("worker_start_failures")
+            with self._condition:
+                self._starting -= 1
+                self._start_failures += 1
+                self._last_start_error = e
+                backoff = min(self.start_backoff * 2 ** (self._start_failures - 1), self.max_start_backoff)
+                self._next_start_at = time.monotonic() + backoff
+                self._condition.notify_all()
+            return
+
+        self.metrics.increment("workers_created")
+        with self._condition:
+            self._starting -= 1
+            self._start_failures = 0
+            self._last_start_error = None
+            self._next_start_at = 0.0
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._idle.append(worker)
+                self._condition.notify()
+        if closed:
+            self._destroy(worker)
+        else:
+            self.logger.debug("Sandbox worker %s is ready.", worker_id)
+
+    def _reap_idle(self) -> None:
+        now = time.monotonic()
+        expired = []
+        with self._condition:
+            total = len(self._idle) + len(self._leased) + self._starting
+            for worker in list(self._idle):
+                if total - len(expired) <= self.min_workers:
+                    break
+                if now - worker.idle_since > self.idle_timeout:
+                    self._idle.remove(worker)
+                    expired.append(worker)
+        for worker in expired:
+            self.metrics.increment("scale_downs")
+            self._destroy(worker)
+
+    def _destroy(self, worker: SandboxWorker) -> None:
+        try:
+            self.factory.destroy(worker)
+            self.metrics.increment("workers_destroyed")
+        except Exception as e:
+            self.logger.warning("Failed to stop sandbox worker %s: %s", worker.worker_id, e)
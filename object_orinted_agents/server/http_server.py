@@ -0,0 +1,313 @@
+"""
+HTTP API serving agent sessions, built on asyncio streams (standard library only).
+
+    POST   /sessions                  -> 201 {"session_id": "..."}
+    GET    /sessions/<id>             -> session info
+    DELETE /sessions/<id>             -> 204
+    POST   /sessions/<id>/messages    {"message": "...", "stream": true}
+    GET    /health                    -> session and admission counters
+
+With ``"stream": true`` the reply is a Server-Sent Events stream with one event per
+``AgentEvent`` (``event: text``, ``tool_start``, ``tool_output``, ``tool_end``, ``done``;
+the data is the event's JSON). Otherwise the reply is ``{"response": "..."}`` once the
+turn ends. Busy servers answer 503 with ``Retry-After``; a message sent to a session
+that is still running a turn gets 409.
+"""
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from object_orinted_agents.sandbox.pool import PoolExhaustedError, WorkerStartError
+from object_orinted_agents.server.session_manager import AgentSession, SessionLimitError, SessionManager, SessionNotFoundError
+from object_orinted_agents.utils.logger import get_logger
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class AdmissionQueue:
+    """
+    Bounds the turns in flight: ``max_running`` run at once and up to ``max_queued`` wait
+    for a slot. Turns beyond that are rejected immediately, so overload shows up as fast
+    503s instead of ever-growing latency.
+    """
+
+    def __init__(self, max_running: int = 8, max_queued: int = 32, queue_timeout: Optional[float] = 30.0):
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_running)
+        self.running = 0
+        self.queued = 0
+        self.rejected = 0
+
+    async def acquire(self) -> float:
+        """Wait for a slot and return the seconds spent waiting. Raises HTTPError 503 when full."""
+        if self.running + self.queued >= self.max_running + self.max_queued:
+            self.rejected += 1
+            raise HTTPError(503, "Server is at capacity; retry later.", {"Retry-After": "1"})
+        started = time.monotonic()
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPError(503, f"No capacity within {self.queue_timeout}s; retry later.", {"Retry-After": "5"})
+        finally:
+            self.queued -= 1
+        self.running += 1
+        return time.monotonic() - started
+
+    def release(self) -> None:
+        self.running -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "max_running": self.max_running,
+            "max_queued": self.max_queued,
+        }
+
+
+class AgentServer:
+    """
+    Serves the sessions of a ``SessionManager`` over HTTP, one connection per request.
+
+    Streamed events are written with ``drain``, so a slow client slows its own turn down
+    instead of buffering events in the server.
+
+    Args:
+        sessions (SessionManager): Owns the agents.
+        host (str): Interface to listen on.
+        port (int): Port to listen on; 0 picks a free one (see ``port`` after ``start``).
+        admission (Optional[AdmissionQueue]): Limits on concurrent and queued turns.
+        max_body_bytes (int): Largest accepted request body.
+        eviction_interval (float): Seconds between sweeps for idle sessions.
+    """
+
+    def __init__(
+        self,
+        sessions: SessionManager,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        admission: Optional[AdmissionQueue] = None,
+        max_body_bytes: int = 1024 * 1024,
+        eviction_interval: float = 30.0,
+        logger=None,
+    ):
+        self.sessions = sessions
+        self.host = host
+        self.port = port
+        self.admission = admission or AdmissionQueue()
+        self.max_body_bytes = max_body_bytes
+        self.eviction_interval = eviction_interval
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._evictor: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._evictor = asyncio.create_task(self._evict_periodically())
+        self.logger.info("Agent server listening on http://%s:%s", self.host, self.port)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        if self._evictor is not None:
+            self._evictor.cancel()
+            self._evictor = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.sessions.shutdown()
+
+    async def _evict_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.eviction_interval)
+            try:
+                await self.sessions.evict_expired()
+            except Exception as e:
+                self.logger.error("Session eviction failed: %s", e)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, body = await self._read_request(reader)
+                await self._route(method, path, body, writer)
+            except HTTPError as e:
+                await self._send_json(writer, e.status, {"error": e.message}, e.headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            except Exception as e:
+                self.logger.exception("Request failed: %s", e)
+                await self._send_json(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Any]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise HTTPError(400, "Malformed request line.")
+        method, path = parts[0].upper(), parts[1].split("?", 1)[0]
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length.")
+        if length > self.max_body_bytes:
+            raise HTTPError(413, f"Request body exceeds {self.max_body_bytes} bytes.")
+        body = None
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError as e:
+                raise HTTPError(400, f"Body is not valid JSON: {e}")
+        return method, path, body
+
+    async def _route(self, method: str, path: str, body: Any, writer: asyncio.StreamWriter) -> None:
+        segments = [segment for segment in path.split("/") if segment]
+        if segments == ["health"] and method == "GET":
+            await self._send_json(writer, 200, {"status": "ok", "sessions": self.sessions.stats(), "turns": self.admission.stats()})
+        elif segments == ["sessions"] and method == "POST":
+            session = await self._create_session((body or {}).get("session_id"))
+            await self._send_json(writer, 201, session.to_dict())
+        elif segments == ["sessions"] and method == "GET":
+            await self._send_json(writer, 200, {"sessions": [session.to_dict() for session in self.sessions.list()]})
+        elif len(segments) == 2 and segments[0] == "sessions" and method == "GET":
+            await self._send_json(writer, 200, self._session(segments[1]).to_dict())
+        elif len(segments) == 2 and segments[0] == "sessions" and method == "DELETE":
+            try:
+                await self.sessions.close(segments[1])
+            except SessionNotFoundError:
+                raise HTTPError(404, f"Unknown session {segments[1]}.")
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+            await self._send(writer, 204, b"")
+        elif len(segments) == 3 and segments[0] == "sessions" and segments[2] == "messages" and method == "POST":
+            await self._handle_message(await self._resumed_session(segments[1]), body or {}, writer)
+        elif segments[:1] in (["health"], ["sessions"]):
+            raise HTTPError(405, f"{method} is not allowed on {path}.")
+        else:
+            raise HTTPError(404, f"No route for {path}.")
+
+    async def _create_session(self, session_id: Optional[str]) -> AgentSession:
+        try:
+            return await self.sessions.create(session_id)
+        except ValueError as e:
+            raise HTTPError(409, str(e))
+        except (SessionLimitError, PoolExhaustedError, WorkerStartError) as e:
+            raise HTTPError(503, str(e), {"Retry-After": "5"})
+
+    async def _resumed_session(self, session_id: str) -> AgentSession:
+        try:
+            return await self.sessions.get_or_resume(session_id)
+        except SessionNotFoundError:
+            raise HTTPError(404, f"Unknown session {session_id}.")
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        except (SessionLimitError, PoolExhaustedError, WorkerStartError) as e:
+            raise HTTPError(503, str(e), {"Retry-After": "5"})
+
+    def _session(self, session_id: str) -> AgentSession:
+        try:
+            return self.sessions.get(session_id)
+        except SessionNotFoundError:
+            raise HTTPError(404, f"Unknown session {session_id}.")
+
+    async def _handle_message(self, session: AgentSession, body: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        message = body.get("message")
+        if not isinstance(message, str) or not message:
+            raise HTTPError(400, "Body must contain a non-empty 'message' string.")
+        if session.busy:
+            raise HTTPError(409, f"Session {session.session_id} is still running a turn.")
+
+        async with session.lock:
+            waited = await self.admission.acquire()
+            try:
+                self.logger.debug("Turn for session %s admitted after %.3fs.", session.session_id, waited)
+                if body.get("stream"):
+                    await self._stream_turn(session, message, writer)
+                else:
+                    response = await session.agent.atask(message)
+                    await self._send_json(writer, 200, {"session_id": session.session_id, "response": response})
+            finally:
+                session.turns += 1
+                session.touch()
+                self.admission.release()
+
+    async def _stream_turn(self, session: AgentSession, message: str, writer: asyncio.StreamWriter) -> None:
+        writer.write(self._head(200, {"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}))
+        events = session.agent.atask_stream(message)
+        try:
+            async for event in events:
+                writer.write(self._sse(event.type, event.to_dict()))
+                # Waits while the client's socket buffer is full.
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            self.logger.info("Client of session %s went away during a streamed turn.", session.session_id)
+            raise
+        except Exception as e:
+            # Headers are already sent, so the failure is reported as a final event.
+            self.logger.error("Streamed turn of session %s failed: %s", session.session_id, e)
+            writer.write(self._sse("error", {"type": "error", "content": f"{type(e).__name__}: {e}"}))
+            await writer.drain()
+        finally:
+            await events.aclose()
+
+    @staticmethod
+    def _sse(event_type: str, data: Dict[str, Any]) -> bytes:
+        return f"event: {event_type}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+    @staticmethod
+    def _head(status: int, headers: Dict[str, str]) -> bytes:
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, payload: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        headers = {**(headers or {}), "Content-Length": str(len(payload))}
+        writer.write(self._head(status, headers) + payload)
+        await writer.drain()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        await self._send(writer, status, body, {"Content-Type": "application/json", **(headers or {})})
@@ -0,0 +1,219 @@
+import asyncio
+import collections
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from object_orinted_agents.core.async_base_agent import AsyncBaseAgent
+from object_orinted_agents.core.session_store import SessionStore
+from object_orinted_agents.sandbox.pool import SandboxLease, SandboxPool
+from object_orinted_agents.utils.logger import get_logger
+
+AgentFactory = Callable[[str, Optional[SandboxLease]], AsyncBaseAgent]
+
+
+class SessionNotFoundError(KeyError):
+    pass
+
+
+class SessionLimitError(RuntimeError):
+    """Raised when a session cannot be created because every slot holds a busy session."""
+
+
+class AgentSession:
+    """
+    One user's conversation: an agent with its own message history and, when the
+    manager has a sandbox pool, its own sandbox lease.
+
+    ``lock`` is held while a turn runs, so a session handles one turn at a time.
+    """
+
+    def __init__(self, session_id: str, agent: AsyncBaseAgent, lease: Optional[SandboxLease] = None):
+        self.session_id = session_id
+        self.agent = agent
+        self.lease = lease
+        self.lock = asyncio.Lock()
+        self.created_at = time.time()
+        self.last_used = time.monotonic()
+        self.turns = 0
+
+    @property
+    def busy(self) -> bool:
+        return self.lock.locked()
+
+    def touch(self) -> None:
+        self.last_used = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "agent": self.agent.__class__.__name__,
+            "created_at": self.created_at,
+            "idle_seconds": round(time.monotonic() - self.last_used, 3),
+            "turns": self.turns,
+            "busy": self.busy,
+            "sandbox": self.lease.worker.worker_id if self.lease else None,
+        }
+
+
+class SessionManager:
+    """
+    Creates, looks up and evicts agent sessions for a server.
+
+    Sessions are kept in least-recently-used order. Sessions idle for longer than
+    ``idle_ttl`` seconds are closed by ``evict_expired``; when ``max_sessions`` is reached,
+    creating a session closes the least recently used idle one. Closing a session closes
+    its agent and returns its sandbox lease to the pool. All methods must be called from
+    the server's event loop.
+
+    With a ``session_store`` (which the factory should also give the agents), evicted
+    sessions and sessions from before a restart are resumed on their next use; only a
+    session closed by its client is deleted from the store.
+
+    Args:
+        agent_factory (AgentFactory): Builds the agent of a new session from the session id
+            and its sandbox lease (None without a pool).
+        max_sessions (int): Sessions kept at the same time.
+        idle_ttl (Optional[float]): Seconds a session may stay unused. None keeps sessions until evicted by LRU.
+        sandbox_pool (Optional[SandboxPool]): Pool each session leases a sandbox from.
+        lease_timeout (Optional[float]): Seconds to wait for a free sandbox.
+        session_store (Optional[SessionStore]): Where the agents persist their histories.
+    """
+
+    def __init__(
+        self,
+        agent_factory: AgentFactory,
+        max_sessions: int = 100,
+        idle_ttl: Optional[float] = 1800.0,
+        sandbox_pool: Optional[SandboxPool] = None,
+        lease_timeout: Optional[float] = 30.0,
+        session_store: Optional[SessionStore] = None,
+        logger=None,
+    ):
+        self.agent_factory = agent_factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.sandbox_pool = sandbox_pool
+        self.lease_timeout = lease_timeout
+        self.session_store = session_store
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._sessions: "collections.OrderedDict[str, AgentSession]" = collections.OrderedDict()
+        self._creating = 0
+        self.counters = collections.Counter()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def create(self, session_id: Optional[str] = None) -> AgentSession:
+        """
+        Start a new session.
+
+        Raises:
+            SessionLimitError: If ``max_sessions`` sessions exist and all of them are busy.
+            PoolExhaustedError: If no sandbox became free within ``lease_timeout``.
+            WorkerStartError: If sandboxes keep failing to start.
+        """
+        session_id = session_id or uuid.uuid4().hex
+        if session_id in self._sessions:
+            raise ValueError(f"Session {session_id} already exists.")
+        await self.evict_expired()
+        # Sessions still being built hold a slot, since building awaits.
+        while len(self._sessions) + self._creating >= self.max_sessions:
+            victim = next((session for session in self._sessions.values() if not session.busy), None)
+            if victim is None:
+                raise SessionLimitError(f"All {self.max_sessions} sessions are busy.")
+            self.counters["evicted_lru"] += 1
+            await self._close(victim, "least recently used")
+
+        self._creating += 1
+        lease = None
+        try:
+            if self.sandbox_pool is not None:
+                lease = await asyncio.to_thread(self.sandbox_pool.lease, session_id, self.lease_timeout)
+            agent = await asyncio.to_thread(self.agent_factory, session_id, lease)
+        except BaseException:
+            if lease is not None:
+                await asyncio.to_thread(lease.release)
+            raise
+        finally:
+            self._creating -= 1
+
+        session = AgentSession(session_id, agent, lease)
+        if session_id in self._sessions:
+            # A concurrent request resumed the same session first.
+            await self._close(session, "duplicate")
+            return self.get(session_id)
+        self._sessions[session_id] = session
+        self.counters["created"] += 1
+        self.logger.info("Session %s started (%d open).", session_id, len(self._sessions))
+        return session
+
+    def get(self, session_id: str) -> AgentSession:
+        """Return a session and mark it as the most recently used. Raises SessionNotFoundError."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise SessionNotFoundError(session_id)
+        self._sessions.move_to_end(session_id)
+        session.touch()
+        return session
+
+    async def get_or_resume(self, session_id: str) -> AgentSession:
+        """Like ``get``, but a session that is only in the session store is resumed."""
+        if session_id in self._sessions:
+            return self.get(session_id)
+        if self.session_store is not None and await asyncio.to_thread(self.session_store.exists, session_id):
+            self.counters["resumed"] += 1
+            return await self.create(session_id)
+        raise SessionNotFoundError(session_id)
+
+    async def close(self, session_id: str) -> None:
+        """End a session for good, deleting its stored history. Raises SessionNotFoundError."""
+        session = self._sessions.get(session_id)
+        stored = self.session_store is not None and await asyncio.to_thread(self.session_store.exists, session_id)
+        if session is None and not stored:
+            raise SessionNotFoundError(session_id)
+        self.counters["closed"] += 1
+        if session is not None:
+            await self._close(session, "closed by client")
+        if stored:
+            await asyncio.to_thread(self.session_store.delete, session_id)
+
+    async def evict_expired(self) -> int:
+        """Close idle sessions unused for longer than ``idle_ttl``. Returns how many were closed."""
+        if self.idle_ttl is None:
+            return 0
+        now = time.monotonic()
+        expired = [
+            session for session in self._sessions.values()
+            if not session.busy and now - session.last_used > self.idle_ttl
+        ]
+        for session in expired:
+            self.counters["evicted_ttl"] += 1
+            await self._close(session, "idle timeout")
+        return len(expired)
+
+    async def shutdown(self) -> None:
+        for session in list(self._sessions.values()):
+            await self._close(session, "server shutdown")
+
+    def list(self) -> List[AgentSession]:
+        return list(self._sessions.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open": len(self._sessions),
+            "busy": sum(1 for session in self._sessions.values() if session.busy),
+            "max_sessions": self.max_sessions,
+            **self.counters,
+        }
+
+    async def _close(self, session: AgentSession, reason: str) -> None:
+        if self._sessions.get(session.session_id) is session:
+            del self._sessions[session.session_id]
+        self.logger.info("Closing session %s (%s).", session.session_id, reason)
+        try:
+            await asyncio.to_thread(session.agent.close)
+        except Exception as e:
+            self.logger.warning("Could not close the agent of session %s: %s", session.session_id, e)
+        if session.lease is not None:
+            await asyncio.to_thread(session.lease.release)
@@ -0,0 +1,94 @@
+from object_orinted_agents.services.language_model_interface import LanguageModelInterface
+from object_orinted_agents.services.rate_limiter import RateLimiter
+from object_orinted_agents.services.retry import RetryPolicy, acall_with_retry
+from object_orinted_agents.utils.async_utils import iterate_sync, run_sync
+from object_orinted_agents.utils.logger import PAYLOAD, get_logger, truncate
+from object_orinted_agents.utils.tracing import atraced_stream, get_tracer, record_usage
+from typing import Any, Dict, List, Optional
+from object_orinted_agents.services.openai_factory import OpenAIClientFactory
+
+
+class AsyncOpenAILanguageModel(LanguageModelInterface):
+    """
+    OpenAI backend built on ``AsyncOpenAI``, so one event loop can drive many conversations.
+
+    Retries and rate limiting work as in ``OpenAILanguageModel``, but back-off and
+    rate-limit waits yield to the event loop instead of blocking it.
+    """
+
+    def __init__(
+        self,
+        openai_client=None,
+        api_key: Optional[str] = None,
+        logger=None,
+        base_url: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.logger = logger or get_logger(__name__)
+        # Without an explicit client, the one shared on the running event loop is used
+        # (see OpenAIClientFactory.get_async_client), created on first use. Constructing a
+        # model needs neither the openai package nor an API key.
+        self._openai_client = openai_client
+        self.api_key = api_key
+        self.base_url = base_url
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+
+    @property
+    def openai_client(self):
+        return self._openai_client or OpenAIClientFactory.get_async_client(self.api_key, self.base_url)
+
+    def generate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        if stream:
+            return iterate_sync(self.agenerate_completion(model, messages, tools=tools, reasoning_effort=reasoning_effort, stream=True))
+        return run_sync(self.agenerate_completion(model, messages, tools=tools, reasoning_effort=reasoning_effort))
+
+    async def agenerate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+
+        kwargs = {"model": model,
+                  "messages": messages}
+        if tools:
+            kwargs["tools"] = tools
+        if reasoning_effort:
+            kwargs["reasoning_effort"] = reasoning_effort
+        if stream:
+            kwargs["stream"] = True
+            kwargs["stream_options"] = {"include_usage": True}
+
+        self.logger.debug("Requesting completion from %s: %s", model, truncate(kwargs), extra=PAYLOAD)
+        span = get_tracer().start_span("llm.completion", model=model, stream=stream, messages=len(messages), tools=len(tools or []))
+        reserved_tokens = await self.rate_limiter.aacquire(model, messages, tools) if self.rate_limiter else 0
+        try:
+            response = await acall_with_retry(lambda: self.openai_client.chat.completions.create(**kwargs), self.retry_policy, self.logger)
+            self.logger.debug("Received response: %s", truncate(response), extra=PAYLOAD)
+        except Exception as e:
+            self.logger.error("Error generating completion: %s", e)
+            span.record_error(e)
+            span.end()
+            raise
+        if stream:
+            return atraced_stream(span, response, lambda usage: self._record_usage(model, reserved_tokens, usage))
+        usage = getattr(response, "usage", None)
+        record_usage(span, usage)
+        span.end()
+        self._record_usage(model, reserved_tokens, usage)
+        return response
+
+    def _record_usage(self, model: str, reserved_tokens: int, usage: Any) -> None:
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_usage(model, reserved_tokens, usage)
@@ -0,0 +1,296 @@
+import asyncio
+import io
+import itertools
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from object_orinted_agents.services.language_model_interface import LanguageModelInterface
+from object_orinted_agents.services.openai_factory import OpenAIClientFactory
+from object_orinted_agents.services.stream_accumulator import completion_to_chunks, replay_chunks
+from object_orinted_agents.utils.logger import get_logger
+
+_batch_ids = itertools.count(1)
+
+PENDING_STATUSES = {"validating", "in_progress", "finalizing", "cancelling"}
+
+
+class BatchSubmitter(ABC):
+    """Submits groups of chat completion requests to a provider's batch API."""
+
+    @abstractmethod
+    def submit(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """
+        Submit ``(custom_id, request_body)`` pairs as one batch.
+
+        Returns:
+            str: The batch id to poll.
+        """
+        pass
+
+    @abstractmethod
+    def poll(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Check on a batch.
+
+        Returns:
+            Optional[Dict[str, Any]]: None while the batch is running, then a mapping of
+            custom_id to completion, or to the exception that request failed with.
+        """
+        pass
+
+
+class OpenAIBatchSubmitter(BatchSubmitter):
+    """
+    Uses the OpenAI Batch API: requests are uploaded as a JSONL file and results are
+    collected from the output file once the batch completes, at batch pricing.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, completion_window: str = "24h", logger=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.completion_window = completion_window
+        self.logger = logger or get_logger(self.__class__.__name__)
+
+    @property
+    def client(self):
+        return OpenAIClientFactory.get_client(self.api_key, self.base_url)
+
+    def submit(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        lines = [
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body})
+            for custom_id, body in requests
+        ]
+        payload = io.BytesIO("\n".join(lines).encode("utf-8"))
+        input_file = self.client.files.create(file=("batch.jsonl", payload), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window,
+        )
+        self.logger.info("Submitted batch %s with %s requests.", batch.id, len(requests))
+        return batch.id
+
+    def poll(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        from openai.types.chat import ChatCompletion
+
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in PENDING_STATUSES:
+            return None
+
+        results: Dict[str, Any] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code", 200) >= 400:
+                    error = record.get("error") or response.get("body", {}).get("error")
+                    results[record["custom_id"]] = RuntimeError(f"Batch request failed: {error}")
+                else:
+                    results[record["custom_id"]] = ChatCompletion.model_validate(response["body"])
+        if batch.status != "completed":
+            self.logger.warning("Batch %s ended with status %s.", batch_id, batch.status)
+            results["*"] = RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+        return results
+
+
+class FakeBatchSubmitter(BatchSubmitter):
+    """
+    Local batch API for tests: each batch is answered by ``language_model_interface``
+    (e.g. a ``FakeLanguageModel``) once ``turnaround`` seconds have passed.
+    """
+
+    def __init__(self, language_model_interface: LanguageModelInterface, turnaround: float = 0.0):
+        self.language_model_interface = language_model_interface
+        self.turnaround = turnaround
+        self.batch_sizes: List[int] = []
+        self._batches: Dict[str, Tuple[float, List[Tuple[str, Dict[str, Any]]]]] = {}
+
+    def submit(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        batch_id = f"fakebatch-{next(_batch_ids)}"
+        self._batches[batch_id] = (time.monotonic() + self.turnaround, list(requests))
+        self.batch_sizes.append(len(requests))
+        return batch_id
+
+    def poll(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        ready_at, requests = self._batches[batch_id]
+        if time.monotonic() < ready_at:
+            return None
+        del self._batches[batch_id]
+        results: Dict[str, Any] = {}
+        for custom_id, body in requests:
+            try:
+                results[custom_id] = self.language_model_interface.generate_completion(**body)
+            except Exception as e:
+                results[custom_id] = e
+        return results
+
+
+class _PendingRequest:
+    def __init__(self, custom_id: str, body: Dict[str, Any]):
+        self.custom_id = custom_id
+        self.body = body
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class BatchingLanguageModel(LanguageModelInterface):
+    """
+    Groups completion calls into provider batch submissions.
+
+    Each call blocks (or awaits) until its result comes back. Calls are collected until
+    ``max_batch_size`` are waiting or the oldest has waited ``max_wait`` seconds, then
+    submitted together; running batches are polled every ``poll_interval`` seconds. Batch
+    APIs trade latency for price, so this suits offline jobs run with many concurrent
+    conversations, such as ``BatchRunner``. Streaming callers get the finished
+    completion replayed as chunks.
+
+    Args:
+        submitter (BatchSubmitter): The batch API to use.
+        max_batch_size (int): Requests per submission.
+        max_wait (float): Seconds a request waits for others before its batch is submitted.
+        poll_interval (float): Seconds between status checks of a running batch.
+    """
+
+    def __init__(self, submitter: BatchSubmitter, max_batch_size: int = 100, max_wait: float = 2.0, poll_interval: float = 10.0, logger=None):
+        self.submitter = submitter
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._pending: List[_PendingRequest] = []
+        self._in_flight: Dict[str, List[_PendingRequest]] = {}
+        self._next_poll = 0.0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def generate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        completion = self._enqueue(model, messages, tools, reasoning_effort).result()
+        return iter(completion_to_chunks(completion)) if stream else completion
+
+    async def agenerate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        completion = await asyncio.wrap_future(self._enqueue(model, messages, tools, reasoning_effort))
+        return replay_chunks(completion) if stream else completion
+
+    def close(self) -> None:
+        """Stop the dispatcher. Requests still waiting fail."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        for request in self._pending + [r for batch in self._in_flight.values() for r in batch]:
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("BatchingLanguageModel was closed"))
+
+    def _enqueue(self, model, messages, tools, reasoning_effort) -> Future:
+        body: Dict[str, Any] = {"model": model, "messages": messages}
+        if tools:
+            body["tools"] = tools
+        if reasoning_effort:
+            body["reasoning_effort"] = reasoning_effort
+        request = _PendingRequest(f"request-{next(_batch_ids)}", body)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("BatchingLanguageModel was closed")
+            self._pending.append(request)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="batch-dispatcher", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+        return request.future
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                batch = self._take_ready_batch()
+                if batch is None and not self._due_for_poll():
+                    self._condition.wait(timeout=self._seconds_until_next_event())
+                    continue
+            if batch is not None:
+                self._submit(batch)
+            else:
+                self._poll_in_flight()
+
+    def _take_ready_batch(self) -> Optional[List[_PendingRequest]]:
+        if not self._pending:
+            return None
+        waited = time.monotonic() - self._pending[0].enqueued_at
+        if len(self._pending) < self.max_batch_size and waited < self.max_wait:
+            return None
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:len(batch)]
+        return batch
+
+    def _due_for_poll(self) -> bool:
+        return bool(self._in_flight) and time.monotonic() >= self._next_poll
+
+    def _seconds_until_next_event(self) -> Optional[float]:
+        deadlines = []
+        if self._pending:
+            deadlines.append(self._pending[0].enqueued_at + self.max_wait)
+        if self._in_flight:
+            deadlines.append(self._next_poll)
+        if not deadlines:
+            return None
+        return max(min(deadlines) - time.monotonic(), 0.01)
+
+    def _submit(self, batch: List[_PendingRequest]) -> None:
+        try:
+            batch_id = self.submitter.submit([(request.custom_id, request.body) for request in batch])
+        except Exception as e:
+            self.logger.error("Could not submit a batch of %s requests: %s", len(batch), e)
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        self.logger.debug("Submitted batch %s with %s requests.", batch_id, len(batch))
+        with self._condition:
+            self._in_flight[batch_id] = batch
+            if len(self._in_flight) == 1:
+                self._next_poll = time.monotonic() + self.poll_interval
+
+    def _poll_in_flight(self) -> None:
+        with self._condition:
+            batch_ids = list(self._in_flight)
+            self._next_poll = time.monotonic() + self.poll_interval
+        for batch_id in batch_ids:
+            try:
+                results = self.submitter.poll(batch_id)
+            except Exception as e:
+                self.logger.warning("Polling batch %s failed: %s", batch_id, e)
+                continue
+            if results is None:
+                continue
+            with self._condition:
+                batch = self._in_flight.pop(batch_id)
+            batch_error = results.get("*") or RuntimeError(f"Batch {batch_id} returned no result for the request")
+            for request in batch:
+                result = results.get(request.custom_id, batch_error)
+                if isinstance(result, BaseException):
+                    request.future.set_exception(result)
+                else:
+                    request.future.set_result(result)
@@ -0,0 +1,261 @@
+import collections
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from object_orinted_agents.services.language_model_interface import LanguageModelInterface
+from object_orinted_agents.services.stream_accumulator import StreamAccumulator, completion_to_chunks, replay_chunks
+from object_orinted_agents.utils.logger import get_logger
+
+
+def _to_jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True)
+    if hasattr(value, "__dict__"):
+        return {key: item for key, item in vars(value).items() if item is not None}
+    return str(value)
+
+
+def request_cache_key(
+    model: str,
+    messages: List[Dict[str, Any]],
+    tools: Optional[List[Dict[str, Any]]] = None,
+    reasoning_effort: Optional[str] = None,
+) -> str:
+    """
+    Hash a completion request into a stable key.
+
+    The request is serialized as canonical JSON (sorted keys, no whitespace), so
+    dict ordering and SDK message objects do not change the key.
+    """
+    canonical = json.dumps(
+        {"model": model, "messages": messages, "tools": tools or [], "reasoning_effort": reasoning_effort},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_to_jsonable,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SQLiteResponseStore:
+    """On-disk cache tier. Entries survive restarts; the oldest are pruned beyond ``max_entries``."""
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, created_at REAL NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)")
+        self._connection.commit()
+
+    def get(self, key: str, max_age: Optional[float]) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute("SELECT created_at, payload FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        created_at, payload = row
+        if max_age is not None and time.time() - created_at > max_age:
+            self.delete(key)
+            return None
+        return pickle.loads(payload)
+
+    def put(self, key: str, response: Any) -> None:
+        payload = pickle.dumps(response)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, created_at, payload) VALUES (?, ?, ?)",
+                (key, time.time(), payload),
+            )
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._connection.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class CachedLanguageModel(LanguageModelInterface):
+    """
+    Serves repeated completion requests from a cache instead of calling the wrapped model.
+
+    Requests are keyed on ``model``, ``messages``, ``tools`` and ``reasoning_effort``.
+    Hits come from an in-memory LRU first, then from an optional SQLite tier. Streaming
+    callers get cached responses replayed as chunks, and streamed misses are stored once
+    complete. Calls with ``use_cache=False`` always go to the wrapped model.
+
+    Args:
+        language_model_interface (LanguageModelInterface): The model to wrap.
+        max_entries (int): Size bound of the in-memory LRU.
+        ttl_seconds (Optional[float]): Age after which entries are ignored. None keeps them forever.
+        sqlite_path (Optional[str]): Enables the on-disk tier at this path.
+        max_disk_entries (int): Size bound of the on-disk tier.
+    """
+
+    def __init__(
+        self,
+        language_model_interface: LanguageModelInterface,
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = 24 * 3600,
+        sqlite_path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+        logger=None,
+    ):
+        self.language_model_interface = language_model_interface
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.disk_store = SQLiteResponseStore(sqlite_path, max_disk_entries) if sqlite_path else None
+        self.counters = collections.Counter()
+        self._entries: "collections.OrderedDict[str, tuple]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def generate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        if not use_cache:
+            self.counters["bypasses"] += 1
+            return self.language_model_interface.generate_completion(
+                model=model, messages=messages, tools=tools, reasoning_effort=reasoning_effort, stream=stream
+            )
+
+        key = request_cache_key(model, messages, tools, reasoning_effort)
+        cached = self.lookup(key)
+        if cached is not None:
+            return iter(completion_to_chunks(cached)) if stream else cached
+        response = self.language_model_interface.generate_completion(
+            model=model, messages=messages, tools=tools, reasoning_effort=reasoning_effort, stream=stream
+        )
+        if stream:
+            return self._stream_and_store(key, response)
+        self.store(key, response)
+        return response
+
+    async def agenerate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        if not use_cache:
+            self.counters["bypasses"] += 1
+            return await self.language_model_interface.agenerate_completion(
+                model=model, messages=messages, tools=tools, reasoning_effort=reasoning_effort, stream=stream
+            )
+
+        key = request_cache_key(model, messages, tools, reasoning_effort)
+        cached = self.lookup(key)
+        if cached is not None:
+            return replay_chunks(cached) if stream else cached
+        response = await self.language_model_interface.agenerate_completion(
+            model=model, messages=messages, tools=tools, reasoning_effort=reasoning_effort, stream=stream
+        )
+        if stream:
+            return self._astream_and_store(key, response)
+        self.store(key, response)
+        return response
+
+    def _stream_and_store(self, key: str, chunks: Iterator[Any]) -> Iterator[Any]:
+        accumulator = StreamAccumulator()
+        for chunk in chunks:
+            accumulator.add(chunk)
+            yield chunk
+        self.store(key, accumulator.completion())
+
+    async def _astream_and_store(self, key: str, chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        accumulator = StreamAccumulator()
+        async for chunk in chunks:
+            accumulator.add(chunk)
+            yield chunk
+        self.store(key, accumulator.completion())
+
+    def lookup(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    self.logger.debug("Completion cache hit (memory): %s", key[:12])
+                    return response
+                del self._entries[key]
+
+        if self.disk_store is not None:
+            response = self.disk_store.get(key, self.ttl_seconds)
+            if response is not None:
+                self.counters["disk_hits"] += 1
+                self.logger.debug("Completion cache hit (disk): %s", key[:12])
+                self._remember(key, response)
+                return response
+
+        self.counters["misses"] += 1
+        return None
+
+    def store(self, key: str, response: Any) -> None:
+        self._remember(key, response)
+        if self.disk_store is not None:
+            try:
+                self.disk_store.put(key, response)
+            except (pickle.PicklingError, TypeError, AttributeError, sqlite3.Error) as e:
+                self.logger.warning("Could not write completion to the disk cache: %s", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.disk_store is not None:
+            self.disk_store.clear()
+
+    def stats(self) -> Dict[str, int]:
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            "memory_hits": self.counters["memory_hits"],
+            "disk_hits": self.counters["disk_hits"],
+            "misses": self.counters["misses"],
+            "bypasses": self.counters["bypasses"],
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def _remember(self, key: str, response: Any) -> None:
+        expires_at = None if self.ttl_seconds is None else time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
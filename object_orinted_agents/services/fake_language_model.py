@@ -0,0 +1,182 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from object_orinted_agents.services.language_model_interface import LanguageModelInterface
+from object_orinted_agents.services.stream_accumulator import ReplayChunk, completion_to_chunks
+from object_orinted_agents.utils.tracing import atraced_stream, get_tracer, record_usage, traced_stream
+
+_ids = itertools.count(1)
+
+
+class FakeFunction:
+    def __init__(self, name: str, arguments: str):
+        self.name = name
+        self.arguments = arguments
+
+
+class FakeToolCall:
+    def __init__(self, name: str, arguments: Dict[str, Any], call_id: Optional[str] = None):
+        self.id = call_id or f"call_{next(_ids)}"
+        self.type = "function"
+        self.function = FakeFunction(name, json.dumps(arguments))
+
+
+class FakeMessage:
+    def __init__(self, content: Optional[str] = None, tool_calls: Optional[List[FakeToolCall]] = None):
+        self.role = "assistant"
+        self.content = content
+        self.tool_calls = tool_calls
+
+
+class FakeChoice:
+    def __init__(self, message: FakeMessage):
+        self.index = 0
+        self.message = message
+        self.finish_reason = "tool_calls" if message.tool_calls else "stop"
+
+
+class FakeUsage:
+    def __init__(self, prompt_tokens: int, completion_tokens: int):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.total_tokens = prompt_tokens + completion_tokens
+
+
+class FakeCompletion:
+    """Mimics the attribute shape of an OpenAI ``ChatCompletion``."""
+
+    def __init__(self, message: FakeMessage, model: str = "fake-model", prompt_tokens: int = 0):
+        self.id = f"fakecmpl-{next(_ids)}"
+        self.model = model
+        self.choices = [FakeChoice(message)]
+        completion_text = message.content or "".join(call.function.arguments for call in message.tool_calls or [])
+        self.usage = FakeUsage(prompt_tokens, len(completion_text) // 4)
+
+
+ScriptedResponse = Union[str, FakeCompletion]
+
+
+class FakeLanguageModel(LanguageModelInterface):
+    """
+    In-process language model for tests and local runs. No network, no API key.
+
+    Either replays ``responses`` in order, or asks ``responder`` for each reply.
+
+    Args:
+        responses (Optional[List[ScriptedResponse]]): Replies in order. Strings become plain assistant messages.
+        responder (Optional[Callable]): Called with the request keyword arguments; returns a reply.
+        latency (float): Seconds to wait before each reply, to imitate a remote model.
+        default_response (str): Reply used once ``responses`` is exhausted.
+        chunk_latency (float): Seconds between streamed chunks when ``stream`` is set.
+    """
+
+    def __init__(
+        self,
+        responses: Optional[List[ScriptedResponse]] = None,
+        responder: Optional[Callable[..., ScriptedResponse]] = None,
+        latency: float = 0.0,
+        default_response: str = "OK",
+        chunk_latency: float = 0.0,
+    ):
+        self.responses = list(responses or [])
+        self.responder = responder
+        self.latency = latency
+        self.default_response = default_response
+        self.chunk_latency = chunk_latency
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def text_response(content: str, model: str = "fake-model") -> FakeCompletion:
+        return FakeCompletion(FakeMessage(content=content), model=model)
+
+    @staticmethod
+    def tool_call_response(calls: List[Tuple[str, Dict[str, Any]]], model: str = "fake-model") -> FakeCompletion:
+        """Build a reply that calls each ``(tool_name, arguments)`` pair."""
+        tool_calls = [FakeToolCall(name, arguments) for name, arguments in calls]
+        return FakeCompletion(FakeMessage(tool_calls=tool_calls), model=model)
+
+    def generate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        span = get_tracer().start_span("llm.completion", model=model, stream=stream, messages=len(messages), tools=len(tools or []))
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            response = self._next_response(model=model, messages=messages, tools=tools, reasoning_effort=reasoning_effort)
+        except BaseException as e:
+            span.record_error(e)
+            span.end()
+            raise
+        if stream:
+            return traced_stream(span, self._stream(response))
+        record_usage(span, response.usage)
+        span.end()
+        return response
+
+    async def agenerate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        span = get_tracer().start_span("llm.completion", model=model, stream=stream, messages=len(messages), tools=len(tools or []))
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            response = self._next_response(model=model, messages=messages, tools=tools, reasoning_effort=reasoning_effort)
+        except BaseException as e:
+            span.record_error(e)
+            span.end()
+            raise
+        if stream:
+            return atraced_stream(span, self._astream(response))
+        record_usage(span, response.usage)
+        span.end()
+        return response
+
+    def _stream(self, response: FakeCompletion) -> Iterator[ReplayChunk]:
+        for chunk in completion_to_chunks(response):
+            if self.chunk_latency:
+                time.sleep(self.chunk_latency)
+            yield chunk
+
+    async def _astream(self, response: FakeCompletion) -> AsyncIterator[ReplayChunk]:
+        for chunk in completion_to_chunks(response):
+            if self.chunk_latency:
+                await asyncio.sleep(self.chunk_latency)
+            yield chunk
+
+    def _next_response(self, **request) -> FakeCompletion:
+        with self._lock:
+            self.calls.append(request)
+            if self.responder is not None:
+                reply = self.responder(**request)
+            elif self.responses:
+                reply = self.responses.pop(0)
+            else:
+                reply = self.default_response
+
+        prompt_tokens = sum(len(str(_content_of(message))) for message in request["messages"]) // 4
+        if isinstance(reply, str):
+            return FakeCompletion(FakeMessage(content=reply), model=request["model"], prompt_tokens=prompt_tokens)
+        reply.usage.prompt_tokens = prompt_tokens
+        reply.usage.total_tokens = prompt_tokens + reply.usage.completion_tokens
+        return reply
+
+
+def _content_of(message: Any) -> Any:
+    if isinstance(message, dict):
+        return message.get("content") or ""
+    return getattr(message, "content", "") or ""
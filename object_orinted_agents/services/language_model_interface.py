@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
 
 class LanguageModelInterface(ABC):
@@ -10,6 +11,7 @@ class LanguageModelInterface(ABC):
         messages: List[Dict[str, str]],
         tools: Optional[List[Dict[str, str]]] = None,
         reasoning_effort: Optional[str] = None,
+        stream: bool = False,
     ) -> Dict[str, Any]:
         """
         Generate a completion from the language model.
@@ -19,8 +21,47 @@ class LanguageModelInterface(ABC):
             messages (List[Dict[str, str]]): A list of messages for the conversation.
             tools (Optional[List[Dict[str, str]]]): Optional tools to assist in generating the response.
             reasoning_effort (Optional[str]): Optional reasoning effort level.
+            stream (bool): Return an iterator of ``ChatCompletionChunk`` deltas instead of a completion.
 
         Returns:
-            Dict[str, Any]: The generated completion and related metadata.
+            Dict[str, Any]: The generated completion and related metadata, or an iterator
+            of chunks when ``stream`` is set.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def agenerate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Asynchronous variant of ``generate_completion``.
+
+        The default implementation runs ``generate_completion`` in a worker thread so
+        blocking backends do not stall the event loop. Async-native backends override it.
+        With ``stream`` set the result is an async iterator of chunks.
+        """
+        result = await asyncio.to_thread(
+            self.generate_completion,
+            model=model,
+            messages=messages,
+            tools=tools,
+            reasoning_effort=reasoning_effort,
+            stream=stream,
+        )
+        if stream:
+            return _iterate_in_thread(result)
+        return result
+
+
+async def _iterate_in_thread(chunks: Iterator[Any]) -> AsyncIterator[Any]:
+    """Pull each item of a blocking iterator in a worker thread."""
+    done = object()
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, done)
+        if chunk is done:
+            return
+        yield chunk
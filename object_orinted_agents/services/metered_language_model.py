@@ -0,0 +1,84 @@
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from object_orinted_agents.services.language_model_interface import LanguageModelInterface
+
+
+class MeteredLanguageModel(LanguageModelInterface):
+    """
+    Counts calls and token usage of the wrapped model.
+
+    Usage comes from each response's ``usage``, or from the final chunk of a stream.
+    """
+
+    def __init__(self, language_model_interface: LanguageModelInterface):
+        self.language_model_interface = language_model_interface
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def usage(self) -> Dict[str, int]:
+        return {
+            "llm_calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+        }
+
+    def generate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        response = self.language_model_interface.generate_completion(
+            model=model, messages=messages, tools=tools, reasoning_effort=reasoning_effort, stream=stream
+        )
+        if stream:
+            return self._meter_stream(response)
+        self._record(getattr(response, "usage", None))
+        return response
+
+    async def agenerate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        response = await self.language_model_interface.agenerate_completion(
+            model=model, messages=messages, tools=tools, reasoning_effort=reasoning_effort, stream=stream
+        )
+        if stream:
+            return self._ameter_stream(response)
+        self._record(getattr(response, "usage", None))
+        return response
+
+    def _meter_stream(self, chunks: Iterator[Any]) -> Iterator[Any]:
+        usage = None
+        for chunk in chunks:
+            usage = getattr(chunk, "usage", None) or usage
+            yield chunk
+        self._record(usage)
+
+    async def _ameter_stream(self, chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        usage = None
+        async for chunk in chunks:
+            usage = getattr(chunk, "usage", None) or usage
+            yield chunk
+        self._record(usage)
+
+    def _record(self, usage: Any) -> None:
+        with self._lock:
+            self.calls += 1
+            if usage is not None:
+                self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
@@ -1,14 +1,45 @@
 from object_orinted_agents.services.language_model_interface import LanguageModelInterface
-from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.services.rate_limiter import RateLimiter
+from object_orinted_agents.services.retry import RetryPolicy, call_with_retry
+from object_orinted_agents.utils.logger import PAYLOAD, get_logger, truncate
+from object_orinted_agents.utils.tracing import get_tracer, record_usage, traced_stream
 from typing import Any, Dict, List, Optional
-from openai import OpenAI
 from object_orinted_agents.services.openai_factory import OpenAIClientFactory
 
 
 class OpenAILanguageModel(LanguageModelInterface):
-    def __init__(self, openai_client=None, api_key: Optional[str] = None, logger=None):
+    """
+    OpenAI chat completions backend.
+
+    Transient failures (429, 5xx, timeouts, dropped connections) are retried per
+    ``retry_policy``; pass ``RetryPolicy(max_attempts=1)`` to disable retries. An
+    optional ``rate_limiter`` holds requests back to stay under per-model
+    requests/tokens-per-minute limits.
+    """
+
+    def __init__(
+        self,
+        openai_client=None,
+        api_key: Optional[str] = None,
+        logger=None,
+        base_url: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         self.logger = logger or get_logger(__name__)
-        self.openai_client = openai_client or  OpenAIClientFactory.create_client(api_key)
+        # The client is created on first use and shared process-wide (see OpenAIClientFactory.get_client),
+        # so constructing a model needs neither the openai package nor an API key.
+        self._openai_client = openai_client
+        self.api_key = api_key
+        self.base_url = base_url
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+
+    @property
+    def openai_client(self):
+        if self._openai_client is None:
+            self._openai_client = OpenAIClientFactory.get_client(self.api_key, self.base_url)
+        return self._openai_client
 
     def generate_completion(
         self,
@@ -16,6 +47,7 @@ class OpenAILanguageModel(LanguageModelInterface):
         messages: List[Dict[str, str]],
         tools: Optional[List[Dict[str, str]]] = None,
         reasoning_effort: Optional[str] = None,
+        stream: bool = False,
     ) -> Dict[str, Any]:
         
         kwargs = {"model": model, 
@@ -24,17 +56,31 @@ class OpenAILanguageModel(LanguageModelInterface):
             kwargs["tools"] = tools
         if reasoning_effort:
             kwargs["reasoning_effort"] = reasoning_effort
+        if stream:
+            kwargs["stream"] = True
+            kwargs["stream_options"] = {"include_usage": True}
         
-        self.logger.debug(f"Generating completion with model: {model}, messages: {messages}, tools: {tools}, reasoning_effort: {reasoning_effort}") 
-        
-        self.logger.debug("Generating completion with OpenAI model")
-        self.logger.debug(f"Requests: {kwargs}")
+        self.logger.debug("Requesting completion from %s: %s", model, truncate(kwargs), extra=PAYLOAD)
+        span = get_tracer().start_span("llm.completion", model=model, stream=stream, messages=len(messages), tools=len(tools or []))
+        reserved_tokens = self.rate_limiter.acquire(model, messages, tools) if self.rate_limiter else 0
         try:
-            response = self.openai_client.chat.completions.create(**kwargs)
+            response = call_with_retry(lambda: self.openai_client.chat.completions.create(**kwargs), self.retry_policy, self.logger)
             #response = self.openai_client.responses.create(**kwargs)
-            self.logger.debug(f"Received response: {response}")
-            return response
+            self.logger.debug("Received response: %s", truncate(response), extra=PAYLOAD)
         except Exception as e:
-            self.logger.error(f"Error generating completion: {e}")
+            self.logger.error("Error generating completion: %s", e)
+            span.record_error(e)
+            span.end()
             raise
+        if stream:
+            # Streams report usage in their last chunk.
+            return traced_stream(span, response, lambda usage: self._record_usage(model, reserved_tokens, usage))
+        usage = getattr(response, "usage", None)
+        record_usage(span, usage)
+        span.end()
+        self._record_usage(model, reserved_tokens, usage)
+        return response
 
+    def _record_usage(self, model: str, reserved_tokens: int, usage: Any) -> None:
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_usage(model, reserved_tokens, usage)
@@ -1,20 +1,152 @@
+import asyncio
 import os
-from openai import OpenAI
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
 from object_orinted_agents.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
 logger = get_logger(__name__)
 
+
+
+class HttpPoolSettings:
+    """
+    Connection pool of the shared OpenAI clients.
+
+    Args:
+        max_connections (int): Open connections per client.
+        max_keepalive_connections (int): Idle connections kept open for reuse.
+        keepalive_expiry (float): Seconds an idle connection is kept.
+        timeout (float): Request timeout in seconds.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20, keepalive_expiry: float = 30.0, timeout: float = 600.0):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+
+
+_environment_loaded = False
+_pool_settings = HttpPoolSettings()
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+# Async clients hold connections bound to the event loop they first ran on, so they are shared per loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, Optional[str]], Any]]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def load_environment() -> None:
+    """Load ``.env`` into the environment once, on first need rather than at import."""
+    global _environment_loaded
+    if _environment_loaded:
+        return
+    _environment_loaded = True
+    try:
+        import dotenv
+    except ImportError:
+        return
+    dotenv.load_dotenv()
+
+
 class OpenAIClientFactory:
     @staticmethod
-    def create_client(api_key: str) -> OpenAI:
-        """Create and return an OpenAI client instance."""
+    def create_client(
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        pool_settings: Optional[HttpPoolSettings] = None,
+        max_retries: int = 2,
+    ) -> "OpenAI":
+        """Create and return an OpenAI client instance over a pooled HTTP transport."""
+        import httpx
+        from openai import OpenAI
+
         resolved_api_key = OpenAIClientFactory._resolve_api_key(api_key)
-        return OpenAI(api_key=resolved_api_key)
+        settings = pool_settings or _pool_settings
+        http_client = httpx.Client(limits=OpenAIClientFactory._limits(settings), timeout=settings.timeout)
+        return OpenAI(api_key=resolved_api_key, base_url=base_url, http_client=http_client, max_retries=max_retries)
+
+    @staticmethod
+    def create_async_client(
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        pool_settings: Optional[HttpPoolSettings] = None,
+        max_retries: int = 2,
+    ) -> "AsyncOpenAI":
+        """Create and return an AsyncOpenAI client instance over a pooled HTTP transport."""
+        import httpx
+        from openai import AsyncOpenAI
+
+        resolved_api_key = OpenAIClientFactory._resolve_api_key(api_key)
+        settings = pool_settings or _pool_settings
+        http_client = httpx.AsyncClient(limits=OpenAIClientFactory._limits(settings), timeout=settings.timeout)
+        return AsyncOpenAI(api_key=resolved_api_key, base_url=base_url, http_client=http_client, max_retries=max_retries)
+
+    @staticmethod
+    def get_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> "OpenAI":
+        """
+        Return the process-wide OpenAI client for an API key and endpoint, creating it on first use.
+
+        Every model sharing a key shares one client and so one HTTP connection pool. The
+        SDK's own retries are off: the models retry with ``RetryPolicy``.
+        """
+        resolved_api_key = OpenAIClientFactory._resolve_api_key(api_key)
+        key = (resolved_api_key, base_url)
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                logger.debug("Creating shared OpenAI client.")
+                client = OpenAIClientFactory.create_client(resolved_api_key, base_url, max_retries=0)
+                _clients[key] = client
+            return client
+
+    @staticmethod
+    def get_async_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> "AsyncOpenAI":
+        """Return the AsyncOpenAI client for an API key and endpoint shared by everything on the running event loop."""
+        loop = asyncio.get_running_loop()
+        resolved_api_key = OpenAIClientFactory._resolve_api_key(api_key)
+        key = (resolved_api_key, base_url)
+        with _clients_lock:
+            loop_clients = _async_clients.setdefault(loop, {})
+            client = loop_clients.get(key)
+            if client is None:
+                logger.debug("Creating shared async OpenAI client.")
+                client = OpenAIClientFactory.create_async_client(resolved_api_key, base_url, max_retries=0)
+                loop_clients[key] = client
+            return client
+
+    @staticmethod
+    def configure_pool(pool_settings: HttpPoolSettings) -> None:
+        """Set the connection pool used by shared clients created from now on."""
+        global _pool_settings
+        _pool_settings = pool_settings
+        OpenAIClientFactory.clear_clients()
+
+    @staticmethod
+    def clear_clients() -> None:
+        """Forget the shared clients, e.g. after a fork or in tests."""
+        with _clients_lock:
+            _clients.clear()
+            _async_clients.clear()
+
+    @staticmethod
+    def _limits(settings: HttpPoolSettings):
+        import httpx
+
+        return httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        )
 
     @staticmethod
-    def _resolve_api_key(api_key: str) -> str:
+    def _resolve_api_key(api_key: Optional[str]) -> str:
         if api_key:
             return api_key
+        load_environment()
         env_api_key = os.getenv("OPENAI_API_KEY")
         if env_api_key:
             return env_api_key
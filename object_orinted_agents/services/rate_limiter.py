@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from object_orinted_agents.utils.token_counter import count_message_tokens, estimate_tokens
+
+
+class TokenBucket:
+    """
+    Token bucket that refills continuously at ``rate`` per second up to ``capacity``.
+
+    ``reserve`` always succeeds and returns how long the caller must wait before its
+    reservation is covered. Reservations are served in arrival order, and one larger
+    than the capacity waits until the bucket has refilled instead of being rejected.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            self.level -= amount
+            return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def adjust(self, amount: float) -> None:
+        """Give back (positive) or charge (negative) tokens after a reservation turned out wrong."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class RateLimiter:
+    """
+    Client-side requests-per-minute and tokens-per-minute limits, per model.
+
+    Each request reserves one request and its estimated prompt tokens before it is
+    sent, waiting if either bucket is empty. Once the response reports its usage, the
+    token reservation is corrected to the actual total. Keeping just under the
+    provider's limits avoids 429 responses and the retry storms that follow them.
+
+    Args:
+        limits (Dict[str, Tuple[Optional[float], Optional[float]]]): Model name to
+            ``(requests_per_minute, tokens_per_minute)``; None leaves that dimension unlimited.
+        default_limits (Optional[Tuple[Optional[float], Optional[float]]]): Limits for models
+            not listed. None leaves them unlimited.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        default_limits: Optional[Tuple[Optional[float], Optional[float]]] = None,
+    ):
+        self.limits = dict(limits or {})
+        self.default_limits = default_limits
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, model: str, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Block until a request to ``model`` fits the limits. Returns the tokens reserved."""
+        tokens, wait = self._reserve(model, messages, tools)
+        if wait > 0:
+            time.sleep(wait)
+        return tokens
+
+    async def aacquire(self, model: str, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Async version of ``acquire``."""
+        tokens, wait = self._reserve(model, messages, tools)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return tokens
+
+    def record_usage(self, model: str, reserved_tokens: int, usage: Any) -> None:
+        """Correct a reservation with the usage reported in the response."""
+        total_tokens = getattr(usage, "total_tokens", None)
+        _, token_bucket = self._buckets_for(model)
+        if token_bucket is not None and total_tokens is not None:
+            token_bucket.adjust(reserved_tokens - total_tokens)
+
+    def _reserve(self, model: str, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]]) -> Tuple[int, float]:
+        request_bucket, token_bucket = self._buckets_for(model)
+        tokens = estimate_request_tokens(messages, tools)
+        wait = 0.0
+        if request_bucket is not None:
+            wait = max(wait, request_bucket.reserve(1))
+        if token_bucket is not None:
+            wait = max(wait, token_bucket.reserve(tokens))
+        return tokens, wait
+
+    def _buckets_for(self, model: str) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        with self._lock:
+            buckets = self._buckets.get(model)
+            if buckets is None:
+                requests_per_minute, tokens_per_minute = self.limits.get(model, self.default_limits or (None, None))
+                buckets = (
+                    TokenBucket(requests_per_minute, requests_per_minute / 60.0) if requests_per_minute else None,
+                    TokenBucket(tokens_per_minute, tokens_per_minute / 60.0) if tokens_per_minute else None,
+                )
+                self._buckets[model] = buckets
+            return buckets
+
+
+def estimate_request_tokens(messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> int:
+    """Estimate the prompt tokens of a completion request."""
+    tokens = 0
+    for message in messages:
+        if not isinstance(message, dict):
+            message = {"content": getattr(message, "content", None)}
+        tokens += count_message_tokens(message)
+    if tools:
+        tokens += estimate_tokens(json.dumps(tools))
+    return tokens
@@ -0,0 +1,125 @@
+import asyncio
+import email.utils
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from object_orinted_agents.utils.logger import get_logger
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout", "RemoteProtocolError"}
+
+
+class RetryPolicy:
+    """
+    Retries transient API failures with jittered exponential backoff.
+
+    Rate limits (429), timeouts, conflicts and 5xx responses are retried, as are
+    connection errors. The wait before retry ``n`` is drawn uniformly from
+    ``[0, min(max_delay, base_delay * 2**n)]`` ("full jitter"), so many clients backing
+    off together spread out instead of retrying in lockstep. A ``Retry-After`` (or
+    ``retry-after-ms``) header from the server takes precedence, up to ``max_retry_after``.
+
+    Args:
+        max_attempts (int): Attempts in total, including the first one.
+        base_delay (float): Backoff scale in seconds.
+        max_delay (float): Cap of the computed backoff in seconds.
+        max_retry_after (float): Cap of server-requested waits in seconds.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 20.0, max_retry_after: float = 60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def is_retryable(self, error: BaseException) -> bool:
+        status_code = _status_code(error)
+        if status_code is not None:
+            return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+        return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Seconds to wait after failed attempt number ``attempt`` (0-based)."""
+        retry_after = retry_after_seconds(error) if error is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        response = getattr(error, "response", None)
+        status_code = getattr(response, "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read the server's requested wait from an error's response headers, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000.0, 0.0)
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def call_with_retry(function: Callable[[], T], policy: Optional[RetryPolicy], logger=None) -> T:
+    """Call ``function``, retrying per ``policy``. The last error is raised once attempts run out."""
+    if policy is None:
+        return function()
+    logger = logger or get_logger(__name__)
+    attempt = 0
+    while True:
+        try:
+            return function()
+        except Exception as e:
+            wait = _next_wait(policy, attempt, e, logger)
+            if wait is None:
+                raise
+            time.sleep(wait)
+            attempt += 1
+
+
+async def acall_with_retry(function: Callable[[], Awaitable[T]], policy: Optional[RetryPolicy], logger=None) -> T:
+    """Async version of ``call_with_retry``; waits without blocking the event loop."""
+    if policy is None:
+        return await function()
+    logger = logger or get_logger(__name__)
+    attempt = 0
+    while True:
+        try:
+            return await function()
+        except Exception as e:
+            wait = _next_wait(policy, attempt, e, logger)
+            if wait is None:
+                raise
+            await asyncio.sleep(wait)
+            attempt += 1
+
+
+def _next_wait(policy: RetryPolicy, attempt: int, error: Exception, logger: Any) -> Optional[float]:
+    if attempt + 1 >= policy.max_attempts or not policy.is_retryable(error):
+        return None
+    wait = policy.delay(attempt, error)
+    logger.warning("Attempt %s/%s failed (%s: %s); retrying in %.2fs.", attempt + 1, policy.max_attempts, type(error).__name__, error, wait)
+    return wait
@@ -0,0 +1,425 @@
+import collections
+import json
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from object_orinted_agents.services.language_model_interface import LanguageModelInterface
+from object_orinted_agents.services.stream_accumulator import StreamAccumulator, completion_to_chunks, replay_chunks
+from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.stats import summarize
+
+# List prices in USD per million prompt and completion tokens; reasoning tokens are billed as completion tokens.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "o3-mini": (1.10, 4.40),
+}
+
+REQUESTED = "requested"
+
+Validator = Callable[[Any, Optional[List[Dict[str, Any]]]], Optional[str]]
+
+
+def tool_result_failed(content: str) -> bool:
+    """Whether a tool result reports a failure; tools and the tool manager start those with "Error"."""
+    return content.lstrip().startswith("Error") or "Traceback (most recent call last)" in content
+
+
+class CallFeatures:
+    """
+    What routing rules look at, taken from the messages and tools of one call.
+
+    Attributes:
+        user_chars (int): Length of the latest user message.
+        prompt_chars (int): Length of all messages together.
+        tool_results (bool): Tool results follow the latest user message, i.e. the call
+            continues a turn after a tool round rather than starting one.
+        tool_errors (int): Tool results since the latest user message that report a failure.
+        past_tool_errors (int): Failed tool results in earlier turns of the conversation.
+        tools (bool): The call offers tools.
+    """
+
+    def __init__(self, messages: List[Any], tools: Optional[List[Dict[str, Any]]], is_tool_error: Callable[[str], bool] = tool_result_failed):
+        turn_start = -1
+        for index, message in enumerate(messages):
+            if _field(message, "role") == "user":
+                turn_start = index
+        self.user_chars = len(str(_field(messages[turn_start], "content") or "")) if turn_start >= 0 else 0
+        self.prompt_chars = sum(len(str(_field(message, "content") or "")) for message in messages)
+        self.tool_results = False
+        self.tool_errors = 0
+        self.past_tool_errors = 0
+        for index, message in enumerate(messages):
+            if _field(message, "role") != "tool":
+                continue
+            failed = is_tool_error(str(_field(message, "content") or ""))
+            if index > turn_start:
+                self.tool_results = True
+                self.tool_errors += failed
+            else:
+                self.past_tool_errors += failed
+        self.tools = bool(tools)
+
+
+class Route:
+    """
+    A model and reasoning effort that calls can be sent to instead of the ones asked for.
+
+    Args:
+        name (str): Label of the route in logs and ``stats``.
+        model (str): Model to call.
+        reasoning_effort (Optional[str]): Effort to ask for, None for models without one.
+    """
+
+    def __init__(self, name: str, model: str, reasoning_effort: Optional[str] = None):
+        self.name = name
+        self.model = model
+        self.reasoning_effort = reasoning_effort
+
+    def __repr__(self) -> str:
+        return f"Route(name={self.name!r}, model={self.model!r}, reasoning_effort={self.reasoning_effort!r})"
+
+
+class RoutingRule:
+    """
+    Sends a call to ``route`` when all the given conditions hold; conditions left as
+    None are not checked.
+
+    Args:
+        route (Route): Where matching calls go.
+        tool_results (Optional[bool]): True to match only calls that continue a turn after
+            a tool round, False to match only the first call of a turn.
+        max_user_chars (Optional[int]): Longest latest user message that matches.
+        max_prompt_chars (Optional[int]): Longest conversation, in characters, that matches.
+        max_tool_errors (Optional[int]): Most failed tool results in the current turn that match.
+        max_past_tool_errors (Optional[int]): Most failed tool results in earlier turns that match.
+        tools (Optional[bool]): True to match only calls that offer tools, False only calls without.
+    """
+
+    def __init__(
+        self,
+        route: Route,
+        tool_results: Optional[bool] = None,
+        max_user_chars: Optional[int] = None,
+        max_prompt_chars: Optional[int] = None,
+        max_tool_errors: Optional[int] = None,
+        max_past_tool_errors: Optional[int] = None,
+        tools: Optional[bool] = None,
+    ):
+        self.route = route
+        self.tool_results = tool_results
+        self.max_user_chars = max_user_chars
+        self.max_prompt_chars = max_prompt_chars
+        self.max_tool_errors = max_tool_errors
+        self.max_past_tool_errors = max_past_tool_errors
+        self.tools = tools
+
+    def matches(self, features: CallFeatures) -> bool:
+        return (
+            (self.tool_results is None or features.tool_results == self.tool_results)
+            and (self.max_user_chars is None or features.user_chars <= self.max_user_chars)
+            and (self.max_prompt_chars is None or features.prompt_chars <= self.max_prompt_chars)
+            and (self.max_tool_errors is None or features.tool_errors <= self.max_tool_errors)
+            and (self.max_past_tool_errors is None or features.past_tool_errors <= self.max_past_tool_errors)
+            and (self.tools is None or features.tools == self.tools)
+        )
+
+
+def check_tool_calls(response: Any, tools: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """
+    Reject empty answers and tool calls that name a tool the call did not offer or whose
+    arguments are not a JSON object. Returns the reason, or None if the response is fine.
+    """
+    message = response.choices[0].message
+    tool_calls = getattr(message, "tool_calls", None) or []
+    if not tool_calls and not (message.content or "").strip():
+        return "empty answer"
+    # Tools may be given as bare function definitions or wrapped in {"type": "function", "function": ...}.
+    offered = {tool.get("function", tool).get("name") for tool in tools or []}
+    for tool_call in tool_calls:
+        if tool_call.function.name not in offered:
+            return f"call to unknown tool '{tool_call.function.name}'"
+        try:
+            arguments = json.loads(tool_call.function.arguments or "")
+        except ValueError:
+            return f"arguments of '{tool_call.function.name}' are not valid JSON"
+        if not isinstance(arguments, dict):
+            return f"arguments of '{tool_call.function.name}' are not a JSON object"
+    return None
+
+
+def check_python_code(response: Any, tools: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """Reject tool calls whose ``python_code`` argument is not valid Python."""
+    for tool_call in getattr(response.choices[0].message, "tool_calls", None) or []:
+        try:
+            code = json.loads(tool_call.function.arguments or "").get("python_code")
+        except (ValueError, AttributeError):
+            continue
+        if not isinstance(code, str):
+            continue
+        try:
+            compile(code.strip('"""'), "<tool call>", "exec")
+        except (SyntaxError, ValueError) as e:
+            return f"python_code does not compile: {e}"
+    return None
+
+
+DEFAULT_VALIDATORS: List[Validator] = [check_tool_calls, check_python_code]
+
+
+class _RouteTally:
+    def __init__(self):
+        self.calls = 0
+        self.answered = 0
+        self.rejected = 0
+        self.tool_errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.latencies: List[float] = []
+        self.answered_seconds = 0.0
+        self.answered_cost_usd = 0.0
+
+
+class RoutingLanguageModel(LanguageModelInterface):
+    """
+    Picks the model and reasoning effort of every call from ``rules``, cheapest first,
+    and escalates to the model the caller asked for when the cheap answer does not hold up.
+
+    The first rule that matches the call's ``CallFeatures`` sends it to its route; calls
+    no rule matches go to the requested model and effort. An answer from a route is
+    checked by ``validators`` and, if one rejects it or the call fails, the call is
+    repeated on the requested model. When the tools a cheap answer called report errors,
+    the next call of the turn sees them as ``tool_errors``, so rules with
+    ``max_tool_errors=0`` stop matching and the turn continues on the requested model.
+    Streamed calls on a route are collected and validated before their chunks are
+    passed on.
+
+    ``stats`` reports calls, rejections, tool errors, latency, tokens and cost per route,
+    and for each route the time and money saved against sending its answered calls to the
+    requested model. Those savings are estimates: the baseline is the mean latency and
+    cost of the calls the requested model answered, or for cost, until there are any, the
+    route's own tokens at the requested model's prices.
+
+    Args:
+        language_model_interface (LanguageModelInterface): The model to wrap.
+        rules (List[RoutingRule]): Tried in order for every call.
+        validators (Optional[List[Validator]]): Called with a route's response and the call's
+            tools; each returns why the response is rejected, or None. Defaults to
+            ``DEFAULT_VALIDATORS``.
+        prices (Optional[Dict[str, Tuple[float, float]]]): USD per million prompt and completion
+            tokens by model, for the cost report. Defaults to ``MODEL_PRICES``.
+        is_tool_error (Callable[[str], bool]): Whether a tool result reports a failure.
+    """
+
+    def __init__(
+        self,
+        language_model_interface: LanguageModelInterface,
+        rules: List[RoutingRule],
+        validators: Optional[List[Validator]] = None,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        is_tool_error: Callable[[str], bool] = tool_result_failed,
+        logger=None,
+    ):
+        self.language_model_interface = language_model_interface
+        self.rules = list(rules)
+        self.validators = DEFAULT_VALIDATORS if validators is None else list(validators)
+        self.prices = MODEL_PRICES if prices is None else prices
+        self.is_tool_error = is_tool_error
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._tallies: Dict[str, _RouteTally] = collections.defaultdict(_RouteTally)
+        self._requested_models: Dict[str, str] = {}
+        # Tool call id -> route that made the call, until its result shows up in a later call.
+        self._pending: "collections.OrderedDict[str, str]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def choose(self, messages: List[Any], tools: Optional[List[Dict[str, Any]]] = None) -> Optional[Route]:
+        """The route of a call, or None to send it to the requested model."""
+        self._settle_tool_calls(messages)
+        features = CallFeatures(messages, tools, self.is_tool_error)
+        for rule in self.rules:
+            if rule.matches(features):
+                return rule.route
+        return None
+
+    def generate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        route = self.choose(messages, tools)
+        if route is not None:
+            started = time.perf_counter()
+            try:
+                response = self.language_model_interface.generate_completion(
+                    model=route.model, messages=messages, tools=tools, reasoning_effort=route.reasoning_effort, stream=stream
+                )
+                if stream:
+                    accumulator = StreamAccumulator()
+                    for chunk in response:
+                        accumulator.add(chunk)
+                    response = accumulator.completion()
+                reason = self._validate(response, tools)
+            except Exception as e:
+                response, reason = None, f"call failed: {e}"
+            if self._settle_route(route, model, response, reason, time.perf_counter() - started):
+                return iter(completion_to_chunks(response)) if stream else response
+
+        started = time.perf_counter()
+        response = self.language_model_interface.generate_completion(
+            model=model, messages=messages, tools=tools, reasoning_effort=reasoning_effort, stream=stream
+        )
+        if stream:
+            return self._meter_stream(model, response, started)
+        self._record(REQUESTED, model, getattr(response, "usage", None), time.perf_counter() - started, answered=True)
+        return response
+
+    async def agenerate_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, str]]] = None,
+        reasoning_effort: Optional[str] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        route = self.choose(messages, tools)
+        if route is not None:
+            started = time.perf_counter()
+            try:
+                response = await self.language_model_interface.agenerate_completion(
+                    model=route.model, messages=messages, tools=tools, reasoning_effort=route.reasoning_effort, stream=stream
+                )
+                if stream:
+                    accumulator = StreamAccumulator()
+                    async for chunk in response:
+                        accumulator.add(chunk)
+                    response = accumulator.completion()
+                reason = self._validate(response, tools)
+            except Exception as e:
+                response, reason = None, f"call failed: {e}"
+            if self._settle_route(route, model, response, reason, time.perf_counter() - started):
+                return replay_chunks(response) if stream else response
+
+        started = time.perf_counter()
+        response = await self.language_model_interface.agenerate_completion(
+            model=model, messages=messages, tools=tools, reasoning_effort=reasoning_effort, stream=stream
+        )
+        if stream:
+            return self._ameter_stream(model, response, started)
+        self._record(REQUESTED, model, getattr(response, "usage", None), time.perf_counter() - started, answered=True)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requested = self._tallies.get(REQUESTED)
+            baseline_seconds = baseline_cost = None
+            if requested is not None and requested.answered:
+                baseline_seconds = requested.answered_seconds / requested.answered
+                baseline_cost = requested.answered_cost_usd / requested.answered
+            routes = {}
+            saved_seconds = saved_usd = 0.0
+            for name, tally in self._tallies.items():
+                report = {
+                    "calls": tally.calls,
+                    "answered": tally.answered,
+                    "rejected": tally.rejected,
+                    "tool_errors": tally.tool_errors,
+                    "latency_seconds": summarize(tally.latencies),
+                    "prompt_tokens": tally.prompt_tokens,
+                    "completion_tokens": tally.completion_tokens,
+                    "cost_usd": tally.cost_usd,
+                }
+                if name != REQUESTED:
+                    spent_seconds = sum(tally.latencies)
+                    report["saved_seconds"] = None if baseline_seconds is None else tally.answered * baseline_seconds - spent_seconds
+                    if baseline_cost is not None:
+                        report["saved_usd"] = tally.answered * baseline_cost - tally.cost_usd
+                    else:
+                        report["saved_usd"] = self._cost(self._requested_models.get(name), tally.prompt_tokens, tally.completion_tokens) - tally.cost_usd
+                    saved_seconds += report["saved_seconds"] or 0.0
+                    saved_usd += report["saved_usd"]
+                routes[name] = report
+        return {"routes": routes, "saved_seconds": saved_seconds, "saved_usd": saved_usd}
+
+    def _validate(self, response: Any, tools: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+        for validator in self.validators:
+            reason = validator(response, tools)
+            if reason:
+                return reason
+        return None
+
+    def _settle_route(self, route: Route, requested_model: str, response: Any, reason: Optional[str], seconds: float) -> bool:
+        """Record a route's attempt; True if its response is passed on, False to escalate."""
+        usage = getattr(response, "usage", None)
+        self._record(route.name, route.model, usage, seconds, answered=reason is None, requested_model=requested_model)
+        if reason is not None:
+            self.logger.info("Escalating from %s to %s: %s", route.name, requested_model, reason)
+            return False
+        self.logger.debug("Answered by route %s (%s, effort=%s)", route.name, route.model, route.reasoning_effort)
+        tool_calls = getattr(response.choices[0].message, "tool_calls", None) or []
+        with self._lock:
+            for tool_call in tool_calls:
+                self._pending[tool_call.id] = route.name
+            while len(self._pending) > 1024:
+                self._pending.popitem(last=False)
+        return True
+
+    def _settle_tool_calls(self, messages: List[Any]) -> None:
+        # Results of tool calls a route made tell whether its answer held up.
+        with self._lock:
+            if not self._pending:
+                return
+            for message in messages:
+                if _field(message, "role") != "tool":
+                    continue
+                name = self._pending.pop(_field(message, "tool_call_id"), None)
+                if name is not None and self.is_tool_error(str(_field(message, "content") or "")):
+                    self._tallies[name].tool_errors += 1
+
+    def _cost(self, model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+        prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+    def _record(self, name: str, model: str, usage: Any, seconds: float, answered: bool, requested_model: Optional[str] = None) -> None:
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        cost = self._cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            tally = self._tallies[name]
+            tally.calls += 1
+            tally.prompt_tokens += prompt_tokens
+            tally.completion_tokens += completion_tokens
+            tally.cost_usd += cost
+            tally.latencies.append(seconds)
+            if answered:
+                tally.answered += 1
+                tally.answered_seconds += seconds
+                tally.answered_cost_usd += cost
+            else:
+                tally.rejected += 1
+            if requested_model is not None:
+                self._requested_models[name] = requested_model
+
+    def _meter_stream(self, model: str, chunks: Iterator[Any], started: float) -> Iterator[Any]:
+        usage = None
+        for chunk in chunks:
+            usage = getattr(chunk, "usage", None) or usage
+            yield chunk
+        self._record(REQUESTED, model, usage, time.perf_counter() - started, answered=True)
+
+    async def _ameter_stream(self, model: str, chunks: AsyncIterator[Any], started: float) -> AsyncIterator[Any]:
+        usage = None
+        async for chunk in chunks:
+            usage = getattr(chunk, "usage", None) or usage
+            yield chunk
+        self._record(REQUESTED, model, usage, time.perf_counter() - started, answered=True)
+
+
+def _field(message: Any, name: str) -> Any:
+    if isinstance(message, dict):
+        return message.get(name)
+    return getattr(message, name, None)
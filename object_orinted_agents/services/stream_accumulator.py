@@ -0,0 +1,164 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+class AssembledFunction:
+    def __init__(self):
+        self.name = ""
+        self.arguments = ""
+
+
+class AssembledToolCall:
+    def __init__(self, index: int):
+        self.index = index
+        self.id: Optional[str] = None
+        self.type = "function"
+        self.function = AssembledFunction()
+
+
+class AssembledMessage:
+    """Assistant message rebuilt from stream deltas, shaped like the SDK's ``ChatCompletionMessage``."""
+
+    def __init__(self, content: Optional[str], tool_calls: Optional[List[AssembledToolCall]]):
+        self.role = "assistant"
+        self.content = content
+        self.tool_calls = tool_calls
+
+
+class AssembledChoice:
+    def __init__(self, message: AssembledMessage, finish_reason: Optional[str]):
+        self.index = 0
+        self.message = message
+        self.finish_reason = finish_reason
+
+
+class AssembledCompletion:
+    def __init__(self, model: Optional[str], message: AssembledMessage, finish_reason: Optional[str], usage: Any):
+        self.model = model
+        self.choices = [AssembledChoice(message, finish_reason)]
+        self.usage = usage
+
+
+class StreamAccumulator:
+    """
+    Collects streamed ``ChatCompletionChunk`` deltas into a complete assistant message.
+
+    Text deltas are returned from ``add`` as they arrive so callers can forward them.
+    Tool-call fragments are merged by their ``index``: the id and name arrive in the
+    first fragment and the JSON arguments are concatenated across later ones.
+    """
+
+    def __init__(self):
+        self.model: Optional[str] = None
+        self.content_parts: List[str] = []
+        self.tool_calls: Dict[int, AssembledToolCall] = {}
+        self.finish_reason: Optional[str] = None
+        self.usage = None
+
+    def add(self, chunk: Any) -> str:
+        """Merge one chunk and return its text delta ("" if it carried none)."""
+        self.model = getattr(chunk, "model", None) or self.model
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return ""
+
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+        delta = choice.delta
+
+        for fragment in getattr(delta, "tool_calls", None) or []:
+            tool_call = self.tool_calls.setdefault(fragment.index, AssembledToolCall(fragment.index))
+            if fragment.id:
+                tool_call.id = fragment.id
+            if fragment.function is not None:
+                if fragment.function.name:
+                    tool_call.function.name += fragment.function.name
+                if fragment.function.arguments:
+                    tool_call.function.arguments += fragment.function.arguments
+
+        text = getattr(delta, "content", None) or ""
+        if text:
+            self.content_parts.append(text)
+        return text
+
+    @property
+    def content(self) -> str:
+        return "".join(self.content_parts)
+
+    def message(self) -> AssembledMessage:
+        tool_calls = [self.tool_calls[index] for index in sorted(self.tool_calls)] or None
+        return AssembledMessage(self.content or None, tool_calls)
+
+    def completion(self) -> AssembledCompletion:
+        return AssembledCompletion(self.model, self.message(), self.finish_reason, self.usage)
+
+
+class ReplayFunction:
+    def __init__(self, name: Optional[str], arguments: str):
+        self.name = name
+        self.arguments = arguments
+
+
+class ReplayToolCallDelta:
+    def __init__(self, index: int, call_id: Optional[str], name: Optional[str], arguments: str):
+        self.index = index
+        self.id = call_id
+        self.type = "function" if call_id else None
+        self.function = ReplayFunction(name, arguments)
+
+
+class ReplayDelta:
+    def __init__(self, content: Optional[str] = None, tool_calls: Optional[List[ReplayToolCallDelta]] = None):
+        self.role = "assistant"
+        self.content = content
+        self.tool_calls = tool_calls
+
+
+class ReplayChunkChoice:
+    def __init__(self, delta: ReplayDelta, finish_reason: Optional[str] = None):
+        self.index = 0
+        self.delta = delta
+        self.finish_reason = finish_reason
+
+
+class ReplayChunk:
+    """Shaped like the SDK's ``ChatCompletionChunk``."""
+
+    def __init__(self, model: Optional[str], choices: List[ReplayChunkChoice], usage: Any = None):
+        self.model = model
+        self.choices = choices
+        self.usage = usage
+
+
+def completion_to_chunks(completion: Any, chunk_size: int = 8) -> List[ReplayChunk]:
+    """
+    Split a complete response into the deltas a streaming API would have sent.
+
+    Used to replay cached or scripted completions to streaming callers.
+    """
+    model = getattr(completion, "model", None)
+    choice = completion.choices[0]
+    message = choice.message
+    chunks = []
+    content = message.content or ""
+    for start in range(0, len(content), chunk_size):
+        chunks.append(ReplayChunk(model, [ReplayChunkChoice(ReplayDelta(content=content[start:start + chunk_size]))]))
+    for index, tool_call in enumerate(message.tool_calls or []):
+        first = ReplayToolCallDelta(index, tool_call.id, tool_call.function.name, "")
+        chunks.append(ReplayChunk(model, [ReplayChunkChoice(ReplayDelta(tool_calls=[first]))]))
+        arguments = tool_call.function.arguments or ""
+        for start in range(0, len(arguments), chunk_size):
+            fragment = ReplayToolCallDelta(index, None, None, arguments[start:start + chunk_size])
+            chunks.append(ReplayChunk(model, [ReplayChunkChoice(ReplayDelta(tool_calls=[fragment]))]))
+    chunks.append(ReplayChunk(model, [ReplayChunkChoice(ReplayDelta(), getattr(choice, "finish_reason", None))]))
+    usage = getattr(completion, "usage", None)
+    if usage is not None:
+        chunks.append(ReplayChunk(model, [], usage=usage))
+    return chunks
+
+
+async def replay_chunks(completion: Any) -> AsyncIterator[Any]:
+    """``completion_to_chunks`` as an async iterator, for async streaming callers."""
+    for chunk in completion_to_chunks(completion):
+        yield chunk
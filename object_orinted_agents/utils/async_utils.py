@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="agents-sync-bridge", daemon=True).start()
+        return _loop
+
+
+def run_sync(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine to completion from synchronous code and return its result.
+
+    Coroutines run on one process-wide background event loop, so async clients
+    (e.g. ``AsyncOpenAI``) keep their connection pools between synchronous calls.
+
+    Args:
+        coroutine (Coroutine): The coroutine to run.
+
+    Returns:
+        Any: The coroutine's result. Exceptions are re-raised in the caller.
+    """
+    future = asyncio.run_coroutine_threadsafe(coroutine, _background_loop())
+    return future.result()
+
+
+def iterate_sync(coroutine: Coroutine[Any, Any, AsyncIterator[Any]]) -> Iterator[Any]:
+    """
+    Iterate, from synchronous code, over the async iterator returned by a coroutine.
+
+    Both the coroutine and every ``__anext__`` run on the background event loop used by ``run_sync``.
+    """
+    async_iterator = run_sync(coroutine).__aiter__()
+
+    async def next_item():
+        return await async_iterator.__anext__()
+
+    while True:
+        try:
+            yield run_sync(next_item())
+        except StopAsyncIteration:
+            return
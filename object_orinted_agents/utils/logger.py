@@ -1,10 +1,34 @@
+import atexit
 import logging
-from typing import Optional
+import logging.handlers
+import queue
+import random
+import threading
+from typing import Any, Optional
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Pass as ``extra=PAYLOAD`` on records that dump prompts, responses or tool output,
+# so they are capped and sampled (see ``configure_payload_logging``).
+PAYLOAD = {"payload": True}
+
+_payload_max_chars = 2000
+_payload_sample_rate = 1.0
+
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
 
 def get_logger(name: str, level: int = logging.INFO, formatter: Optional[logging.Formatter] = None) -> logging.Logger:
     """
     Get a configured logger.
 
+    The logger gets one handler that puts records on a queue; a background thread writes
+    them to stderr, so slow log I/O never blocks the caller. Calling this again for the
+    same name does not add another handler. Records do not propagate to the root logger,
+    which would print them a second time after ``logging.basicConfig``.
+
     Args:
         name (str): The name of the logger.
         level (int): The logging level. Default is logging.INFO.
@@ -16,15 +40,125 @@ def get_logger(name: str, level: int = logging.INFO, formatter: Optional[logging
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
-    if not logger.hasHandlers:
-        handler = logging.StreamHandler()
-        handler.setLevel(level)
-
-        if formatter is None:
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
+    if not logger.handlers:
+        handler = logging.handlers.QueueHandler(_log_queue)
+        handler.setFormatter(formatter or logging.Formatter(DEFAULT_FORMAT))
+        handler.addFilter(PayloadFilter())
         logger.addHandler(handler)
+        logger.propagate = False
+        _start_listener()
 
     return logger
 
 
+def configure_payload_logging(max_chars: Optional[int] = None, sample_rate: Optional[float] = None) -> None:
+    """
+    Set how payload records are rendered.
+
+    Args:
+        max_chars (Optional[int]): Characters kept of each payload passed through ``truncate``.
+        sample_rate (Optional[float]): Fraction of ``PAYLOAD`` records that are emitted, 0 to 1.
+    """
+    global _payload_max_chars, _payload_sample_rate
+    if max_chars is not None:
+        _payload_max_chars = max_chars
+    if sample_rate is not None:
+        _payload_sample_rate = sample_rate
+
+
+class PayloadFilter(logging.Filter):
+    """Drops all but ``sample_rate`` of the records logged with ``extra=PAYLOAD``."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "payload", False) or _payload_sample_rate >= 1.0:
+            return True
+        return random.random() < _payload_sample_rate
+
+
+def truncate(value: Any, max_chars: Optional[int] = None) -> "_Truncated":
+    """
+    Wrap a log argument so it renders cut to ``max_chars`` characters (the configured
+    payload limit by default).
+
+    Nothing is rendered unless the record is emitted, and lists, tuples and dicts are
+    rendered item by item only until the limit is reached, so a long message history
+    costs no more than its first ``max_chars`` characters.
+    """
+    return _Truncated(value, max_chars)
+
+
+class _Truncated:
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: Optional[int] = None):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        limit = self.max_chars if self.max_chars is not None else _payload_max_chars
+        parts = []
+        remaining = _render(self.value, limit, parts)
+        text = "".join(parts)
+        if remaining < 0:
+            text = text[:limit] + f"... [truncated at {limit} chars]"
+        return text
+
+
+def _render(value: Any, budget: int, parts: list, nested: bool = False) -> int:
+    # Appends a rendering of value to parts, stopping once budget characters are used.
+    # Returns the budget left; negative means the rendering was cut short. Strings are
+    # quoted inside containers, as repr() would.
+    if budget < 0:
+        return budget
+    if isinstance(value, (list, tuple)):
+        opening, closing = ("[", "]") if isinstance(value, list) else ("(", ")")
+        parts.append(opening)
+        budget -= 1
+        for index, item in enumerate(value):
+            if index:
+                parts.append(", ")
+                budget -= 2
+            budget = _render(item, budget, parts, nested=True)
+            if budget < 0:
+                return budget
+        parts.append(closing)
+        return budget - 1
+    if isinstance(value, dict):
+        parts.append("{")
+        budget -= 1
+        for index, (key, item) in enumerate(value.items()):
+            prefix = (", " if index else "") + f"{key!r}: "
+            parts.append(prefix)
+            budget = _render(item, budget - len(prefix), parts, nested=True)
+            if budget < 0:
+                return budget
+        parts.append("}")
+        return budget - 1
+    text = value if isinstance(value, str) and not nested else repr(value)
+    if len(text) > budget + 1:
+        text = text[:budget + 1]
+    parts.append(text)
+    return budget - len(text)
+
+
+def _start_listener() -> None:
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        # Records arrive already formatted by each logger's QueueHandler.
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+        _listener = logging.handlers.QueueListener(_log_queue, stream_handler)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the logging thread. Runs automatically at exit."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
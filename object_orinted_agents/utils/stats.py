@@ -0,0 +1,38 @@
+import math
+from typing import Dict, Iterable, List
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Linear-interpolated percentile of a list of numbers.
+
+    Args:
+        values (List[float]): Samples, in any order.
+        q (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile, or 0.0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return float(ordered[int(rank)])
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """Return count, mean, p50, p95 and max of the given samples."""
+    samples = list(values)
+    if not samples:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "count": len(samples),
+        "mean": sum(samples) / len(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "max": max(samples),
+    }
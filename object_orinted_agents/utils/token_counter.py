@@ -0,0 +1,43 @@
+import json
+from typing import Any, Callable, Dict, Optional
+
+# Per-message framing tokens added by the chat format (role, separators).
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Count tokens in a piece of text.
+
+    Uses ``tiktoken`` when it is installed and falls back to roughly four
+    characters per token otherwise.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def count_message_tokens(message: Dict[str, Any], token_counter: Callable[[str], int] = estimate_tokens) -> int:
+    """Tokens a chat message adds to a request: its content, any tool calls and framing."""
+    tokens = MESSAGE_OVERHEAD_TOKENS + token_counter(message.get("content") or "")
+    for tool_call in message.get("tool_calls") or []:
+        tokens += token_counter(json.dumps(tool_call))
+    return tokens
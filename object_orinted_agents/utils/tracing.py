@@ -0,0 +1,318 @@
+import collections
+import contextlib
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional
+
+from object_orinted_agents.utils.stats import summarize
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed operation: an agent turn, a model call, a tool run, a sandbox execution.
+
+    Spans started while another is current become its children and share its trace id.
+    Durations are measured with a monotonic clock; ``start_time`` is wall-clock time.
+    """
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.name = name
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException) -> None:
+        self.error = f"{type(error).__name__}: {error}"
+
+    def elapsed(self) -> float:
+        """Seconds since the span started."""
+        return time.perf_counter() - self._started
+
+    def end(self) -> None:
+        """Stop the clock and hand the span to the exporters. Ending twice is a no-op."""
+        if self.duration is not None:
+            return
+        self.duration = self.elapsed()
+        self.tracer._finish(self)
+
+    @property
+    def end_time(self) -> Optional[float]:
+        return None if self.duration is None else self.start_time + self.duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": None if self.duration is None else round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class SpanExporter(ABC):
+    """Receives finished spans. ``on_start`` is called when a span begins."""
+
+    def on_start(self, span: Span) -> None:
+        pass
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps the most recent ``max_spans`` finished spans, for tests and interactive inspection."""
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans: Deque[Span] = collections.deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def finished_spans(self, name: Optional[str] = None) -> List[Span]:
+        with self._lock:
+            return [span for span in self.spans if name is None or span.name == name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends one JSON object per finished span to a file."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class OpenTelemetrySpanExporter(SpanExporter):
+    """
+    Mirrors spans into OpenTelemetry, so any OTel backend (OTLP, Jaeger, ...) can show them.
+
+    Needs the ``opentelemetry-api`` package; configure the SDK and its exporter as usual.
+    """
+
+    def __init__(self, tracer_name: str = "object_orinted_agents"):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(tracer_name)
+        self._open: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        with self._lock:
+            parent = self._open.get(span.parent_id) if span.parent_id else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = self._tracer.start_span(span.name, context=context, start_time=int(span.start_time * 1e9))
+        with self._lock:
+            self._open[span.span_id] = otel_span
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            otel_span = self._open.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if value is not None:
+                otel_span.set_attribute(key, value if isinstance(value, (bool, int, float, str)) else str(value))
+        if span.error:
+            from opentelemetry.trace import Status, StatusCode
+
+            otel_span.set_status(Status(StatusCode.ERROR, span.error))
+        otel_span.end(end_time=int(span.end_time * 1e9))
+
+
+class Tracer:
+    """
+    Creates spans and keeps per-name latency samples for ``summary``.
+
+    Finished spans go to every exporter. The current span is tracked with a context
+    variable, so nesting follows asyncio tasks and ``asyncio.to_thread`` calls.
+
+    Args:
+        exporters (Optional[List[SpanExporter]]): Where finished spans are sent.
+        enabled (bool): When False, spans are not timed, recorded or exported.
+        max_samples (int): Latency samples kept per span name for ``summary``.
+    """
+
+    def __init__(self, exporters: Optional[List[SpanExporter]] = None, enabled: bool = True, max_samples: int = 10000):
+        self.exporters = list(exporters or [])
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self._durations: Dict[str, Deque[float]] = {}
+        self._errors: collections.Counter = collections.Counter()
+        self._lock = threading.Lock()
+
+    def add_exporter(self, exporter: SpanExporter) -> None:
+        self.exporters.append(exporter)
+
+    def start_span(self, name: str, **attributes: Any) -> Span:
+        """Start a span that is not made current; call ``end`` on it when done."""
+        span = Span(self, name, _current_span.get(), attributes)
+        if self.enabled:
+            for exporter in self.exporters:
+                exporter.on_start(span)
+        return span
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time the enclosed block as a span that is current, so spans started inside are its children."""
+        parent = _current_span.get()
+        span = self.start_span(name, **attributes)
+        _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            # Restore by value rather than by token: generators may finish in another context.
+            _current_span.set(parent)
+            span.end()
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, mean, p50, p95 and max duration in milliseconds, and error count, per span name."""
+        with self._lock:
+            return {
+                name: {**summarize(durations), "errors": self._errors[name]}
+                for name, durations in sorted(self._durations.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._durations.clear()
+            self._errors.clear()
+
+    def shutdown(self) -> None:
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+    def _finish(self, span: Span) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            durations = self._durations.get(span.name)
+            if durations is None:
+                durations = self._durations[span.name] = collections.deque(maxlen=self.max_samples)
+            durations.append(span.duration * 1000)
+            if span.error:
+                self._errors[span.name] += 1
+        for exporter in self.exporters:
+            exporter.export(span)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer used by agents, models, tools and sandboxes."""
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    global _tracer
+    _tracer = tracer
+
+
+def record_usage(span: Span, usage: Any) -> None:
+    """Copy token counts from a completion's ``usage`` onto a span."""
+    if usage is None:
+        return
+    span.set_attributes({
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "total_tokens": getattr(usage, "total_tokens", None),
+    })
+    details = getattr(usage, "completion_tokens_details", None)
+    reasoning_tokens = getattr(details, "reasoning_tokens", None)
+    if reasoning_tokens is not None:
+        span.set_attribute("reasoning_tokens", reasoning_tokens)
+
+
+def traced_stream(span: Span, chunks: Iterator[Any], on_usage: Optional[Callable[[Any], None]] = None) -> Iterator[Any]:
+    """
+    Pass a completion stream through, ending ``span`` when the stream does.
+
+    Records the time to the first chunk and the usage reported in the last one, which is
+    also handed to ``on_usage``.
+    """
+    usage = None
+    try:
+        for chunk in chunks:
+            if "first_chunk_ms" not in span.attributes:
+                span.set_attribute("first_chunk_ms", round(span.elapsed() * 1000, 3))
+            usage = getattr(chunk, "usage", None) or usage
+            yield chunk
+    except Exception as e:
+        span.record_error(e)
+        raise
+    finally:
+        record_usage(span, usage)
+        span.end()
+        if on_usage is not None:
+            on_usage(usage)
+
+
+async def atraced_stream(span: Span, chunks: AsyncIterator[Any], on_usage: Optional[Callable[[Any], None]] = None) -> AsyncIterator[Any]:
+    """Async version of ``traced_stream``."""
+    usage = None
+    try:
+        async for chunk in chunks:
+            if "first_chunk_ms" not in span.attributes:
+                span.set_attribute("first_chunk_ms", round(span.elapsed() * 1000, 3))
+            usage = getattr(chunk, "usage", None) or usage
+            yield chunk
+    except Exception as e:
+        span.record_error(e)
+        raise
+    finally:
+        record_usage(span, usage)
+        span.end()
+        if on_usage is not None:
+            on_usage(usage)
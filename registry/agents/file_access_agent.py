@@ -1,41 +1,58 @@
 import logging
-import os
 
 from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.core.prefetch import Prefetcher
 from object_orinted_agents.core.tool_manager import ToolManager
-from object_orinted_agents.core.base_agent import BaseAgent
+from object_orinted_agents.core.async_base_agent import AsyncBaseAgent
+from object_orinted_agents.core.session_store import SessionStore
+from object_orinted_agents.services.language_model_interface import LanguageModelInterface
 from object_orinted_agents.services.open_ai_language_model import OpenAILanguageModel
+from object_orinted_agents.sandbox.pool import SandboxWorker
+from object_orinted_agents.datasets.dataset_store import DatasetStore
+from object_orinted_agents.sandbox.execution_cache import SandboxDatasets
 
 from registry.tools.file_access_tool import FileAccessTool
 
-import dotenv
-dotenv.load_dotenv()
-
 myapp_logger = get_logger(__name__, logging.INFO)
 
-language_model_ai_interface = OpenAILanguageModel(api_key=os.getenv("OPENAI_API_KEY"), logger=myapp_logger)
-
-class FileAccessAgent(BaseAgent):
+class FileAccessAgent(AsyncBaseAgent):
     def __init__(
         self,
         developer_prompt: str = """You are a helpful data science assistant.
-        The user will provide the name of the csv file that contains relationals data. The file in in directory ./data.
+        The user will provide the name of the data file (CSV, TSV, JSON Lines, Parquet or Feather) that contains relationals data. The file in in directory ./data.
         Instructions:
-        1. When user provides the CSV file name, use the 'safe_read_file' tool to read and display first 15 lines of the file.
+        1. When user provides the name of a CSV, TSV, JSON Lines, Parquet or Feather file, use the 'save_file_access' tool to read it. The tool returns a profile of the file (its size and row count, every column with its type, min, max, null count and approximate distinct count, and the first rows) and where the file was staged for the Python interpreter. Display this profile.
         2. If specified file doesn't exists in the provided path, return appropriate error message.
-        3. User may request data analysis based on file contents, but you should NOT perform or write ant code for any data analysis. Your only task is to read and return the first 6 lines of the file.
+        3. User may request data analysis based on file contents, but you should NOT perform or write ant code for any data analysis. Your only task is to read the file and return its profile.
         """,
         model_name: str = "gpt-4o",
         logger=myapp_logger,
-        language_model_interface: OpenAILanguageModel = language_model_ai_interface,
+        language_model_interface: LanguageModelInterface = None,
+        sandbox: SandboxWorker = None,
+        dataset_store: DatasetStore = None,
+        session_store: SessionStore = None,
+        session_id: str = None,
+        sandbox_datasets: SandboxDatasets = None,
+        prefetcher: Prefetcher = None,
     ):
-        super().__init__(developer_prompt=developer_prompt, model_name=model_name, logger=logger, language_model_interface=language_model_interface)
+        self.sandbox = sandbox
+        self.dataset_store = dataset_store
+        # Staged files are fingerprinted here so an interpreter's execution cache can key on them.
+        self.sandbox_datasets = sandbox.datasets if sandbox else sandbox_datasets
+        # The default model creates its OpenAI client on the first completion, not here.
+        language_model_interface = language_model_interface or OpenAILanguageModel(logger=logger)
+        super().__init__(developer_prompt=developer_prompt, model_name=model_name, logger=logger, language_model_interface=language_model_interface, session_store=session_store, session_id=session_id, prefetcher=prefetcher)
         self.setup_tools()
     
     def setup_tools(self) -> None:
         """Setup tools for the agent."""
         self.logger.debug("Setting up tools for FileAccessAgent.")
         self.tool_manager = ToolManager(logger=self.logger, language_model_interface=self.language_model_interface)
-        file_access_tool = FileAccessTool(logger=self.logger)
+        if self.sandbox and self.sandbox.container_name:
+            file_access_tool = FileAccessTool(logger=self.logger, container_name=self.sandbox.container_name, dataset_store=self.dataset_store, sandbox_datasets=self.sandbox_datasets, prefetcher=self.prefetcher)
+        elif self.sandbox:
+            file_access_tool = FileAccessTool(logger=self.logger, sandbox_dir=self.sandbox.working_dir, dataset_store=self.dataset_store, sandbox_datasets=self.sandbox_datasets, prefetcher=self.prefetcher)
+        else:
+            file_access_tool = FileAccessTool(logger=self.logger, dataset_store=self.dataset_store, sandbox_datasets=self.sandbox_datasets, prefetcher=self.prefetcher)
         self.tool_manager.register_tool(file_access_tool)
         self.logger.debug("FileAccessTool has been registered with the ToolManager.")
\ No newline at end of file
@@ -1,33 +1,56 @@
 import logging
-import os
 
 from object_orinted_agents.services import language_model_interface
 from object_orinted_agents.utils.logger import get_logger
-from object_orinted_agents.core.base_agent import BaseAgent
+from object_orinted_agents.core.async_base_agent import AsyncBaseAgent
 from object_orinted_agents.services.open_ai_language_model import OpenAILanguageModel
 from object_orinted_agents.core.tool_manager import ToolManager
+from object_orinted_agents.core.session_store import SessionStore
+from object_orinted_agents.core.prefetch import Prefetcher
+from object_orinted_agents.core.summarizer import Summarizer
+from object_orinted_agents.sandbox.artifacts import ArtifactStore
+from object_orinted_agents.sandbox.execution_cache import ExecutionCache, SandboxDatasets
+from object_orinted_agents.sandbox.pool import SandboxWorker
 
 
 from registry.tools.python_code_interpreter_tool import PythonCodeInterpreterTool
 
 myapp_logger = get_logger("My App", logging.INFO)
 
-language_model_ai_interface = OpenAILanguageModel(api_key=os.getenv("OPENAI_API_KEY"), logger=myapp_logger)
-
-class PythonCodeExecAgent(BaseAgent):
+class PythonCodeExecAgent(AsyncBaseAgent):
     def __init__(
             self,
             developer_prompt: str = """You are a helpful programming assistant.""",
             model_name: str = "o3-mini",
             logger=myapp_logger,
-            language_model_interface=language_model_ai_interface,
-            reasoning_effort: str = None
+            language_model_interface=None,
+            reasoning_effort: str = None,
+            sandbox: SandboxWorker = None,
+            token_budget: int = None,
+            summarizer: Summarizer = None,
+            artifact_store: ArtifactStore = None,
+            session_store: SessionStore = None,
+            session_id: str = None,
+            execution_cache: ExecutionCache = None,
+            sandbox_datasets: SandboxDatasets = None,
+            prefetcher: Prefetcher = None,
     ):
-        super().__init__(developer_prompt=developer_prompt, model_name=model_name, logger=logger, language_model_interface=language_model_interface, reasoning_effort=reasoning_effort)
+        self.sandbox = sandbox
+        self.artifact_store = artifact_store or ArtifactStore(logger=logger)
+        # With an execution cache, repeated pure analysis code is answered without running it.
+        self.execution_cache = execution_cache
+        self.sandbox_datasets = sandbox.datasets if sandbox else sandbox_datasets
+        language_model_interface = language_model_interface or OpenAILanguageModel(logger=logger)
+        super().__init__(developer_prompt=developer_prompt, model_name=model_name, logger=logger, language_model_interface=language_model_interface, reasoning_effort=reasoning_effort, token_budget=token_budget, summarizer=summarizer, session_store=session_store, session_id=session_id, prefetcher=prefetcher)
         self.setup_tools()
 
     def setup_tools(self) -> None:
         """Setup tools for the agent."""
         self.tool_manager = ToolManager(logger=self.logger, language_model_interface=self.language_model_interface)
-        self.tool_manager.register_tool(PythonCodeInterpreterTool(logger=self.logger)) 
+        session_options = {"execution_cache": self.execution_cache, "sandbox_datasets": self.sandbox_datasets, "prefetcher": self.prefetcher}
+        if self.sandbox:
+            interpreter_tool = PythonCodeInterpreterTool(logger=self.logger, kernel=self.sandbox.kernel, artifact_store=self.artifact_store, **session_options)
+        else:
+            interpreter_tool = PythonCodeInterpreterTool(logger=self.logger, artifact_store=self.artifact_store, **session_options)
+        self.tool_manager.register_tool(interpreter_tool)
         self.logger.debug("PythonCodeExecAgent has been registered with the ToolManager.")
\ No newline at end of file
@@ -1,15 +1,53 @@
-from typing import Any, Dict, List, Optional
-import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+import shutil
 import subprocess
+import tempfile
 import os
 
 from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.utils.tracing import get_tracer
+from object_orinted_agents.core.prefetch import Prefetcher
 from object_orinted_agents.core.tool_interface import ToolInterface
+from object_orinted_agents.datasets import formats
+from object_orinted_agents.datasets.dataset_store import DatasetStore, StagedDataset, file_sha256
+from object_orinted_agents.datasets.profiler import DatasetProfiler
+from object_orinted_agents.sandbox.execution_cache import SandboxDatasets
 
 
 class FileAccessTool(ToolInterface):
-    def __init__(self, logger=None):
+    def __init__(
+        self,
+        logger=None,
+        container_name: str = "python_sandbox",
+        sandbox_dir: Optional[str] = None,
+        dataset_store: Optional[DatasetStore] = None,
+        profiler: Optional[DatasetProfiler] = None,
+        convert_to_parquet: bool = True,
+        sandbox_datasets: Optional[SandboxDatasets] = None,
+        prefetcher: Optional[Prefetcher] = None,
+    ):
         self.logger = logger or get_logger(self.__class__.__name__)
+        # Where files are transferred: a sandbox container, or a local sandbox
+        # directory when the code interpreter runs without Docker.
+        self.container_name = container_name
+        self.sandbox_dir = sandbox_dir
+        # With a dataset store, files are staged once into storage the sandboxes mount
+        # instead of being copied into each sandbox.
+        self.dataset_store = dataset_store
+        # Previews and schema statistics come from a bounded streaming scan, cached per file version.
+        self.profiler = profiler or DatasetProfiler(dataset_store=dataset_store, logger=self.logger)
+        # Staged CSV/TSV/JSON Lines files also get a Parquet copy, which analysis code loads far faster.
+        self.convert_to_parquet = convert_to_parquet
+        # (target, path) -> (mtime_ns, size) of the last copy, to skip unchanged re-copies.
+        self._copied: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        # Same, for the Parquet copies made of text files when there is no dataset store.
+        self._converted: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        # Fingerprints of the files made readable, by the paths sandboxed code may open them with.
+        self.sandbox_datasets = sandbox_datasets
+        # Files named in the conversation are read and staged in the background before they are asked for.
+        self.prefetcher = prefetcher
+        if prefetcher is not None:
+            prefetcher.add_listener("mention", self.prefetch)
 
     def get_defination(self) -> Dict[str, Any]:
         self.logger.debug("Getting tool defination for FileAccessTool.")
@@ -19,7 +57,8 @@ class FileAccessTool(ToolInterface):
                 "name": "save_file_access",
                 "description": (
                     "Read content of a file in secure mannner "
-                    "and tranfer it to Python code interpreter docker container."
+                    "and tranfer it to Python code interpreter docker container. "
+                    "Supports CSV, TSV, JSON Lines, Parquet and Feather files."
                 ),
                 "parameters": {
                     "type": "object",
@@ -36,7 +75,7 @@ class FileAccessTool(ToolInterface):
 
     def execute(self, arguments: Dict[str, Any]) -> str:
         filename = arguments.get("filename")
-        self.logger.debug(f"Executing FileAccessTool with arguments: {filename}")
+        self.logger.debug("Executing FileAccessTool with arguments: %s", filename)
 
         return self.save_file_access(filename)
 
@@ -49,23 +88,27 @@ class FileAccessTool(ToolInterface):
         Returns:
             str: The content of the file or an error message.
         """
-        if not filename.endswith(".csv"):
-            error_msg = "Error: the file name is not a csv file"
+        file_format = formats.detect_format(filename)
+        if file_format is None:
+            supported = ", ".join(sorted(formats.EXTENSIONS))
+            error_msg = f"Error: unsupported file type. Supported extensions: {supported}"
             self.logger.error(error_msg)
-            return error_msg   
+            return error_msg
 
         if not os.path.isfile(filename):
 
             filename = os.path.join("./data", filename)
 
-        self.logger.debug(f"Reading file: {filename}")
+        if self.prefetcher is not None and os.path.isfile(filename):
+            prefetched = self.prefetcher.join("file", self._prefetch_key(filename))
+            if prefetched is not None:
+                self.logger.debug("Using the prefetched read of %s.", filename)
+                return prefetched
+
+        self.logger.debug("Reading file: %s", filename)
 
         try:
-            df = pd.read_csv(filename)
-            self.logger.info(f"File {filename} read successfully.")
-            copy_output = self.copy_file_to_docker(filename)
-            head_str = df.head(15).to_string()             
-            return f"File content (first 15 rows):\n{head_str}\n\n{copy_output}"
+            return self._read_and_stage(filename, file_format)
         except Exception as e:
             error_msg = f"Error reading file {filename}: {e}"
             self.logger.error(error_msg)
@@ -76,9 +119,179 @@ class FileAccessTool(ToolInterface):
             return error_msg
         
 
+    def prefetch(self, filename: str) -> None:
+        """Start reading and staging ``filename`` in the background, for ``save_file_access`` to pick up."""
+        file_format = formats.detect_format(filename)
+        if file_format is None:
+            return
+        if not os.path.isfile(filename):
+            filename = os.path.join("./data", filename)
+        if os.path.isfile(filename):
+            self.prefetcher.submit("file", self._prefetch_key(filename), self._read_and_stage, filename, file_format)
+
+    @staticmethod
+    def _file_version(filename: str) -> str:
+        stat = os.stat(filename)
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _prefetch_key(self, filename: str) -> str:
+        # A prefetched read is only reused while the file is unchanged.
+        return f"{os.path.abspath(filename)}@{self._file_version(filename)}"
+
+    def _read_and_stage(self, filename: str, file_format: str) -> str:
+        profile = self.profiler.profile(filename, file_format)
+        self.logger.info("File %s read successfully.", filename)
+        copy_output = self.stage_file(filename, file_format)
+        return f"{profile.to_text()}\n\n{copy_output}"
+
+    def stage_file(self, local_file_name: str, file_format: Optional[str] = None) -> str:
+        """Make a file readable from the sandbox and tell the model where to find it and how to load it."""
+        file_format = file_format or formats.detect_format(local_file_name)
+        if self.dataset_store is None:
+            output = self.copy_file_to_sandbox(local_file_name)
+            if isinstance(output, str) and not output.startswith("Error"):
+                parquet_path = self._copy_parquet_to_sandbox(local_file_name, file_format)
+                if parquet_path is not None:
+                    output += self._parquet_note(parquet_path)
+                    output += self._announce_staged(local_file_name, parquet_path, formats.PARQUET)
+                else:
+                    output += self._announce_staged(local_file_name, self._sandbox_target(os.path.basename(local_file_name)), file_format)
+            return output
+
+        staged = self.dataset_store.stage(local_file_name)
+        self._link_into_sandbox(staged, os.path.basename(local_file_name))
+        self._record_fingerprint(staged.sandbox_path, os.path.basename(local_file_name), staged.sha256)
+        state = "already staged" if staged.reused else "staged"
+        success_msg = f"File {local_file_name} {state} for the sandbox at '{staged.sandbox_path}' (read-only)."
+
+        columnar = self._stage_parquet_copy(local_file_name, file_format)
+        if columnar is not None:
+            self._link_into_sandbox(columnar, os.path.basename(columnar.sandbox_path))
+            self._record_fingerprint(columnar.sandbox_path, os.path.basename(columnar.sandbox_path), columnar.sha256)
+            success_msg += self._parquet_note(columnar.sandbox_path)
+        else:
+            success_msg += f" Load it with {formats.PANDAS_READERS.get(file_format, 'pandas')}."
+        if columnar is not None:
+            success_msg += self._announce_staged(local_file_name, columnar.sandbox_path, formats.PARQUET)
+        else:
+            success_msg += self._announce_staged(local_file_name, staged.sandbox_path, file_format)
+        self.logger.info(success_msg)
+        return success_msg
+
+    def _announce_staged(self, local_file_name: str, sandbox_path: str, file_format: str) -> str:
+        """Let other tools of the session act on a staged file, returning what they report to add to the message."""
+        if self.prefetcher is None:
+            return ""
+        notes = self.prefetcher.notify("staged", os.path.basename(local_file_name), sandbox_path, file_format, self._file_version(local_file_name))
+        return "".join(f" {note}" for note in notes)
+
+    @staticmethod
+    def _parquet_note(sandbox_path: str) -> str:
+        return (
+            f" A Parquet copy is at '{sandbox_path}'; load that one with "
+            f"pd.read_parquet('{sandbox_path}'), passing columns=[...] to read only the columns you need."
+        )
+
+    def _wants_parquet_copy(self, file_format: Optional[str]) -> bool:
+        if not self.convert_to_parquet or file_format not in formats.TEXT_FORMATS:
+            return False
+        if not formats.pyarrow_available():
+            self.logger.warning("pyarrow is not installed; the sandbox gets no Parquet copy. Install it with `pip install pyarrow`.")
+            return False
+        return True
+
+    def _stage_parquet_copy(self, local_file_name: str, file_format: Optional[str]) -> Optional[StagedDataset]:
+        if not self._wants_parquet_copy(file_format):
+            return None
+        parquet_name = os.path.splitext(os.path.basename(local_file_name))[0] + ".parquet"
+        try:
+            return self.dataset_store.stage_derived(
+                local_file_name,
+                parquet_name,
+                lambda source, destination: formats.convert_to_parquet(source, destination, file_format),
+            )
+        except Exception as e:
+            self.logger.warning("Could not convert %s to Parquet: %s", local_file_name, e)
+            return None
+
+    def _copy_parquet_to_sandbox(self, local_file_name: str, file_format: Optional[str]) -> Optional[str]:
+        """Convert a text file to Parquet on the host and copy that into the sandbox, returning its sandbox path."""
+        if not self._wants_parquet_copy(file_format):
+            return None
+        parquet_name = os.path.splitext(os.path.basename(local_file_name))[0] + ".parquet"
+        stat = os.stat(local_file_name)
+        convert_key = (self.sandbox_dir or self.container_name, os.path.abspath(local_file_name))
+        if self._converted.get(convert_key) == (stat.st_mtime_ns, stat.st_size):
+            return self._sandbox_target(parquet_name)
+        with tempfile.TemporaryDirectory() as directory:
+            parquet_path = os.path.join(directory, parquet_name)
+            try:
+                formats.convert_to_parquet(local_file_name, parquet_path, file_format)
+            except Exception as e:
+                self.logger.warning("Could not convert %s to Parquet: %s", local_file_name, e)
+                return None
+            output = self._copy_file_to_target(parquet_path)
+            if not isinstance(output, str) or output.startswith("Error"):
+                self.logger.warning("Could not copy the Parquet copy of %s to the sandbox: %s", local_file_name, output)
+                return None
+            self._record_fingerprint(self._sandbox_target(parquet_name), parquet_name, file_sha256(parquet_path))
+        self._converted[convert_key] = (stat.st_mtime_ns, stat.st_size)
+        return self._sandbox_target(parquet_name)
+
+    def _link_into_sandbox(self, staged: StagedDataset, link_name: str) -> None:
+        if not self.sandbox_dir:
+            return
+        # Local sandboxes also get a link under the file's own name in their working directory.
+        link_path = os.path.join(self.sandbox_dir, link_name)
+        if os.path.lexists(link_path):
+            os.remove(link_path)
+        os.symlink(staged.host_path, link_path)
+
+    def copy_file_to_sandbox(self, local_file_name: str) -> str:
+        if not os.path.isfile(local_file_name):
+            return self._copy_file_to_target(local_file_name)
+
+        stat = os.stat(local_file_name)
+        copy_key = (self.sandbox_dir or self.container_name, os.path.abspath(local_file_name))
+        if self._copied.get(copy_key) == (stat.st_mtime_ns, stat.st_size):
+            self.logger.debug("File %s is unchanged since it was copied to %s.", local_file_name, copy_key[0])
+            return f"File {local_file_name} is already in the sandbox."
+        output = self._copy_file_to_target(local_file_name)
+        # Failures come back as error strings or exception objects.
+        if isinstance(output, str) and not output.startswith("Error"):
+            self._copied[copy_key] = (stat.st_mtime_ns, stat.st_size)
+            if self.sandbox_datasets is not None:
+                name = os.path.basename(local_file_name)
+                self._record_fingerprint(self._sandbox_target(name), name, file_sha256(local_file_name))
+        return output
+
+    def _sandbox_target(self, name: str) -> str:
+        """Where a copied file ends up in the sandbox."""
+        return os.path.join(self.sandbox_dir, name) if self.sandbox_dir else f"/home/sandboxuser/{name}"
+
+    def _record_fingerprint(self, sandbox_path: str, name: str, fingerprint: str) -> None:
+        if self.sandbox_datasets is not None:
+            self.sandbox_datasets.record([sandbox_path, name], fingerprint)
+
+    def _copy_file_to_target(self, local_file_name: str) -> str:
+        with get_tracer().span("sandbox.copy", file=os.path.basename(local_file_name), docker=not self.sandbox_dir):
+            if self.sandbox_dir:
+                return self.copy_file_to_directory(local_file_name, self.sandbox_dir)
+            return self.copy_file_to_docker(local_file_name, self.container_name)
+
+    def copy_file_to_directory(self, local_file_name: str, directory: str) -> str:
+        if not os.path.isfile(local_file_name):
+            error_msg = f"Error: File {local_file_name} not found."
+            self.logger.error(error_msg)
+            return error_msg
+        shutil.copy(local_file_name, os.path.join(directory, os.path.basename(local_file_name)))
+        success_msg = f"File {local_file_name} copied successfully to the sandbox."
+        self.logger.info(success_msg)
+        return success_msg
+
     def copy_file_to_docker(self, local_file_name: str, container_name: str = "python_sandbox") -> str:
         container_home_path = "/home/sandboxuser/"
-        self.logger.debug(f"Copying file {local_file_name} to Docker container {container_name}:{container_home_path}")
+        self.logger.debug("Copying file %s to Docker container %s:%s", local_file_name, container_name, container_home_path)
         
         if not os.path.isfile(local_file_name):
             error_msg = f"Error: File {local_file_name} not found."
@@ -93,7 +306,7 @@ class FileAccessTool(ToolInterface):
             return RuntimeError(error_msg)
         
         container_path = f"{container_name}:{container_home_path}{os.path.basename(local_file_name)}"
-        self.logger.debug(f"Running command: docker cp {local_file_name} {container_path}")
+        self.logger.debug("Running command: docker cp %s %s", local_file_name, container_path)
         copy_cmd = ["docker", "cp", local_file_name, container_path]
         result = subprocess.run(copy_cmd, check=True, capture_output=True, text=True)
 
@@ -1,12 +1,54 @@
-import subprocess
-from typing import Any, Dict, Tuple
+import keyword
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
+from object_orinted_agents.core.prefetch import Prefetcher
 from object_orinted_agents.core.tool_interface import ToolInterface
-from object_orinted_agents.utils.logger import get_logger
+from object_orinted_agents.datasets import formats
+from object_orinted_agents.sandbox.artifacts import Artifact, ArtifactStore
+from object_orinted_agents.sandbox.execution_cache import KERNEL_NAMES, CodeAnalysis, ExecutionCache, SandboxDatasets, analyze_code, execution_key
+from object_orinted_agents.sandbox.kernel import DockerKernelBackend, ExecutionLimits, KernelResult, PythonKernel
+from object_orinted_agents.utils.logger import PAYLOAD, get_logger, truncate
 
 class PythonCodeInterpreterTool(ToolInterface):
-    def __init__(self, logger=None):
+    def __init__(
+        self,
+        logger=None,
+        kernel: Optional[PythonKernel] = None,
+        container_name: str = "python_sandbox",
+        limits: Optional[ExecutionLimits] = None,
+        artifact_store: Optional[ArtifactStore] = None,
+        execution_cache: Optional[ExecutionCache] = None,
+        sandbox_datasets: Optional[SandboxDatasets] = None,
+        prefetcher: Optional[Prefetcher] = None,
+    ):
         self.logger = logger or get_logger(self.__class__.__name__)
+        # Files saved with save_artifact are indexed here; the model only sees their handles.
+        self.artifact_store = artifact_store or ArtifactStore(logger=self.logger)
+        # One warm kernel per tool instance, i.e. per agent session. Globals survive between calls.
+        # A kernel passed in (e.g. from a sandbox pool lease) is owned by the caller.
+        self._owns_kernel = kernel is None
+        self.kernel = kernel or PythonKernel(backend=DockerKernelBackend(container_name), logger=self.logger, limits=limits)
+        # Pure snippets are answered from the execution cache; sandbox_datasets fingerprints the files they read.
+        self.execution_cache = execution_cache
+        self.sandbox_datasets = sandbox_datasets
+        if execution_cache is not None and sandbox_datasets is not None:
+            sandbox_datasets.add_listener(execution_cache.invalidate_dataset)
+        # Global name -> key of the cached execution that set it.
+        self._provenance: Dict[str, str] = {}
+        # Cache hits that set globals are run for real only once later code needs those globals.
+        self._deferred: List[Tuple[str, Set[str]]] = []
+        self._kernel_pid: Optional[int] = None
+        # Code from the model and prefetched loads take turns in the kernel.
+        self._run_lock = threading.RLock()
+        # The kernel is started, and staged datasets are loaded into it, while the model is still busy.
+        self.prefetcher = prefetcher
+        if prefetcher is not None:
+            prefetcher.add_listener("staged", self.prefetch_dataset)
+            prefetcher.submit("warmup", "kernel", self.kernel.start)
+
     def get_defination(self):
         return {
             "type": "function",
@@ -15,7 +57,15 @@ class PythonCodeInterpreterTool(ToolInterface):
                 "description": (
                     "Executes Python code in a secure, isolated environment. "
                     "This tool is useful for performing calculations, data analysis, "
-                    "and other tasks that require Python code execution."
+                    "and other tasks that require Python code execution. "
+                    "Variables, imports and loaded data persist between calls, "
+                    "and pandas (pd) and numpy (np) are already imported. "
+                    "Executions are time-limited and long output is cut to its beginning "
+                    "and end, so print summaries rather than whole tables. "
+                    "To keep a result, call save_artifact(obj, name) with a DataFrame, "
+                    "a matplotlib figure or JSON-serializable data; open figures are saved "
+                    "automatically. Saved artifacts are reported as artifact:// handles with "
+                    "a short summary."
                 ),
                 "parameters": {
                     "type": "object",
@@ -31,22 +81,169 @@ class PythonCodeInterpreterTool(ToolInterface):
         }  
     
     def execute(self, arguments: Dict[str, Any]) -> Any:
+        return self.execute_streaming(arguments, on_output=None)
+
+    def execute_streaming(self, arguments: Dict[str, Any], on_output: Optional[Callable[[str], None]]) -> Any:
         python_code = arguments.get("python_code")
         python_code_stripped = python_code.strip('"""')
         
-        self.logger.info(f"Executing Python code: {python_code_stripped}")
-        output, errors = self._run_code_in_docker(python_code_stripped)
+        self.logger.debug("Executing Python code: %s", truncate(python_code_stripped), extra=PAYLOAD)
+        if self.prefetcher is not None:
+            self.prefetcher.wait("load")
+        output, errors = self._run_code(python_code_stripped, on_output)
         if errors:
             return f"Error: {errors}"
         return output
-    
-    @staticmethod
-    def _run_code_in_docker(code: str, container_name: str = "python_sandbox") -> Tuple[str, str]:
 
-        cmd = ["docker", "exec", "-i", container_name, "python3", "-c", "import sys; exec(sys.stdin.read())"]
+    def _run_code(self, code: str, on_output: Optional[Callable[[str], None]] = None) -> Tuple[str, str]:
+        with self._run_lock:
+            if self.execution_cache is None:
+                return self._run_code_in_kernel(code, on_output)
+            return self._run_code_cached(code, on_output)
+
+    def prefetch_dataset(self, name: str, sandbox_path: str, file_format: str, version: str) -> str:
+        """
+        Load a staged dataset into a global named after the file, in the background, and
+        return the note the file tool adds to its message. Code run afterwards waits for it.
+        """
+        variable = dataset_variable(name)
+        code = f"{variable} = {formats.read_expression(sandbox_path, file_format)}"
+        self.prefetcher.submit("load", f"{sandbox_path}@{version}", self._load_dataset, code)
+        return f"It is also being loaded into the Python interpreter as the DataFrame `{variable}`."
 
-        proces = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        output, errors = proces.communicate(input=code)
+    def _load_dataset(self, code: str) -> str:
+        _, errors = self._run_code(code)
+        if errors:
+            raise RuntimeError(errors)
+        return code
+
+    def _run_code_in_kernel(self, code: str, on_output: Optional[Callable[[str], None]] = None) -> Tuple[str, str]:
+        result = self.kernel.execute(code, on_output=on_output)
+        return self._format_result(result, self._register_artifacts(result))
+
+    def _register_artifacts(self, result: KernelResult) -> List[Artifact]:
+        if not result.artifacts:
+            return []
+        return self.artifact_store.register(result.artifacts, self.kernel.backend)
+
+    def _format_result(self, result: KernelResult, artifacts: List[Artifact]) -> Tuple[str, str]:
+        output, errors = self._with_artifacts(result.stdout, artifacts), result.errors
+        if result.notice:
+            if errors:
+                errors = f"{errors}\n{result.notice}"
+            else:
+                output = f"{output}\n{result.notice}"
         return output, errors
-    
 
+    @staticmethod
+    def _with_artifacts(output: str, artifacts: List[Artifact]) -> str:
+        if not artifacts:
+            return output
+        lines = "\n".join(f"- {artifact.describe()}" for artifact in artifacts)
+        return "\n".join(part for part in (output.rstrip("\n"), "Artifacts:", lines) if part)
+
+    def _run_code_cached(self, code: str, on_output: Optional[Callable[[str], None]]) -> Tuple[str, str]:
+        self._check_kernel()
+        analysis = analyze_code(code, self._preimported_names())
+        key, datasets, inputs = self._cache_key(analysis)
+        if key is not None:
+            entry = self.execution_cache.get(key)
+            if entry is not None:
+                self.logger.debug("Serving execution %s from the cache.", key[:12])
+                if on_output and entry.stdout:
+                    on_output(entry.stdout)
+                self._remember(analysis, key)
+                if analysis.binds:
+                    self._deferred.append((code, analysis.binds))
+                return self._with_artifacts(entry.stdout, self.artifact_store.register_copies(entry.artifacts)), ""
+
+        self._run_deferred(analysis)
+        result = self.kernel.execute(code, on_output=on_output)
+        artifacts = self._register_artifacts(result)
+        # Only complete, clean runs are reused: no error, warning, limit notice or cut output.
+        if key is not None and result.ok and not result.stderr and not result.notice and not result.truncated:
+            try:
+                saved = [(record, self.artifact_store.path(artifact.handle)) for record, artifact in zip(result.artifacts, artifacts)]
+                self.execution_cache.put(key, result.stdout, saved, datasets.values(), inputs.values())
+            except Exception as e:
+                self.logger.debug("Could not cache execution %s: %s", key[:12], e)
+            self._remember(analysis, key)
+        else:
+            self._remember(analysis, None)
+        return self._format_result(result, artifacts)
+
+    def _cache_key(self, analysis: CodeAnalysis) -> Tuple[Optional[str], Dict[str, str], Dict[str, str]]:
+        """
+        The execution key of a snippet, or None if its result must not be reused, with the
+        datasets it names and the keys of the executions that set the globals it reads.
+        """
+        if not analysis.cacheable:
+            self.logger.debug("Not caching code that %s.", analysis.reason)
+            return None, {}, {}
+        inputs = {}
+        for name in sorted(analysis.free_names - KERNEL_NAMES - self._preimported_names()):
+            if name not in self._provenance:
+                self.logger.debug("Not caching code that reads %s from an earlier execution.", name)
+                return None, {}, {}
+            inputs[name] = self._provenance[name]
+        datasets = {}
+        for literal in analysis.string_literals | analysis.file_literals:
+            fingerprint = self.sandbox_datasets.resolve(literal) if self.sandbox_datasets else None
+            if fingerprint is not None:
+                datasets[literal] = fingerprint
+            elif literal in analysis.file_literals:
+                self.logger.debug("Not caching code that reads %s, which was not staged.", literal)
+                return None, {}, {}
+        return execution_key(analysis.canonical, inputs, datasets), datasets, inputs
+
+    def _preimported_names(self) -> Set[str]:
+        return {spec.split(":", 1)[1] if ":" in spec else spec.split(".")[0] for spec in self.kernel.preimports}
+
+    def _remember(self, analysis: CodeAnalysis, key: Optional[str]) -> None:
+        """Track which globals hold values of cached executions after running ``analysis``."""
+        if key is not None:
+            for name in analysis.binds:
+                self._provenance[name] = key
+        elif analysis.dynamic:
+            self._provenance.clear()
+        else:
+            for name in analysis.binds | analysis.free_names:
+                self._provenance.pop(name, None)
+
+    def _run_deferred(self, analysis: CodeAnalysis) -> None:
+        """Run skipped cache hits whose globals the next execution reads or replaces."""
+        if not self._deferred:
+            return
+        deferred_names = set().union(*(names for _, names in self._deferred))
+        if not analysis.dynamic and not (analysis.free_names | analysis.binds) & deferred_names:
+            return
+        deferred, self._deferred = self._deferred, []
+        self.logger.debug("Running %d cached executions to restore %s.", len(deferred), ", ".join(sorted(deferred_names)))
+        for code, names in deferred:
+            result = self.kernel.execute(code)
+            if not result.ok:
+                self.logger.warning("Restoring %s failed: %s", ", ".join(sorted(names)), truncate(result.errors))
+                for name in names:
+                    self._provenance.pop(name, None)
+
+    def _check_kernel(self) -> None:
+        # A restarted kernel has lost its globals, so what was recorded about them is void.
+        pid = self.kernel.ready_info.get("pid") if self.kernel.is_alive else None
+        if pid is not None and self._kernel_pid is not None and pid != self._kernel_pid:
+            self._provenance.clear()
+            self._deferred.clear()
+        if pid is not None:
+            self._kernel_pid = pid
+
+    def close(self) -> None:
+        """Shut down the tool's kernel if the tool created it."""
+        if self._owns_kernel:
+            self.kernel.shutdown()
+
+
+def dataset_variable(filename: str) -> str:
+    """A Python identifier for a dataset file, e.g. ``traffic_accidents`` for ``data/traffic-accidents.csv``."""
+    stem = re.sub(r"\W", "_", os.path.splitext(os.path.basename(filename))[0]).strip("_").lower() or "data"
+    if stem[0].isdigit():
+        stem = f"df_{stem}"
+    return f"{stem}_" if keyword.iskeyword(stem) else stem
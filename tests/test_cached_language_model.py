@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+from object_orinted_agents.services.cached_language_model import CachedLanguageModel
+from object_orinted_agents.services.fake_language_model import FakeLanguageModel
+from object_orinted_agents.services.stream_accumulator import StreamAccumulator
+
+MESSAGES = [{"role": "user", "content": "What is 2 + 2?"}]
+
+
+def _accumulate(chunks):
+    accumulator = StreamAccumulator()
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator.completion()
+
+
+def test_repeated_request_is_served_from_memory():
+    model = FakeLanguageModel(responses=["4", "wrong"])
+    cached = CachedLanguageModel(model)
+    first = cached.generate_completion(model="fake-model", messages=MESSAGES)
+    second = cached.generate_completion(model="fake-model", messages=[dict(reversed(MESSAGES[0].items()))])
+    assert second.choices[0].message.content == first.choices[0].message.content == "4"
+    assert len(model.calls) == 1
+    assert cached.stats()["memory_hits"] == 1
+
+
+def test_different_tools_or_effort_miss():
+    model = FakeLanguageModel(default_response="4")
+    cached = CachedLanguageModel(model)
+    cached.generate_completion(model="fake-model", messages=MESSAGES)
+    cached.generate_completion(model="fake-model", messages=MESSAGES, reasoning_effort="high")
+    cached.generate_completion(model="fake-model", messages=MESSAGES, tools=[{"name": "t"}])
+    assert len(model.calls) == 3
+
+
+def test_entries_expire_after_the_ttl():
+    model = FakeLanguageModel(default_response="4")
+    cached = CachedLanguageModel(model, ttl_seconds=0.1)
+    cached.generate_completion(model="fake-model", messages=MESSAGES)
+    time.sleep(0.2)
+    cached.generate_completion(model="fake-model", messages=MESSAGES)
+    assert len(model.calls) == 2
+
+
+def test_use_cache_false_bypasses_the_cache():
+    model = FakeLanguageModel(default_response="4")
+    cached = CachedLanguageModel(model)
+    cached.generate_completion(model="fake-model", messages=MESSAGES)
+    cached.generate_completion(model="fake-model", messages=MESSAGES, use_cache=False)
+    assert len(model.calls) == 2
+    assert cached.stats()["bypasses"] == 1
+
+
+def test_cached_response_is_replayed_to_streaming_callers():
+    model = FakeLanguageModel(responses=["four"])
+    cached = CachedLanguageModel(model)
+    cached.generate_completion(model="fake-model", messages=MESSAGES)
+    replayed = _accumulate(cached.generate_completion(model="fake-model", messages=MESSAGES, stream=True))
+    assert replayed.choices[0].message.content == "four"
+    assert len(model.calls) == 1
+
+
+def test_streamed_miss_is_stored_once_complete():
+    model = FakeLanguageModel(responses=["four"])
+    cached = CachedLanguageModel(model)
+    assert _accumulate(cached.generate_completion(model="fake-model", messages=MESSAGES, stream=True)).choices[0].message.content == "four"
+    assert cached.generate_completion(model="fake-model", messages=MESSAGES).choices[0].message.content == "four"
+    assert len(model.calls) == 1
+
+
+def test_async_streaming_replay():
+    model = FakeLanguageModel(responses=["four"])
+    cached = CachedLanguageModel(model)
+
+    async def run():
+        await cached.agenerate_completion(model="fake-model", messages=MESSAGES)
+        accumulator = StreamAccumulator()
+        async for chunk in await cached.agenerate_completion(model="fake-model", messages=MESSAGES, stream=True):
+            accumulator.add(chunk)
+        return accumulator.completion()
+
+    assert asyncio.run(run()).choices[0].message.content == "four"
+    assert len(model.calls) == 1
+
+
+def test_sqlite_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / "completions.sqlite")
+    model = FakeLanguageModel(responses=["four"])
+    CachedLanguageModel(model, sqlite_path=path).generate_completion(model="fake-model", messages=MESSAGES)
+    restarted = CachedLanguageModel(model, sqlite_path=path)
+    assert restarted.generate_completion(model="fake-model", messages=MESSAGES).choices[0].message.content == "four"
+    assert restarted.stats()["disk_hits"] == 1
+    assert len(model.calls) == 1
+
+
+def test_memory_tier_is_bounded():
+    model = FakeLanguageModel(default_response="ok")
+    cached = CachedLanguageModel(model, max_entries=2)
+    for content in ("a", "b", "c"):
+        cached.generate_completion(model="fake-model", messages=[{"role": "user", "content": content}])
+    assert cached.stats()["entries"] == 2
+    cached.generate_completion(model="fake-model", messages=[{"role": "user", "content": "a"}])
+    assert len(model.calls) == 4
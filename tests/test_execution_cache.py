@@ -0,0 +1,88 @@
+import tempfile
+
+import pytest
+
+from object_orinted_agents.sandbox.execution_cache import ExecutionCache, SandboxDatasets, analyze_code
+from object_orinted_agents.sandbox.kernel import LocalKernelBackend, PythonKernel
+from registry.tools.python_code_interpreter_tool import PythonCodeInterpreterTool
+
+MODULES = {"np", "pd"}
+
+
+def test_loop_over_external_objects_that_mutates_them_is_not_cacheable():
+    analysis = analyze_code("for m in models:\n    m.fit(X, y)")
+    assert not analysis.cacheable
+    assert "modifies m" in analysis.reason
+
+
+def test_loop_that_appends_to_external_lists_is_not_cacheable():
+    analysis = analyze_code("for l in lists:\n    l.append(0)")
+    assert not analysis.cacheable
+    assert "modifies l" in analysis.reason
+
+
+def test_getattr_is_not_cacheable():
+    analysis = analyze_code('getattr(xs, "append")(5)')
+    assert not analysis.cacheable
+    assert "uses getattr" in analysis.reason
+
+
+def test_augmented_assignment_to_an_alias_is_not_cacheable():
+    analysis = analyze_code("l = xs\nl += [4]")
+    assert not analysis.cacheable
+    assert "modifies l" in analysis.reason
+
+
+def test_loop_over_objects_the_snippet_creates_is_cacheable():
+    assert analyze_code("lists = [[1], [2]]\nfor l in lists:\n    l.append(0)\nprint(lists)").cacheable
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import heapq\nheapq.heappush(h, 1)",
+        "import bisect\nbisect.insort(l, 3)",
+        "np.copyto(a, b)",
+        "np.fill_diagonal(a, 0)",
+        "a.fill(0)",
+        "arr.resize((2, 2))",
+        "s.intersection_update({1})",
+        "d.appendleft(1)",
+        "v = df.to_numpy()\nv[0] = 0",
+        "np.add(a, 1, out=a)",
+        "helper(xs)",
+    ],
+)
+def test_calls_that_may_modify_earlier_objects_are_not_cacheable(code):
+    assert not analyze_code(code, MODULES).cacheable
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "print(df.describe())",
+        'print(df.groupby("a")["b"].mean())',
+        "print(np.mean(a))",
+        "total = 0\nfor x in xs:\n    total += x\nprint(total)",
+        "import math\nprint(math.sqrt(len(xs)))",
+        "def f(frame):\n    return frame.mean()\nprint(f(df))",
+    ],
+)
+def test_calls_known_to_be_pure_are_cacheable(code):
+    assert analyze_code(code, MODULES).cacheable
+
+
+def _run_session(cache, snippets):
+    kernel = PythonKernel(LocalKernelBackend(working_dir=tempfile.mkdtemp()), preimports=[])
+    tool = PythonCodeInterpreterTool(kernel=kernel, execution_cache=cache, sandbox_datasets=SandboxDatasets())
+    try:
+        return [tool.execute({"python_code": code}).strip() for code in snippets]
+    finally:
+        kernel.shutdown()
+
+
+def test_sessions_sharing_a_cache_see_in_place_set_updates():
+    cache = ExecutionCache(artifact_dir=tempfile.mkdtemp())
+    snippets = ["s = {1, 2, 3}", "s.intersection_update({1})", "print(s)"]
+    assert _run_session(cache, snippets)[-1] == "{1}"
+    assert _run_session(cache, snippets)[-1] == "{1}"
@@ -0,0 +1,52 @@
+from object_orinted_agents.sandbox.kernel import ExecutionLimits, LocalKernelBackend, PythonKernel
+
+
+def _kernel(tmp_path, limits):
+    return PythonKernel(LocalKernelBackend(working_dir=str(tmp_path)), preimports=[], limits=limits)
+
+
+def test_timeout_interrupts_the_code_and_keeps_globals(tmp_path):
+    kernel = _kernel(tmp_path, ExecutionLimits(timeout=0.5))
+    try:
+        kernel.execute("x = 1")
+        result = kernel.execute("while True:\n    pass")
+        assert result.timed_out
+        assert kernel.restarts == 0
+        assert kernel.execute("print(x)").stdout == "1\n"
+    finally:
+        kernel.shutdown()
+
+
+def test_code_that_ignores_the_timeout_gets_the_kernel_killed_and_restarted(tmp_path):
+    kernel = _kernel(tmp_path, ExecutionLimits(timeout=0.5, kill_grace=0.5))
+    try:
+        kernel.execute("x = 1")
+        result = kernel.execute("import signal\nsignal.signal(signal.SIGALRM, signal.SIG_IGN)\nwhile True:\n    pass")
+        assert result.timed_out
+        assert "restarted" in result.notice
+        assert kernel.restarts == 1
+        assert kernel.execute("print('x' in globals())").stdout == "False\n"
+    finally:
+        kernel.shutdown()
+
+
+def test_long_output_keeps_its_beginning_and_end(tmp_path):
+    kernel = _kernel(tmp_path, ExecutionLimits(max_output_chars=200))
+    try:
+        result = kernel.execute("print('start' + 'x' * 10000 + 'end')")
+        assert result.truncated
+        assert len(result.stdout) < 1000
+        assert result.stdout.startswith("start")
+        assert result.stdout.rstrip().endswith("end")
+    finally:
+        kernel.shutdown()
+
+
+def test_usage_is_measured(tmp_path):
+    kernel = _kernel(tmp_path, ExecutionLimits())
+    try:
+        result = kernel.execute("sum(range(100000))")
+        assert result.usage is not None
+        assert result.usage.wall_seconds >= 0
+    finally:
+        kernel.shutdown()
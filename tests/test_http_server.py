@@ -0,0 +1,174 @@
+import asyncio
+import json
+
+import pytest
+
+from object_orinted_agents.core.agent_event import AgentEvent
+from object_orinted_agents.sandbox.pool import SandboxPool, WorkerFactory
+from object_orinted_agents.server.http_server import AdmissionQueue, AgentServer, HTTPError
+from object_orinted_agents.server.session_manager import SessionLimitError, SessionManager
+
+
+class EchoAgent:
+    """Stands in for an agent: answers every message with itself after ``delay`` seconds."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.closed = False
+
+    async def atask(self, message: str) -> str:
+        await asyncio.sleep(self.delay)
+        return f"echo: {message}"
+
+    async def atask_stream(self, message: str):
+        await asyncio.sleep(self.delay)
+        yield AgentEvent(AgentEvent.TEXT, "echo: ")
+        yield AgentEvent(AgentEvent.DONE, f"echo: {message}")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class BrokenWorkerFactory(WorkerFactory):
+    def create(self, worker_id):
+        raise OSError("Cannot connect to the Docker daemon")
+
+    def destroy(self, worker) -> None:
+        pass
+
+
+async def _request(port: int, method: str, path: str, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = b"" if body is None else json.dumps(body).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, content = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, content.decode()
+
+
+def _serve(test, delay: float = 0.0, **admission):
+    async def run():
+        sessions = SessionManager(lambda session_id, lease: EchoAgent(delay))
+        server = AgentServer(sessions, port=0, admission=AdmissionQueue(**admission))
+        await server.start()
+        try:
+            await test(server.port)
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_session_turn_round_trip():
+    async def test(port):
+        status, _, body = await _request(port, "POST", "/sessions", {"session_id": "a"})
+        assert status == 201
+        status, _, body = await _request(port, "POST", "/sessions/a/messages", {"message": "hi"})
+        assert status == 200
+        assert json.loads(body)["response"] == "echo: hi"
+
+    _serve(test)
+
+
+def test_streamed_turn_is_sent_as_server_sent_events():
+    async def test(port):
+        await _request(port, "POST", "/sessions", {"session_id": "a"})
+        status, headers, body = await _request(port, "POST", "/sessions/a/messages", {"message": "hi", "stream": True})
+        assert status == 200
+        assert headers["Content-Type"] == "text/event-stream"
+        assert "event: text" in body
+        assert "event: done" in body
+
+    _serve(test)
+
+
+def test_turns_past_capacity_get_503_with_retry_after():
+    async def test(port):
+        for session_id in ("a", "b"):
+            await _request(port, "POST", "/sessions", {"session_id": session_id})
+        running = asyncio.create_task(_request(port, "POST", "/sessions/a/messages", {"message": "slow"}))
+        await asyncio.sleep(0.1)
+        status, headers, _ = await _request(port, "POST", "/sessions/b/messages", {"message": "rejected"})
+        assert status == 503
+        assert "Retry-After" in headers
+        assert (await running)[0] == 200
+
+    _serve(test, delay=0.5, max_running=1, max_queued=0)
+
+
+def test_message_to_a_busy_session_gets_409():
+    async def test(port):
+        await _request(port, "POST", "/sessions", {"session_id": "a"})
+        running = asyncio.create_task(_request(port, "POST", "/sessions/a/messages", {"message": "slow"}))
+        await asyncio.sleep(0.1)
+        status, _, _ = await _request(port, "POST", "/sessions/a/messages", {"message": "again"})
+        assert status == 409
+        await running
+
+    _serve(test, delay=0.5)
+
+
+def test_unknown_session_and_bad_bodies_are_rejected():
+    async def test(port):
+        assert (await _request(port, "POST", "/sessions/missing/messages", {"message": "hi"}))[0] == 404
+        await _request(port, "POST", "/sessions", {"session_id": "a"})
+        assert (await _request(port, "POST", "/sessions/a/messages", {}))[0] == 400
+        assert (await _request(port, "POST", "/sessions", {"session_id": "a"}))[0] == 409
+
+    _serve(test)
+
+
+def test_session_gets_503_when_sandboxes_fail_to_start():
+    async def run():
+        pool = SandboxPool(BrokenWorkerFactory(), min_workers=0, max_workers=1, start_backoff=0.01)
+        sessions = SessionManager(lambda session_id, lease: EchoAgent(), sandbox_pool=pool, lease_timeout=5)
+        server = AgentServer(sessions, port=0)
+        await server.start()
+        try:
+            status, headers, _ = await _request(server.port, "POST", "/sessions", {})
+            assert status == 503
+            assert "Retry-After" in headers
+        finally:
+            await server.stop()
+            pool.shutdown()
+
+    asyncio.run(run())
+
+
+def test_queued_turn_times_out_with_503():
+    async def run():
+        admission = AdmissionQueue(max_running=1, max_queued=1, queue_timeout=0.1)
+        await admission.acquire()
+        with pytest.raises(HTTPError) as raised:
+            await admission.acquire()
+        assert raised.value.status == 503
+        assert admission.stats()["rejected"] == 1
+
+    asyncio.run(run())
+
+
+def test_least_recently_used_idle_session_makes_room():
+    async def run():
+        sessions = SessionManager(lambda session_id, lease: EchoAgent(), max_sessions=2)
+        first = await sessions.create("a")
+        await sessions.create("b")
+        await sessions.create("c")
+        assert [session.session_id for session in sessions.list()] == ["b", "c"]
+        assert first.agent.closed
+
+    asyncio.run(run())
+
+
+def test_session_limit_with_every_session_busy():
+    async def run():
+        sessions = SessionManager(lambda session_id, lease: EchoAgent(), max_sessions=1)
+        session = await sessions.create("a")
+        async with session.lock:
+            with pytest.raises(SessionLimitError):
+                await sessions.create("b")
+
+    asyncio.run(run())
@@ -0,0 +1,53 @@
+import pytest
+
+from object_orinted_agents.sandbox.kernel import KernelCrashedError, KernelRestartPolicy, LocalKernelBackend, PythonKernel
+
+
+@pytest.fixture
+def kernel(tmp_path):
+    kernel = PythonKernel(LocalKernelBackend(working_dir=str(tmp_path)), preimports=[])
+    yield kernel
+    kernel.shutdown()
+
+
+def test_globals_persist_between_executions(kernel):
+    kernel.execute("x = 41")
+    result = kernel.execute("print(x + 1)")
+    assert result.ok
+    assert result.stdout == "42\n"
+
+
+def test_exceptions_are_reported_and_the_kernel_keeps_its_state(kernel):
+    kernel.execute("x = 1")
+    result = kernel.execute("1 / 0")
+    assert not result.ok
+    assert "ZeroDivisionError" in result.errors
+    assert kernel.execute("print(x)").stdout == "1\n"
+
+
+def test_crashed_kernel_is_restarted(kernel):
+    kernel.execute("x = 1")
+    result = kernel.execute("import os\nos._exit(1)")
+    assert not result.ok
+    assert "restarted" in result.notice
+    assert kernel.restarts == 1
+    assert kernel.execute("print('x' in globals())").stdout == "False\n"
+
+
+def test_crash_past_the_restart_limit_raises(tmp_path):
+    policy = KernelRestartPolicy(max_restarts=0)
+    kernel = PythonKernel(LocalKernelBackend(working_dir=str(tmp_path)), preimports=[], restart_policy=policy)
+    try:
+        with pytest.raises(KernelCrashedError, match="Restart limit"):
+            kernel.execute("import os\nos._exit(1)")
+    finally:
+        kernel.shutdown()
+
+
+def test_kernel_that_does_not_become_ready_is_killed(tmp_path):
+    (tmp_path / "hangs_on_import.py").write_text("import time\ntime.sleep(60)\n")
+    backend = LocalKernelBackend(working_dir=str(tmp_path), env={"PYTHONPATH": str(tmp_path)})
+    kernel = PythonKernel(backend, preimports=["hangs_on_import"], start_timeout=1.0)
+    with pytest.raises(KernelCrashedError, match="did not start within"):
+        kernel.start()
+    assert kernel.process is None
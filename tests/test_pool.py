@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from object_orinted_agents.sandbox.pool import LocalWorkerFactory, PoolExhaustedError, SandboxPool, WorkerStartError
+
+
+class FlakyWorkerFactory(LocalWorkerFactory):
+    """Fails the first ``failures`` starts, then starts local workers."""
+
+    def __init__(self, root_dir: str, failures: int):
+        super().__init__(root_dir=root_dir, preimports=[])
+        self.failures = failures
+        self.attempts = 0
+
+    def create(self, worker_id):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise OSError("Cannot connect to the Docker daemon")
+        return super().create(worker_id)
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SandboxPool(LocalWorkerFactory(root_dir=str(tmp_path), preimports=[]), min_workers=0, max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_sessions_run_concurrently_on_separate_workers(pool):
+    leases = [pool.lease("a", timeout=30), pool.lease("b", timeout=30)]
+    assert leases[0].worker is not leases[1].worker
+    results = {}
+
+    def run(lease):
+        started = time.monotonic()
+        lease.kernel.execute("import time\ntime.sleep(0.5)")
+        results[lease.session_id] = time.monotonic() - started
+
+    threads = [threading.Thread(target=run, args=(lease,)) for lease in leases]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started < 0.9
+    assert set(results) == {"a", "b"}
+    for lease in leases:
+        lease.release()
+
+
+def test_lease_times_out_when_every_worker_is_leased(pool):
+    pool.lease("a", timeout=30)
+    pool.lease("b", timeout=30)
+    with pytest.raises(PoolExhaustedError):
+        pool.lease("c", timeout=0.2)
+
+
+def test_released_worker_is_reset_for_the_next_session(pool):
+    with pool.lease("a", timeout=30) as lease:
+        lease.kernel.execute("secret = 1")
+    with pool.lease("b", timeout=30) as lease:
+        assert lease.kernel.execute("print('secret' in globals())").stdout == "False\n"
+
+
+def test_waiters_get_worker_start_error_after_repeated_failures(tmp_path):
+    factory = FlakyWorkerFactory(str(tmp_path), failures=100)
+    pool = SandboxPool(factory, min_workers=0, max_workers=2, max_start_failures=3, start_backoff=0.05)
+    try:
+        with pytest.raises(WorkerStartError) as raised:
+            pool.lease("a", timeout=10)
+        assert isinstance(raised.value.__cause__, OSError)
+        # Starts are retried with backoff, not in a tight loop.
+        assert factory.attempts <= 4
+    finally:
+        pool.shutdown()
+
+
+def test_pool_recovers_once_workers_start_again(tmp_path):
+    factory = FlakyWorkerFactory(str(tmp_path), failures=3)
+    pool = SandboxPool(factory, min_workers=0, max_workers=1, max_start_failures=3, start_backoff=0.05)
+    try:
+        with pytest.raises(WorkerStartError):
+            pool.lease("a", timeout=10)
+        time.sleep(0.5)
+        with pool.lease("a", timeout=10) as lease:
+            assert lease.kernel.execute("print(1)").stdout == "1\n"
+    finally:
+        pool.shutdown()
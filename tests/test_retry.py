@@ -0,0 +1,104 @@
+import email.utils
+import time
+
+import pytest
+
+from object_orinted_agents.services.rate_limiter import TokenBucket
+from object_orinted_agents.services.retry import RetryPolicy, call_with_retry, retry_after_seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code: int, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(status_code, headers)
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+def test_retry_after_in_milliseconds():
+    assert retry_after_seconds(FakeAPIError(429, {"retry-after-ms": "1500"})) == pytest.approx(1.5)
+
+
+def test_retry_after_in_seconds():
+    assert retry_after_seconds(FakeAPIError(429, {"retry-after": "7"})) == pytest.approx(7.0)
+
+
+def test_retry_after_as_an_http_date():
+    retry_at = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert retry_after_seconds(FakeAPIError(503, {"retry-after": retry_at})) == pytest.approx(30, abs=2)
+
+
+def test_retry_after_in_the_past_or_unparseable():
+    past = email.utils.formatdate(time.time() - 30, usegmt=True)
+    assert retry_after_seconds(FakeAPIError(503, {"retry-after": past})) == 0.0
+    assert retry_after_seconds(FakeAPIError(503, {"retry-after": "soon"})) is None
+    assert retry_after_seconds(FakeAPIError(503)) is None
+
+
+def test_server_requested_wait_is_capped():
+    policy = RetryPolicy(max_retry_after=2.0)
+    assert policy.delay(0, FakeAPIError(429, {"retry-after": "120"})) == 2.0
+
+
+def test_backoff_without_retry_after_stays_under_the_cap():
+    policy = RetryPolicy(base_delay=1.0, max_delay=3.0)
+    assert all(0 <= policy.delay(attempt) <= 3.0 for attempt in range(10))
+
+
+def test_transient_errors_are_retryable_and_client_errors_are_not():
+    policy = RetryPolicy()
+    assert policy.is_retryable(FakeAPIError(429))
+    assert policy.is_retryable(FakeAPIError(502))
+    assert policy.is_retryable(APIConnectionError())
+    assert not policy.is_retryable(FakeAPIError(400))
+    assert not policy.is_retryable(ValueError())
+
+
+def test_call_is_retried_until_it_succeeds():
+    failures = [FakeAPIError(429, {"retry-after-ms": "1"}), APIConnectionError()]
+
+    def call():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert call_with_retry(call, RetryPolicy(base_delay=0.001)) == "ok"
+
+
+def test_last_error_is_raised_once_attempts_run_out():
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise FakeAPIError(503, {"retry-after-ms": "1"})
+
+    with pytest.raises(FakeAPIError):
+        call_with_retry(call, RetryPolicy(max_attempts=3))
+    assert len(calls) == 3
+
+
+def test_non_retryable_error_is_raised_at_once():
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise FakeAPIError(401)
+
+    with pytest.raises(FakeAPIError):
+        call_with_retry(call, RetryPolicy())
+    assert len(calls) == 1
+
+
+def test_token_bucket_makes_callers_wait_past_its_capacity():
+    bucket = TokenBucket(capacity=10, rate=100)
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(5) == pytest.approx(0.05, abs=0.01)
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from typing import Any, Dict
+
+from object_orinted_agents.core.chat_message import ChatMessages
+from object_orinted_agents.core.tool_interface import ToolInterface
+from object_orinted_agents.core.tool_manager import ToolManager
+from object_orinted_agents.services.fake_language_model import FakeLanguageModel
+
+
+class SleepTool(ToolInterface):
+    def __init__(self, seconds: float = 0.3):
+        self.seconds = seconds
+
+    def get_defination(self) -> Dict[str, Any]:
+        return {
+            "type": "function",
+            "function": {
+                "name": "sleep",
+                "description": "Sleep, then echo the label.",
+                "parameters": {"type": "object", "properties": {"label": {"type": "string"}}, "required": ["label"]},
+            },
+        }
+
+    def execute(self, arguments: Dict[str, Any]) -> Any:
+        time.sleep(self.seconds)
+        return f"slept {arguments['label']}"
+
+
+def _manager(model, **kwargs):
+    manager = ToolManager(language_model_interface=model, **kwargs)
+    manager.register_tool(SleepTool())
+    return manager
+
+
+def _calls(*labels):
+    return FakeLanguageModel.tool_call_response([("sleep", {"label": label}) for label in labels])
+
+
+def test_all_tool_calls_of_a_response_run_concurrently():
+    model = FakeLanguageModel(responses=["done"])
+    manager = _manager(model)
+    messages = ChatMessages("You are a test agent.")
+    started = time.monotonic()
+    answer = manager.handle_tool_call_sequence(_calls("a", "b", "c"), False, messages, "fake-model")
+    elapsed = time.monotonic() - started
+    manager.close()
+    assert answer == "done"
+    assert elapsed < 0.8
+    tool_messages = [message for message in messages.get_messages() if message["role"] == "tool"]
+    assert [message["content"] for message in tool_messages] == ["slept a", "slept b", "slept c"]
+
+
+def test_unknown_tools_and_bad_arguments_are_reported_to_the_model():
+    model = FakeLanguageModel(responses=["done"])
+    manager = _manager(model)
+    messages = ChatMessages("You are a test agent.")
+    response = FakeLanguageModel.tool_call_response([("missing", {}), ("sleep", {})])
+    assert manager.handle_tool_call_sequence(response, False, messages, "fake-model") == "done"
+    manager.close()
+    results = [message["content"] for message in messages.get_messages() if message["role"] == "tool"]
+    assert all(result.startswith("Error") for result in results)
+
+
+def test_loop_stops_after_max_steps_and_asks_for_an_answer_without_tools():
+    model = FakeLanguageModel(responder=lambda **request: _calls("again") if request["tools"] else "final")
+    manager = _manager(model, max_steps=2)
+    answer = manager.handle_tool_call_sequence(_calls("first"), False, ChatMessages("You are a test agent."), "fake-model")
+    manager.close()
+    assert answer == "final"
+    assert len(model.calls) == 2
+    assert model.calls[0]["tools"]
+    assert model.calls[-1]["tools"] is None
+
+
+def test_loop_stops_starting_tool_rounds_once_the_time_budget_is_used():
+    model = FakeLanguageModel(responder=lambda **request: _calls("again") if request["tools"] else "final")
+    manager = _manager(model, time_budget=0.1)
+    answer = manager.handle_tool_call_sequence(_calls("first"), False, ChatMessages("You are a test agent."), "fake-model")
+    manager.close()
+    assert answer == "final"
+    assert len(model.calls) == 1
+
+
+def test_async_loop_runs_tool_calls_concurrently():
+    model = FakeLanguageModel(responses=["done"])
+    manager = _manager(model)
+    messages = ChatMessages("You are a test agent.")
+    started = time.monotonic()
+    answer = asyncio.run(manager.ahandle_tool_call_sequence(_calls("a", "b", "c"), False, messages, "fake-model"))
+    assert answer == "done"
+    assert time.monotonic() - started < 0.8